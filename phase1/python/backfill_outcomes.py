@@ -0,0 +1,366 @@
+import argparse
+import csv
+import glob
+import json
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List
+
+from expiry_queue import expiry_bars
+from signal_record import loads, parse_time, tf_minutes, to_float
+from tick_path import _epoch
+
+try:
+    import numpy as np
+except ImportError:  # batch job: NumPy is required here
+    np = None
+
+BLOCK = 64
+CHUNK = 8192
+OUT_FIELDS = (
+    "id", "pair", "tf", "side", "entry", "sl", "tp", "signal_time",
+    "outcome", "hit_price", "hit_time", "time_to_hit_min", "mae", "mae_r",
+)
+
+
+def _paths(patterns: List[str]) -> List[str]:
+    out: List[str] = []
+    for pat in patterns:
+        hits = sorted(glob.glob(pat)) or ([pat] if Path(pat).exists() else [])
+        out.extend(p for p in hits if p not in out and not p.endswith(".tmp"))
+    return out
+
+
+def _iso(stamp: str) -> str:
+    # "2026.02.14 12:05[:00]" / "2026-02-14T12:05:00+00:00" -> "2026-02-14T12:05[:00]" for datetime64
+    return stamp[:10].replace(".", "-") + "T" + stamp[11:19]
+
+
+def _epochs(stamps: List[str]) -> "np.ndarray":
+    """Broker time strings -> naive epoch seconds (NaN when unparseable), vectorized when the format allows."""
+    try:
+        arr = np.array([_iso(s) for s in stamps], dtype="datetime64[s]")
+        return arr.astype("int64").astype(np.float64)
+    except ValueError:
+        out = np.empty(len(stamps), dtype=np.float64)
+        for i, s in enumerate(stamps):
+            dt = parse_time(s)
+            out[i] = np.nan if dt is None else _epoch(dt, np.nan)
+        return out
+
+
+def load_prices(paths: List[str]) -> Dict[str, tuple["np.ndarray", "np.ndarray", List[str]]]:
+    """price_file JSONL archives -> {pair: (times, prices, stamps)} sorted by time."""
+    raw: Dict[str, tuple[List[str], List[float]]] = {}
+    for path in paths:
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    row = loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(row, dict):
+                    continue
+                pair = row.get("pair") or row.get("symbol")
+                price = row.get("price") or row.get("bid") or row.get("last")
+                stamp = row.get("time") or row.get("ts")
+                if not pair or price is None or not stamp:
+                    continue
+                stamps, prices = raw.setdefault(str(pair), ([], []))
+                stamps.append(str(stamp))
+                prices.append(float(price))
+    out = {}
+    for pair, (stamps, prices) in raw.items():
+        times = _epochs(stamps)
+        ok = ~np.isnan(times)
+        order = np.argsort(times[ok], kind="stable")
+        idx = np.flatnonzero(ok)[order]
+        out[pair] = (times[idx], np.asarray(prices, dtype=np.float64)[idx], [stamps[i] for i in idx])
+    return out
+
+
+def load_signals(paths: List[str]) -> Dict[str, Any]:
+    """Signal JSONL files -> columns of unique (by id) trade signals; health-check probes skipped.
+
+    Columns rather than SignalRecord objects: the batch never needs per-row
+    parsed times, and building 10^5 records would dominate the run time.
+    """
+    cols: Dict[str, list] = {f: [] for f in OUT_FIELDS[:8]}
+    seen = set()
+    for path in paths:
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    d = loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(d, dict) or not d.get("pair"):
+                    continue
+                sid = "" if d.get("id") is None else str(d["id"])
+                if sid.startswith("HC-"):
+                    continue
+                stamp = str(d.get("signal_time") or d.get("time") or "")
+                key = sid or f"{d['pair']}|{d.get('tf')}|{d.get('side')}|{stamp}"
+                if key in seen:
+                    continue
+                seen.add(key)
+                cols["id"].append(sid)
+                cols["pair"].append(str(d["pair"]))
+                cols["tf"].append(str(d.get("tf") or ""))
+                cols["side"].append(str(d.get("side") or "").upper())
+                for k in ("entry", "sl", "tp"):
+                    v = to_float(d.get(k))
+                    cols[k].append(np.nan if v is None else v)
+                cols["signal_time"].append(stamp)
+    for k in ("entry", "sl", "tp"):
+        cols[k] = np.asarray(cols[k], dtype=np.float64)
+    return cols
+
+
+class BlockMax:
+    """Max of ``values`` per block of ``block`` + a sparse table over the block maxima.
+
+    Answers, for many queries at once: the first index >= start whose value
+    is >= x (binary lifting over the table, then one block scan) and range
+    maxima. Minimum queries use a BlockMax over the negated values.
+    """
+
+    def __init__(self, values: "np.ndarray", block: int = BLOCK):
+        self.n = len(values)
+        self.block = block
+        self.nb = max(1, -(-self.n // block))
+        self.vals = np.full(self.nb * block, -np.inf)
+        self.vals[: self.n] = values
+        level = self.vals.reshape(self.nb, block).max(axis=1)
+        self.table = [level]
+        span = 1
+        while span * 2 <= self.nb:
+            level = np.maximum(level[:-span], level[span:])
+            self.table.append(level)
+            span *= 2
+        self._cols = np.arange(block)
+
+    def _scan(self, blk: "np.ndarray", lo: "np.ndarray", x: "np.ndarray") -> "np.ndarray":
+        # first index >= lo inside block ``blk`` with value >= x, else -1
+        grid = blk[:, None] * self.block + self._cols
+        mask = (self.vals[grid] >= x[:, None]) & (grid >= lo[:, None])
+        first = grid[np.arange(len(blk)), mask.argmax(axis=1)]
+        return np.where(mask.any(axis=1), first, -1)
+
+    def first_at_least(self, start: "np.ndarray", x: "np.ndarray") -> "np.ndarray":
+        """First index i >= start with value >= x; ``n`` when there is none."""
+        out = np.full(len(start), self.n, dtype=np.int64)
+        live = start < self.n
+        if not live.any():
+            return out
+        blk = np.minimum(start // self.block, self.nb - 1)
+        head = self._scan(blk, start, x)
+        out[head >= 0] = head[head >= 0]
+        todo = live & (head < 0)
+        cur = blk + 1
+        for k in range(len(self.table) - 1, -1, -1):
+            span = 1 << k
+            level = self.table[k]
+            fits = todo & (cur + span <= self.nb)
+            below = level[np.minimum(cur, len(level) - 1)] < x
+            cur = np.where(fits & below, cur + span, cur)
+        found = todo & (cur < self.nb)
+        if found.any():
+            res = self._scan(cur[found], start[found], x[found])
+            out[found] = np.where(res >= 0, res, self.n)
+        return out
+
+    def range_max(self, lo: "np.ndarray", hi: "np.ndarray") -> "np.ndarray":
+        """max(values[lo:hi]) per query; -inf for empty ranges."""
+        lo = np.minimum(lo, self.n)
+        hi = np.minimum(hi, self.n)
+        empty = hi <= lo
+        hi_in = np.maximum(hi - 1, lo)
+        bl = np.minimum(lo // self.block, self.nb - 1)
+        bh = np.minimum(hi_in // self.block, self.nb - 1)
+        out = np.full(len(lo), -np.inf)
+        for blk in (bl, bh):  # partial first / last block
+            grid = blk[:, None] * self.block + self._cols
+            inside = (grid >= lo[:, None]) & (grid < hi[:, None])
+            out = np.maximum(out, np.where(inside, self.vals[grid], -np.inf).max(axis=1))
+        length = bh - bl - 1
+        mid = length > 0
+        if mid.any():
+            k = np.floor(np.log2(length[mid])).astype(np.int64)
+            a = bl[mid] + 1
+            b = bh[mid] - (1 << k)
+            m = np.full(int(mid.sum()), -np.inf)
+            for kk in np.unique(k):
+                sel = k == kk
+                level = self.table[kk]
+                m[sel] = np.maximum(level[a[sel]], level[b[sel]])
+            out[mid] = np.maximum(out[mid], m)
+        out[empty] = -np.inf
+        return out
+
+
+def _per_tf(tfs: "np.ndarray", fn: Any) -> "np.ndarray":
+    uniq, inv = np.unique(tfs, return_inverse=True)
+    return np.array([fn(t) for t in uniq], dtype=np.float64)[inv] if len(uniq) else np.empty(0)
+
+
+def backfill_pair(cols: Dict[str, Any], idx: "np.ndarray", times: "np.ndarray", prices: "np.ndarray", bars_cfg: Any = 0) -> Dict[str, "np.ndarray"]:
+    """Outcome columns for signals ``idx`` (all of one pair) against that pair's tick series.
+
+    Returns outcome, hit index (-1 = none), time_to_hit_min, mae, mae_r.
+    """
+    n = len(idx)
+    ticks = len(times)
+    sides = np.asarray(cols["side"], dtype=object)[idx]
+    buy = sides == "BUY"
+    side_ok = buy | (sides == "SELL")
+    entry, sl, tp = cols["entry"][idx], cols["sl"][idx], cols["tp"][idx]
+    opened = _epochs([cols["signal_time"][i] for i in idx])
+    tfs = np.asarray(cols["tf"], dtype=object)[idx].astype(str)
+    tf_sec = _per_tf(tfs, lambda t: (tf_minutes(t) or 0) * 60)
+    bars = _per_tf(tfs, lambda t: expiry_bars(bars_cfg, t))
+
+    # Ticks before the close of the signal bar cannot close it (same rule as the watcher).
+    start = np.searchsorted(times, opened + tf_sec, side="left")
+    deadline = np.where(bars > 0, opened + tf_sec * (1 + bars), np.inf)
+    stop = np.minimum(np.searchsorted(times, deadline, side="right"), ticks)  # first tick after expiry
+
+    hi = BlockMax(prices)
+    lo = BlockMax(-prices)
+    valid = side_ok & ~np.isnan(entry) & ~np.isnan(sl) & ~np.isnan(tp) & ~np.isnan(opened)
+    # Level crossed upwards (BUY tp, SELL sl) and downwards (BUY sl, SELL tp); invalid rows never hit.
+    up = np.where(valid, np.where(buy, tp, sl), np.inf)
+    down = np.where(valid, np.where(buy, sl, tp), -np.inf)
+    i_up = np.empty(n, dtype=np.int64)
+    i_down = np.empty(n, dtype=np.int64)
+    for a in range(0, n, CHUNK):
+        s = slice(a, a + CHUNK)
+        i_up[s] = hi.first_at_least(start[s], up[s])
+        i_down[s] = lo.first_at_least(start[s], -down[s])
+    i_tp = np.where(buy, i_up, i_down)
+    i_sl = np.where(buy, i_down, i_up)
+
+    first = np.minimum(i_tp, i_sl)
+    hit = valid & (first < stop)
+    # MAE window: up to and including the hit tick, else every tick before expiry / end of data
+    end = np.where(hit, first + 1, stop)
+    worst = np.empty(n)
+    for a in range(0, n, CHUNK):
+        s = slice(a, a + CHUNK)
+        worst[s] = np.where(buy[s], -lo.range_max(start[s], end[s]), hi.range_max(start[s], end[s]))
+    seen = valid & (end > start)
+    mae = np.where(seen, np.maximum(0.0, np.where(buy, entry - worst, worst - entry)), np.nan)
+    risk = np.abs(entry - sl)
+
+    outcome = np.select(
+        [~valid, start >= ticks, hit & (i_sl <= i_tp), hit, stop < ticks],  # same tick: SL wins
+        ["INVALID", "NO_DATA", "SL_HIT", "TP_HIT", "EXPIRED"],
+        "OPEN",
+    )
+    j = np.where(hit, first, 0)
+    return {
+        "outcome": outcome,
+        "hit": np.where(hit, first, -1),
+        "time_to_hit_min": np.where(hit, np.round((times[j] - opened) / 60.0, 2) if ticks else np.nan, np.nan),
+        "mae": np.where(seen, np.round(mae, 6), np.nan),
+        "mae_r": np.where(seen & (risk > 0), np.round(mae / np.where(risk > 0, risk, 1.0), 3), np.nan),
+    }
+
+
+def _none(values: "np.ndarray") -> list:
+    return [None if v != v else v for v in values.tolist()]  # NaN -> None
+
+
+def backfill(signal_paths: List[str], price_paths: List[str], bars_cfg: Any = 0) -> List[Dict[str, Any]]:
+    cols = load_signals(signal_paths)
+    series = load_prices(price_paths)
+    total = len(cols["id"])
+    out: Dict[str, list] = {f: [None] * total for f in OUT_FIELDS[8:]}
+    pairs = np.asarray(cols["pair"], dtype=object)
+    for pair in sorted(set(cols["pair"])):
+        idx = np.flatnonzero(pairs == pair)
+        times, prices, stamps = series.get(pair, (np.empty(0), np.empty(0), []))
+        res = backfill_pair(cols, idx, times, prices, bars_cfg)
+        hits = res["hit"].tolist()
+        columns = {
+            "outcome": res["outcome"].tolist(),
+            "hit_price": [float(prices[h]) if h >= 0 else None for h in hits],
+            "hit_time": [stamps[h] if h >= 0 else None for h in hits],
+            "time_to_hit_min": _none(res["time_to_hit_min"]),
+            "mae": _none(res["mae"]),
+            "mae_r": _none(res["mae_r"]),
+        }
+        for name, values in columns.items():
+            col = out[name]
+            for i, v in zip(idx.tolist(), values):
+                col[i] = v
+    entry, sl, tp = (_none(cols[k]) for k in ("entry", "sl", "tp"))
+    return [
+        dict(zip(OUT_FIELDS, row))
+        for row in zip(cols["id"], cols["pair"], cols["tf"], cols["side"], entry, sl, tp, cols["signal_time"], *(out[f] for f in OUT_FIELDS[8:]))
+    ]
+
+
+def write_rows(rows: List[Dict[str, Any]], out_path: str) -> None:
+    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+    if out_path.lower().endswith(".csv"):
+        with open(out_path, "w", encoding="utf-8", newline="") as f:
+            w = csv.DictWriter(f, fieldnames=list(OUT_FIELDS))
+            w.writeheader()
+            w.writerows(rows)
+        return
+    with open(out_path, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+
+def summary(rows: List[Dict[str, Any]]) -> str:
+    counts = Counter(r["outcome"] for r in rows)
+    closed = counts["TP_HIT"] + counts["SL_HIT"]
+    lines = [f"signals={len(rows)} " + " ".join(f"{k}={v}" for k, v in sorted(counts.items()))]
+    if closed:
+        lines.append(f"winrate (TP / TP+SL) = {100.0 * counts['TP_HIT'] / closed:.1f}%")
+    for pair in sorted({r["pair"] for r in rows}):
+        pr = [r for r in rows if r["pair"] == pair]
+        c = Counter(r["outcome"] for r in pr)
+        mae_r = sorted(r["mae_r"] for r in pr if r["mae_r"] is not None)
+        med = f" median_mae_r={mae_r[len(mae_r) // 2]}" if mae_r else ""
+        lines.append(f"  {pair}: n={len(pr)} tp={c['TP_HIT']} sl={c['SL_HIT']} expired={c['EXPIRED']} open={c['OPEN']}{med}")
+    return "\n".join(lines)
+
+
+def _from_config(config_path: str) -> tuple[List[str], List[str], Any]:
+    from signal_watcher import feeds_from_config, load_config
+
+    cfg = load_config(config_path)
+    signals = [f["segments"] or f["signal_file"] for f in feeds_from_config(cfg)]
+    monitor = cfg.get("monitoring", {})
+    price = str(monitor.get("price_file", "") or "")
+    return signals, [price + "*"] if price else [], monitor.get("expiry_bars", 0)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute TP/SL outcomes of past signals from the archived price feed")
+    parser.add_argument("--signals", nargs="*", default=[], help="Signal JSONL files / globs")
+    parser.add_argument("--prices", nargs="*", default=[], help="Price JSONL files / globs (archives, rotated files)")
+    parser.add_argument("--config", help="Take feeds, price_file (+ rotated copies) and expiry_bars from a watcher config")
+    parser.add_argument("--expiry-bars", type=int, help="Override monitoring.expiry_bars (0 = no expiry)")
+    parser.add_argument("--out", default="../logs/outcomes.jsonl", help=".jsonl or .csv")
+    args = parser.parse_args()
+    if np is None:
+        raise SystemExit("backfill_outcomes needs NumPy: pip install numpy")
+
+    sig_pats, price_pats, bars = (_from_config(args.config) if args.config else ([], [], 0))
+    sig_paths = _paths(args.signals or sig_pats)
+    price_paths = _paths(args.prices or price_pats)
+    if args.expiry_bars is not None:
+        bars = args.expiry_bars
+    if not sig_paths or not price_paths:
+        raise SystemExit("Need --signals and --prices (or --config)")
+
+    t0 = time.perf_counter()
+    result = backfill(sig_paths, price_paths, bars)
+    write_rows(result, args.out)
+    print(summary(result))
+    print(f"{len(result)} outcome(s) -> {args.out} in {time.perf_counter() - t0:.2f}s")
@@ -0,0 +1,156 @@
+import argparse
+import json
+import random
+import threading
+import time
+from typing import Dict, List
+
+SIDES = ("BUY", "SELL")
+
+
+def make_signal(seq: int, pair: str, tf: str, price: float, rand: random.Random, run_id: str = "BENCH") -> Dict:
+    side = rand.choice(SIDES)
+    risk = price * 0.002
+    sl = price - risk if side == "BUY" else price + risk
+    tp = price + 3 * risk if side == "BUY" else price - 3 * risk
+    return {
+        "id": f"{run_id}-{pair}-{seq}",
+        "pair": pair,
+        "tf": tf,
+        "side": side,
+        "entry": round(price, 5),
+        "sl": round(sl, 5),
+        "tp": round(tp, 5),
+        "rr": "1:3",
+        "adx": round(rand.uniform(20, 45), 2),
+        "rsi": round(rand.uniform(25, 75), 2),
+        "signal_time": time.strftime("%Y.%m.%d %H:%M"),
+        "emit_ts": round(time.time(), 3),
+        "source": "bench",
+    }
+
+
+def schedule(shape: str, rate: float, duration: float, burst_size: int = 10, burst_every: float = 5.0) -> List[float]:
+    """Offsets (seconds from start) at which to write one signal each.
+
+    steady: ``rate`` signals/sec evenly spaced; burst: ``burst_size`` signals
+    at once every ``burst_every`` sec (bar close on many pairs); ramp: rate
+    grows linearly from ~0 to ``rate`` over ``duration``.
+    """
+    out: List[float] = []
+    if shape == "burst":
+        t = 0.0
+        while t < duration:
+            out.extend([t] * max(1, int(burst_size)))
+            t += max(0.01, burst_every)
+        return out
+    if rate <= 0:
+        return out
+    if shape == "ramp":
+        # n(t) = rate * t^2 / (2 * duration)  ->  t_k = sqrt(2 * duration * k / rate)
+        k = 1
+        while True:
+            t = (2.0 * duration * k / rate) ** 0.5
+            if t >= duration:
+                return out
+            out.append(t)
+            k += 1
+    n = int(rate * duration)
+    return [i / rate for i in range(n)]
+
+
+class LoadGenerator:
+    """Appends synthetic signals (and optionally ticks) to JSONL files like the EA does."""
+
+    def __init__(
+        self,
+        signal_file: str,
+        pairs: List[str],
+        tf: str = "PERIOD_M5",
+        price_file: str = "",
+        tick_rate: float = 0.0,
+        seed: int = 7,
+        run_id: str = "BENCH",
+    ):
+        self.signal_file = signal_file
+        self.pairs = list(pairs)
+        self.tf = tf
+        self.price_file = price_file
+        self.tick_rate = float(tick_rate)
+        self.run_id = run_id
+        self._rand = random.Random(seed)
+        self._prices = {p: 100.0 + 10 * i for i, p in enumerate(self.pairs)}
+        self._stop = threading.Event()
+        self.written = 0
+
+    def _append(self, path: str, rows: List[Dict]) -> None:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in rows))
+
+    def _walk(self, pair: str) -> float:
+        px = self._prices[pair] * (1 + self._rand.gauss(0, 0.0004))
+        self._prices[pair] = px
+        return px
+
+    def run_signals(self, offsets: List[float]) -> None:
+        start = time.monotonic()
+        i = 0
+        while i < len(offsets) and not self._stop.is_set():
+            wait = offsets[i] - (time.monotonic() - start)
+            if wait > 0:
+                time.sleep(wait)
+            # everything due now goes out in one write, like a bar close
+            rows = []
+            now = time.monotonic() - start
+            while i < len(offsets) and offsets[i] <= now:
+                pair = self.pairs[i % len(self.pairs)]
+                rows.append(make_signal(i, pair, self.tf, self._walk(pair), self._rand, self.run_id))
+                i += 1
+            self._append(self.signal_file, rows)
+            self.written += len(rows)
+
+    def run_ticks(self) -> None:
+        if not self.price_file or self.tick_rate <= 0:
+            return
+        interval = 1.0 / self.tick_rate
+        while not self._stop.wait(interval):
+            t = time.strftime("%Y.%m.%d %H:%M:%S")
+            rows = []
+            for pair in self.pairs:
+                px = self._walk(pair)
+                rows.append({"pair": pair, "price": round(px, 5), "bid": round(px, 5), "ask": round(px * 1.0001, 5), "time": t})
+            self._append(self.price_file, rows)
+
+    def start_ticks(self) -> threading.Thread:
+        th = threading.Thread(target=self.run_ticks, name="bench-ticks", daemon=True)
+        th.start()
+        return th
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Write synthetic AlphaLyceum signals/prices at a given rate")
+    ap.add_argument("--signal-file", required=True)
+    ap.add_argument("--price-file", default="")
+    ap.add_argument("--pairs", default="BTCUSD.vx,XAUUSD.vx")
+    ap.add_argument("--tf", default="PERIOD_M5")
+    ap.add_argument("--shape", choices=["steady", "burst", "ramp"], default="steady")
+    ap.add_argument("--rate", type=float, default=5.0, help="signals/sec (steady, ramp peak)")
+    ap.add_argument("--burst-size", type=int, default=10)
+    ap.add_argument("--burst-every", type=float, default=5.0)
+    ap.add_argument("--duration", type=float, default=30.0)
+    ap.add_argument("--tick-rate", type=float, default=0.0, help="price rows/sec per pair")
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    gen = LoadGenerator(args.signal_file, args.pairs.split(","), args.tf, args.price_file, args.tick_rate, args.seed)
+    gen.start_ticks()
+    gen.run_signals(schedule(args.shape, args.rate, args.duration, args.burst_size, args.burst_every))
+    gen.stop()
+    print(f"written={gen.written}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict
+
+from bench_load import LoadGenerator, schedule
+from latency_log import STAGES, read_records, report
+from telegram_stub import start_stub
+
+HERE = Path(__file__).resolve().parent
+
+# Permissive limiter so the benchmark measures the watcher, not Telegram's quotas.
+BENCH_RATE_LIMIT = {"global_per_sec": 1000, "global_burst": 1000, "group_per_min": 60000, "group_burst": 1000, "private_per_sec": 1000, "private_burst": 1000}
+
+
+def _merge(dst: Dict[str, Any], src: Dict[str, Any]) -> Dict[str, Any]:
+    for k, v in src.items():
+        if isinstance(v, dict) and isinstance(dst.get(k), dict):
+            _merge(dst[k], v)
+        else:
+            dst[k] = v
+    return dst
+
+
+def bench_config(workdir: Path, api_base: str, pairs: list[str], args: argparse.Namespace) -> Dict[str, Any]:
+    cfg = {
+        "signal_file": str(workdir / "signals.jsonl"),
+        "state_file": str(workdir / "state.json"),
+        "telegram": {
+            "purpose": "alphalyceum_trading_only",
+            "bot_token": "BENCH",
+            "chat_id": "@alphalyceum_bench",
+            "api_base": api_base,
+        },
+        "filters": {"allowed_symbols": pairs, "allowed_tf": args.tf},
+        "runtime": {"max_messages_per_run": args.max_per_run, "watch_heartbeat_sec": 5},
+        "monitoring": {"enabled": args.tick_rate > 0, "price_file": str(workdir / "prices.jsonl")},
+        "latency": {"log_file": str(workdir / "latency.jsonl")},
+    }
+    if not args.real_limits:
+        cfg["telegram"]["rate_limit"] = dict(BENCH_RATE_LIMIT)
+    if args.extra_config:
+        _merge(cfg, json.loads(Path(args.extra_config).read_text(encoding="utf-8")))
+    return cfg
+
+
+def _git_rev() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True, text=True, timeout=10)
+        return out.stdout.strip()
+    except Exception:
+        return ""
+
+
+def _wait_for(predicate, timeout: float, step: float = 0.1) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(step)
+    return predicate()
+
+
+def _count_lines(path: str) -> int:
+    try:
+        with open(path, "rb") as f:
+            return sum(1 for _ in f)
+    except OSError:
+        return 0
+
+
+def _child_cpu(proc: subprocess.Popen) -> tuple[float | None, Any]:
+    """CPU seconds (user+system) of the watcher; psutil when available, else rusage after exit."""
+    try:
+        import psutil  # optional
+
+        t = psutil.Process(proc.pid).cpu_times()
+        return t.user + t.system, None
+    except Exception:
+        pass
+    try:
+        import resource  # POSIX only
+
+        return None, resource.getrusage(resource.RUSAGE_CHILDREN)
+    except ImportError:
+        return None, None
+
+
+def run_bench(args: argparse.Namespace) -> Dict[str, Any]:
+    workdir = Path(args.workdir or tempfile.mkdtemp(prefix="alphalyceum_bench_"))
+    workdir.mkdir(parents=True, exist_ok=True)
+    pairs = [p for p in args.pairs.split(",") if p]
+
+    server, stub = start_stub(
+        latency_ms=args.stub_latency_ms,
+        jitter_ms=args.stub_jitter_ms,
+        p429=args.p429,
+        p5xx=args.p5xx,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    host, port = server.server_address[:2]
+    cfg = bench_config(workdir, f"http://{host}:{port}", pairs, args)
+    for key in ("signal_file", "state_file"):
+        Path(cfg[key]).unlink(missing_ok=True)
+    Path(cfg["signal_file"]).touch()
+    Path(cfg["monitoring"]["price_file"]).touch()
+    Path(cfg["latency"]["log_file"]).unlink(missing_ok=True)
+    Path(cfg["state_file"] + ".journal").unlink(missing_ok=True)
+    cfg_path = workdir / "bench_config.json"
+    cfg_path.write_text(json.dumps(cfg, indent=2), encoding="utf-8")
+
+    mode = "--daemon" if args.mode == "daemon" else "--watch"
+    log_path = workdir / "watcher.log"
+    before = _child_cpu_baseline()
+    with open(log_path, "w", encoding="utf-8") as wlog:
+        proc = subprocess.Popen(
+            [sys.executable, "-u", str(HERE / "run_phase1.py"), mode, "--config", str(cfg_path)],
+            cwd=HERE,
+            stdout=wlog,
+            stderr=subprocess.STDOUT,
+        )
+    try:
+        if not _wait_for(lambda: "mode started" in log_path.read_text(encoding="utf-8", errors="replace"), 30):
+            raise RuntimeError(f"watcher did not start, see {log_path}")
+
+        offsets = schedule(args.shape, args.rate, args.duration, args.burst_size, args.burst_every)
+        gen = LoadGenerator(cfg["signal_file"], pairs, args.tf, cfg["monitoring"]["price_file"], args.tick_rate, args.seed)
+        gen.start_ticks()
+        t0 = time.time()
+        feeder = threading.Thread(target=gen.run_signals, args=(offsets,), name="bench-signals")
+        feeder.start()
+        feeder.join()
+        lat_file = cfg["latency"]["log_file"]
+        drained = _wait_for(lambda: _count_lines(lat_file) >= gen.written, args.drain_timeout, step=0.2)
+        gen.stop()
+        elapsed = time.time() - t0
+        cpu_sec, _ = _child_cpu(proc)
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+        server.shutdown()
+    if cpu_sec is None:
+        cpu_sec = _child_cpu_since(before)
+
+    records = list(read_records(cfg["latency"]["log_file"]))
+    delivered = len(records)
+    first_e = min((r["e"] for r in records), default=0)
+    last_a = max((r["a"] for r in records), default=0)
+    span = (last_a - first_e) / 1000.0 if records else 0.0
+    latency = {}
+    for stage in STAGES:
+        rows = report(records, by="tf", stage=stage)
+        latency[stage] = {k: rows[-1][k] for k in ("p50", "p95", "p99", "max")} if rows else {}
+
+    return {
+        "version": _git_rev(),
+        "at": datetime.now().isoformat(timespec="seconds"),
+        "params": {k: v for k, v in vars(args).items() if k not in ("compare", "out")},
+        "written": gen.written,
+        "delivered": delivered,
+        "drained": drained,
+        "elapsed_sec": round(elapsed, 3),
+        "signals_per_sec": round(delivered / span, 2) if span > 0 else None,
+        "latency_ms": latency,
+        "cpu_sec": round(cpu_sec, 3) if cpu_sec is not None else None,
+        "cpu_ms_per_signal": round(cpu_sec * 1000 / delivered, 3) if cpu_sec is not None and delivered else None,
+        "stub": stub.stats(),
+        "workdir": str(workdir),
+    }
+
+
+def _child_cpu_baseline() -> float | None:
+    try:
+        import resource
+
+        ru = resource.getrusage(resource.RUSAGE_CHILDREN)
+        return ru.ru_utime + ru.ru_stime
+    except ImportError:
+        return None
+
+
+def _child_cpu_since(before: float | None) -> float | None:
+    # Includes watcher start-up; only used when psutil is not installed.
+    if before is None:
+        return None
+    now = _child_cpu_baseline()
+    return None if now is None else now - before
+
+
+def compare(paths: list[str]) -> None:
+    runs = [json.loads(Path(p).read_text(encoding="utf-8")) for p in paths]
+    rows = [
+        ("version", lambda r: r.get("version") or "-"),
+        ("delivered/written", lambda r: f"{r['delivered']}/{r['written']}"),
+        ("signals/sec", lambda r: r.get("signals_per_sec")),
+        ("total p50 ms", lambda r: r["latency_ms"].get("total", {}).get("p50")),
+        ("total p95 ms", lambda r: r["latency_ms"].get("total", {}).get("p95")),
+        ("total p99 ms", lambda r: r["latency_ms"].get("total", {}).get("p99")),
+        ("read p95 ms", lambda r: r["latency_ms"].get("read", {}).get("p95")),
+        ("queue p95 ms", lambda r: r["latency_ms"].get("queue", {}).get("p95")),
+        ("cpu ms/signal", lambda r: r.get("cpu_ms_per_signal")),
+        ("stub 429/5xx", lambda r: f"{r['stub']['counts']['429']}/{r['stub']['counts']['5xx']}"),
+    ]
+    print(f"{'':<20}" + "".join(f"{Path(p).stem[-24:]:>26}" for p in paths))
+    for label, get in rows:
+        print(f"{label:<20}" + "".join(f"{str(get(r)):>26}" for r in runs))
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Benchmark signal_watcher against a local Telegram stub")
+    ap.add_argument("--compare", nargs="+", metavar="RESULT_JSON", help="print saved results side by side and exit")
+    ap.add_argument("--mode", choices=["daemon", "watch"], default="daemon")
+    ap.add_argument("--pairs", default="BTCUSD.vx,XAUUSD.vx,EURUSD.vx,GBPUSD.vx")
+    ap.add_argument("--tf", default="PERIOD_M5")
+    ap.add_argument("--shape", choices=["steady", "burst", "ramp"], default="burst")
+    ap.add_argument("--rate", type=float, default=20.0, help="signals/sec (steady, ramp peak)")
+    ap.add_argument("--burst-size", type=int, default=20)
+    ap.add_argument("--burst-every", type=float, default=2.0)
+    ap.add_argument("--duration", type=float, default=20.0)
+    ap.add_argument("--tick-rate", type=float, default=5.0, help="price rows/sec per pair (0 = monitoring off)")
+    ap.add_argument("--max-per-run", type=int, default=100)
+    ap.add_argument("--stub-latency-ms", type=float, default=50.0)
+    ap.add_argument("--stub-jitter-ms", type=float, default=20.0)
+    ap.add_argument("--p429", type=float, default=0.0)
+    ap.add_argument("--p5xx", type=float, default=0.0)
+    ap.add_argument("--retry-after", type=int, default=1)
+    ap.add_argument("--real-limits", action="store_true", help="keep Telegram's rate limits (default: permissive)")
+    ap.add_argument("--extra-config", default="", help="JSON file merged into the generated watcher config")
+    ap.add_argument("--drain-timeout", type=float, default=60.0)
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--workdir", default="")
+    ap.add_argument("--out", default="", help="result JSON (default ../logs/bench/bench_<time>.json)")
+    args = ap.parse_args()
+
+    if args.compare:
+        compare(args.compare)
+        return
+
+    result = run_bench(args)
+    out = Path(args.out or HERE.parent / "logs" / "bench" / f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(result, indent=2), encoding="utf-8")
+    lat = result["latency_ms"].get("total", {})
+    print(
+        f"delivered={result['delivered']}/{result['written']} signals/sec={result['signals_per_sec']} "
+        f"total_ms p50={lat.get('p50')} p95={lat.get('p95')} p99={lat.get('p99')} "
+        f"cpu_ms/signal={result['cpu_ms_per_signal']} stub={result['stub']['counts']}"
+    )
+    print(f"saved: {out}")
+
+
+if __name__ == "__main__":
+    main()
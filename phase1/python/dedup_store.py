@@ -0,0 +1,128 @@
+import hashlib
+import math
+import os
+import struct
+from collections import OrderedDict
+from pathlib import Path
+from typing import Iterable, Iterator
+
+_BLOOM_MAGIC = b"ALBF"
+_BLOOM_HEAD = struct.Struct("<4sQII")
+
+
+class BloomFilter:
+    """Fixed-size bloom filter (no false negatives, tunable false positives)."""
+
+    def __init__(self, capacity: int = 200_000, error_rate: float = 1e-6):
+        capacity = max(1, int(capacity))
+        error_rate = min(max(float(error_rate), 1e-12), 0.5)
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str) -> Iterator[int]:
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1, h2 = struct.unpack("<QQ", digest)
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: str) -> None:
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: object) -> bool:
+        if not isinstance(key, str):
+            return False
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def save(self, path: str) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(_BLOOM_HEAD.pack(_BLOOM_MAGIC, self.num_bits, self.num_hashes, self.count))
+            f.write(self.bits)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BloomFilter | None":
+        try:
+            with open(path, "rb") as f:
+                head = f.read(_BLOOM_HEAD.size)
+                magic, num_bits, num_hashes, count = _BLOOM_HEAD.unpack(head)
+                if magic != _BLOOM_MAGIC:
+                    return None
+                bits = bytearray(f.read())
+        except (OSError, struct.error):
+            return None
+        if len(bits) != (num_bits + 7) // 8:
+            return None
+        bf = cls.__new__(cls)
+        bf.num_bits = num_bits
+        bf.num_hashes = num_hashes
+        bf.bits = bits
+        bf.count = count
+        return bf
+
+
+class DedupStore:
+    """Bounded set of sent signal IDs with insertion-order eviction.
+
+    Membership is O(1). When more than ``max_size`` IDs are held, the oldest
+    ones are evicted (into the optional bloom filter, so they still count as
+    seen over a long horizon).
+    """
+
+    def __init__(self, max_size: int = 2000, bloom: BloomFilter | None = None, bloom_file: str = ""):
+        self.max_size = max(1, int(max_size))
+        self.bloom = bloom
+        self.bloom_file = bloom_file
+        self._ids: "OrderedDict[str, None]" = OrderedDict()
+        self._bloom_dirty = False
+
+    @classmethod
+    def from_config(cls, ids: Iterable[str], runtime_cfg: dict) -> "DedupStore":
+        bloom = None
+        bloom_file = str(runtime_cfg.get("dedup_bloom_file", "") or "").strip()
+        if bloom_file:
+            bloom = BloomFilter.load(bloom_file) if os.path.exists(bloom_file) else None
+            if bloom is None:
+                bloom = BloomFilter(
+                    capacity=int(runtime_cfg.get("dedup_bloom_capacity", 200_000)),
+                    error_rate=float(runtime_cfg.get("dedup_bloom_error_rate", 1e-6)),
+                )
+        store = cls(int(runtime_cfg.get("dedup_max_ids", 2000)), bloom=bloom, bloom_file=bloom_file)
+        for sid in ids:
+            store.add(str(sid))
+        return store
+
+    def add(self, sid: str) -> None:
+        if sid in self._ids:
+            return
+        self._ids[sid] = None
+        while len(self._ids) > self.max_size:
+            old, _ = self._ids.popitem(last=False)
+            if self.bloom is not None:
+                self.bloom.add(old)
+                self._bloom_dirty = True
+
+    def __contains__(self, sid: object) -> bool:
+        if sid in self._ids:
+            return True
+        return self.bloom is not None and sid in self.bloom
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._ids)
+
+    def to_list(self) -> list[str]:
+        """Recent IDs, oldest first (the order they were added)."""
+        return list(self._ids)
+
+    def save_bloom(self) -> None:
+        if self.bloom is not None and self.bloom_file and self._bloom_dirty:
+            self.bloom.save(self.bloom_file)
+            self._bloom_dirty = False
@@ -0,0 +1,96 @@
+from typing import Dict
+
+from signal_record import SignalRecord, tf_minutes, to_float
+from tick_path import tick_epoch
+
+Key = tuple[str, str, str]  # pair, tf, side
+
+
+def signal_atr(signal: SignalRecord) -> float | None:
+    """ATR of the signal bar: the EA's ``atr`` field, else the stop distance |entry - sl|."""
+    atr = to_float(signal.get("atr"))
+    if atr is not None and atr > 0:
+        return atr
+    if signal.entry is None or signal.sl is None:
+        return None
+    return abs(signal.entry - signal.sl)
+
+
+def _slot(signal: SignalRecord, bar_time: str = "") -> tuple[Key, int] | None:
+    """(pair, tf, side) and the bar number of ``bar_time`` (default signal_time); None without a usable time/TF."""
+    minutes = tf_minutes(signal.tf)
+    t = tick_epoch(bar_time or signal.signal_time)
+    if not minutes or t is None:
+        return None
+    key = (signal.pair, str(signal.tf).upper().replace("PERIOD_", ""), signal.side.upper())
+    return key, int(t // (minutes * 60))
+
+
+class DuplicateIndex:
+    """Open signals per (pair, tf, side), bucketed by signal bar.
+
+    ``match`` only looks at the ``window_bars`` + 1 buckets ending at the new
+    signal's bar (one small dict per bar), so a lookup costs the same however
+    many signals were sent before. A signal matches when its entry is within
+    ``atr_mult`` x ATR (see ``signal_atr``) of an indexed one. Signals are
+    indexed while open (under their last merged repeat's bar, ``repeat_time``,
+    if any); the watcher removes them on close.
+    """
+
+    def __init__(self, window_bars: int = 6, atr_mult: float = 0.5):
+        self.window_bars = max(0, int(window_bars))
+        self.atr_mult = max(0.0, float(atr_mult))
+        self._buckets: Dict[Key, Dict[int, Dict[str, float]]] = {}  # key -> bar -> {sid: entry}
+        self._where: Dict[str, tuple[Key, int]] = {}
+
+    @classmethod
+    def build(cls, window_bars: int, atr_mult: float, active_signals: Dict[str, SignalRecord]) -> "DuplicateIndex":
+        index = cls(window_bars, atr_mult)
+        for sid, sig in active_signals.items():
+            index.add(sid, sig, str(sig.get("repeat_time", "")))
+        return index
+
+    def add(self, sid: str, signal: SignalRecord, bar_time: str = "") -> None:
+        """Index ``signal``'s entry under the bar of ``bar_time`` (default: its own bar)."""
+        self.remove(sid)
+        slot = _slot(signal, bar_time)
+        if slot is None or signal.entry is None:
+            return
+        key, bar = slot
+        self._buckets.setdefault(key, {}).setdefault(bar, {})[sid] = signal.entry
+        self._where[sid] = slot
+
+    def remove(self, sid: str) -> None:
+        slot = self._where.pop(sid, None)
+        if slot is None:
+            return
+        key, bar = slot
+        bars = self._buckets[key]
+        bars[bar].pop(sid, None)
+        if not bars[bar]:
+            del bars[bar]
+            if not bars:
+                del self._buckets[key]
+
+    def match(self, signal: SignalRecord, sid: str = "") -> str | None:
+        """Id of an indexed signal ``signal`` duplicates (most recent bar first), or None."""
+        slot = _slot(signal)
+        atr = signal_atr(signal)
+        if slot is None or signal.entry is None or atr is None:
+            return None
+        key, bar = slot
+        bars = self._buckets.get(key)
+        if not bars:
+            return None
+        tol = self.atr_mult * atr
+        for b in range(bar, bar - self.window_bars - 1, -1):
+            for other, entry in bars.get(b, {}).items():
+                if other != sid and abs(entry - signal.entry) <= tol:
+                    return other
+        return None
+
+    def __contains__(self, sid: object) -> bool:
+        return sid in self._where
+
+    def __len__(self) -> int:
+        return len(self._where)
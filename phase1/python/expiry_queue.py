@@ -0,0 +1,78 @@
+import heapq
+from typing import Any, Dict
+
+from signal_record import SignalRecord, tf_minutes
+from tick_path import not_before
+
+
+def expiry_bars(bars_cfg: Any, tf: str) -> int:
+    """monitoring.expiry_bars: one number for every TF, or {"PERIOD_M5": 36, "default": 0}."""
+    if isinstance(bars_cfg, dict):
+        value = bars_cfg.get(tf, bars_cfg.get(str(tf).replace("PERIOD_", ""), bars_cfg.get("default", 0)))
+    else:
+        value = bars_cfg
+    try:
+        return max(0, int(value or 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+class ExpiryQueue:
+    """Min-heap of (deadline, sid) for open signals that have an expiry.
+
+    The deadline is ``expiry_bars`` bars after the signal bar closed, in the
+    same (broker, naive) seconds as tick times. ``pop_due(now)`` only touches
+    the entries that are due; closed signals are dropped lazily.
+    """
+
+    def __init__(self, bars_cfg: Any = 0):
+        self.bars_cfg = bars_cfg
+        self._heap: list[tuple[float, str]] = []
+        self._deadline: Dict[str, float] = {}
+
+    @classmethod
+    def build(cls, bars_cfg: Any, active_signals: Dict[str, SignalRecord]) -> "ExpiryQueue":
+        q = cls(bars_cfg)
+        for sid, sig in active_signals.items():
+            q.add(sid, sig)
+        return q
+
+    def deadline(self, signal: SignalRecord) -> float | None:
+        bars = expiry_bars(self.bars_cfg, signal.tf)
+        minutes = tf_minutes(signal.tf)
+        start = not_before(signal)
+        if not bars or not minutes or start == float("-inf"):
+            return None
+        return start + bars * minutes * 60
+
+    def add(self, sid: str, signal: SignalRecord) -> float | None:
+        d = self.deadline(signal)
+        if d is None:
+            self._deadline.pop(sid, None)
+            return None
+        self._deadline[sid] = d
+        heapq.heappush(self._heap, (d, sid))
+        return d
+
+    def remove(self, sid: str) -> None:
+        self._deadline.pop(sid, None)
+
+    def pop_due(self, now: float) -> list[str]:
+        """Signal ids whose deadline is <= ``now`` (earliest first)."""
+        out = []
+        while self._heap and self._heap[0][0] <= now:
+            d, sid = heapq.heappop(self._heap)
+            if self._deadline.get(sid) == d:
+                del self._deadline[sid]
+                out.append(sid)
+        return out
+
+    def expired(self, signal: SignalRecord, now: float) -> bool:
+        d = self.deadline(signal)
+        return d is not None and d <= now
+
+    def __contains__(self, sid: object) -> bool:
+        return sid in self._deadline
+
+    def __len__(self) -> int:
+        return len(self._deadline)
@@ -0,0 +1,190 @@
+import ctypes
+import ctypes.util
+import fnmatch
+import glob
+import os
+import select
+import socket
+import struct
+import sys
+import threading
+import time
+from typing import Iterable
+
+# inotify event masks (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+
+_WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT_HEAD = struct.Struct("iIII")
+
+
+def _stat_key(path: str) -> tuple | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns, st.st_ino)
+
+
+class _Inotify:
+    def __init__(self, dirs: Iterable[str]):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._libc = libc
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.wd_dir: dict[int, str] = {}
+        for d in dirs:
+            wd = libc.inotify_add_watch(self.fd, os.fsencode(d), _WATCH_MASK)
+            if wd < 0:
+                os.close(self.fd)
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {d}")
+            self.wd_dir[wd] = d
+
+    def read_paths(self) -> tuple[set[str], bool]:
+        out: set[str] = set()
+        overflow = False
+        while True:
+            try:
+                buf = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            if not buf:
+                break
+            pos = 0
+            while pos + _EVENT_HEAD.size <= len(buf):
+                wd, mask, _cookie, name_len = _EVENT_HEAD.unpack_from(buf, pos)
+                pos += _EVENT_HEAD.size
+                name = buf[pos : pos + name_len].rstrip(b"\0")
+                pos += name_len
+                if mask & IN_Q_OVERFLOW:
+                    overflow = True
+                    continue
+                d = self.wd_dir.get(wd)
+                if d and name:
+                    out.add(os.path.join(d, os.fsdecode(name)))
+        return out, overflow
+
+    def close(self) -> None:
+        try:
+            os.close(self.fd)
+        except OSError:
+            pass
+
+
+class FileChangeWatcher:
+    """Block until one of the watched files changes.
+
+    Uses inotify on Linux (watching the parent directories, so rotation and
+    re-creation are seen too) and falls back to stat polling elsewhere.
+    ``patterns`` are globs (e.g. daily signal segments); files matching them
+    are added to the watched set as they appear. ``notify(tag)`` (from any
+    thread) wakes ``wait`` up with ``tag`` in the returned set.
+    """
+
+    def __init__(self, paths: Iterable[str], poll_interval: float = 0.25, use_inotify: bool = True, patterns: Iterable[str] = ()):
+        self.paths = [os.path.abspath(p) for p in paths if p]
+        self.patterns = [os.path.abspath(p) for p in patterns if p]
+        self.poll_interval = max(0.01, float(poll_interval))
+        self._last = {p: _stat_key(p) for p in self.paths}
+        self._add_pattern_matches()
+        self._inotify: _Inotify | None = None
+        if use_inotify and sys.platform.startswith("linux"):
+            dirs = sorted({os.path.dirname(p) for p in self.paths + self.patterns if os.path.isdir(os.path.dirname(p))})
+            try:
+                self._inotify = _Inotify(dirs) if dirs else None
+            except (OSError, AttributeError):
+                self._inotify = None
+        # socketpair rather than a pipe: select() on Windows only takes sockets
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._tags: set[str] = set()
+        self._tags_lock = threading.Lock()
+
+    def notify(self, tag: str) -> None:
+        with self._tags_lock:
+            first = not self._tags
+            self._tags.add(tag)
+        if first:
+            try:
+                self._wake_w.send(b"\0")
+            except OSError:  # buffer full: a wakeup is already pending
+                pass
+
+    def _take_tags(self) -> set[str]:
+        try:
+            while self._wake_r.recv(4096):
+                pass
+        except OSError:
+            pass
+        with self._tags_lock:
+            tags, self._tags = self._tags, set()
+        return tags
+
+    @property
+    def backend(self) -> str:
+        return "inotify" if self._inotify else "polling"
+
+    def _add_pattern_matches(self) -> set[str]:
+        added = set()
+        for pat in self.patterns:
+            for p in glob.glob(pat):
+                p = os.path.abspath(p)
+                if p not in self._last:
+                    self.paths.append(p)
+                    self._last[p] = _stat_key(p)
+                    added.add(p)
+        return added
+
+    def _changed_by_stat(self) -> set[str]:
+        out = self._add_pattern_matches() if self.patterns else set()
+        for p in self.paths:
+            key = _stat_key(p)
+            if key != self._last.get(p):
+                self._last[p] = key
+                out.add(p)
+        return out
+
+    def wait(self, timeout: float | None = None) -> set[str]:
+        """Return the set of watched paths that changed; empty set on timeout."""
+        deadline = None if timeout is None else time.monotonic() + max(0.0, timeout)
+        while True:
+            changed = self._changed_by_stat() | self._take_tags()
+            if changed:
+                return changed
+
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return set()
+
+            if self._inotify:
+                # inotify wakes us up; the periodic stat pass also covers
+                # filesystems that do not deliver events (e.g. network shares).
+                step = 5.0 if remaining is None else min(remaining, 5.0)
+                ready, _, _ = select.select([self._inotify.fd, self._wake_r], [], [], step)
+                if self._inotify.fd in ready:
+                    hits, overflow = self._inotify.read_paths()
+                    if self.patterns and any(fnmatch.fnmatch(h, pat) for h in hits for pat in self.patterns):
+                        added = self._add_pattern_matches()
+                        if added:
+                            return added
+                    if overflow or (hits & set(self.paths)):
+                        changed = self._changed_by_stat()
+                        # An in-place rewrite can keep size and mtime (coarse clocks).
+                        return changed or ({p for p in self.paths if p in hits} if not overflow else set(self.paths))
+            else:
+                step = self.poll_interval if remaining is None else min(remaining, self.poll_interval)
+                select.select([self._wake_r], [], [], step)
+
+    def close(self) -> None:
+        self._wake_r.close()
+        self._wake_w.close()
+        if self._inotify:
+            self._inotify.close()
+            self._inotify = None
@@ -1,14 +1,29 @@
 import argparse
+import glob
 import json
+import os
+import time
 import uuid
+from collections import deque
 from datetime import datetime, timezone
 from pathlib import Path
 
-from signal_watcher import load_config, run_once, load_state
+from latency_log import percentile
+from signal_watcher import (
+    PROBE_PREFIX,
+    feeds_from_config,
+    load_config,
+    load_state,
+    log,
+    run_once,
+)
+from state_journal import journal_path
+from tail_reader import TailIndex
+from telegram_publisher import send_telegram_message, telegram_api_base
 
 
-def append_test_signal(signal_file: str, pair: str, tf: str) -> str:
-    test_id = f"HC-{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}"
+def append_test_signal(signal_file: str, pair: str, tf: str, source: str = "health_check") -> str:
+    test_id = f"{PROBE_PREFIX}{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}"
     now_iso = datetime.now(timezone.utc).isoformat()
 
     payload = {
@@ -23,7 +38,8 @@ def append_test_signal(signal_file: str, pair: str, tf: str) -> str:
         "adx": 35.0,
         "rsi": 60.0,
         "signal_time": now_iso,
-        "source": "health_check",
+        "emit_ts": round(time.time(), 3),
+        "source": source,
     }
 
     sf = Path(signal_file)
@@ -34,20 +50,33 @@ def append_test_signal(signal_file: str, pair: str, tf: str) -> str:
     return test_id
 
 
-def main(config_path: str = "../config/config.json") -> int:
-    cfg = load_config(config_path)
+def _probe_target(cfg: dict) -> tuple[str, str, str]:
+    """(signal_file, pair, tf) the probe is written to: canary.signal_file or the first feed."""
+    feed = feeds_from_config(cfg)[0]
+    path = str(cfg.get("canary", {}).get("signal_file", "") or "") or feed["signal_file"]
+    if feed["segments"] and not cfg.get("canary", {}).get("signal_file"):
+        # newest segment (names sort chronologically)
+        segs = sorted(p for p in glob.glob(feed["segments"]) if not p.endswith(".tmp"))
+        path = segs[-1] if segs else path
+    return path, sorted(feed["symbols"])[0], sorted(feed["tfs"])[0]
 
+
+def _check_purpose(cfg: dict) -> None:
     purpose = cfg.get("telegram", {}).get("purpose")
     if purpose != "alphalyceum_trading_only":
         raise ValueError(
             "Health-check blocked: telegram purpose must be 'alphalyceum_trading_only'"
         )
 
-    pair = cfg["filters"]["allowed_symbol"]
-    tf = cfg["filters"]["allowed_tf"]
+
+def main(config_path: str = "../config/config.json") -> int:
+    cfg = load_config(config_path)
+    _check_purpose(cfg)
+
+    signal_file, pair, tf = _probe_target(cfg)
 
     print("[1/3] Menulis test signal ke signal_file...")
-    test_id = append_test_signal(cfg["signal_file"], pair, tf)
+    test_id = append_test_signal(signal_file, pair, tf)
 
     print("[2/3] Menjalankan watcher sekali...")
     run_once(config_path)
@@ -67,8 +96,165 @@ def main(config_path: str = "../config/config.json") -> int:
     return 1
 
 
+class ProbeAckWatcher:
+    """Finds when the running watcher delivered a probe.
+
+    With latency.log_file the exact Telegram ack time is read from the
+    latency log; otherwise the probe id is looked up in the watcher state
+    and the time it was seen is used, which is only approximate (``exact``
+    False): late by up to one poll plus the state write. The state journal
+    is tailed from where the last poll stopped and the snapshot is only
+    re-read when the file changed, so a poll does not replay the whole state.
+    """
+
+    def __init__(self, cfg: dict):
+        self.state_file = cfg["state_file"]
+        lat = str(cfg.get("latency", {}).get("log_file", "") or "")
+        self.index = TailIndex(lat, key=lambda r: r.get("id"), match=lambda r: str(r.get("id", "")).startswith(PROBE_PREFIX)) if lat else None
+        self.exact = self.index is not None
+        self.journal = TailIndex(
+            journal_path(self.state_file),
+            key=lambda r: r.get("id"),
+            match=lambda r: r.get("op") == "sent" and str(r.get("id", "")).startswith(PROBE_PREFIX),
+        )
+        self._snapshot_id: tuple | None = None
+
+    def _in_snapshot(self, probe_id: str) -> bool:
+        # An unchanged snapshot cannot hold a probe injected since the last check.
+        try:
+            st = os.stat(self.state_file)
+        except OSError:
+            return False
+        snapshot_id = (st.st_mtime_ns, st.st_size)
+        if snapshot_id == self._snapshot_id:
+            return False
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                sent_ids = json.load(f).get("sent_ids", [])
+        except (OSError, ValueError):
+            return False  # mid-write: read again next poll
+        self._snapshot_id = snapshot_id
+        return probe_id in set(sent_ids)
+
+    def acked_at(self, probe_id: str) -> float | None:
+        if self.index is not None and os.path.exists(self.index.path):
+            hit = self.index.recent(probe_id, 1)
+            if hit:
+                return float(hit[0]["a"]) / 1000.0
+            return None
+        if self.journal.recent(probe_id, 1) or self._in_snapshot(probe_id):
+            return time.time()
+        return None
+
+
+def _send_ops(cfg: dict, text: str) -> None:
+    tg = cfg.get("telegram", {})
+    ops_chat = str(tg.get("ops_channel", "") or "")
+    if not ops_chat:
+        log(f"(no telegram.ops_channel) {text}")
+        return
+    try:
+        limit = bool((tg.get("rate_limit") or {}).get("enabled", True))
+        send_telegram_message(tg["bot_token"], ops_chat, text, api_base=telegram_api_base(cfg), limit=limit)
+    except Exception as e:
+        log(f"Ops alert failed: {e}")
+
+
+def _rolling_stats(window: deque) -> dict:
+    lat = sorted(x for x in window if x is not None)
+    lost = sum(1 for x in window if x is None)
+    n = len(window)
+    return {
+        "n": n,
+        "lost": lost,
+        "loss_pct": round(100.0 * lost / n, 1) if n else 0.0,
+        "p50": round(percentile(lat, 50), 3) if lat else None,
+        "p95": round(percentile(lat, 95), 3) if lat else None,
+        "p99": round(percentile(lat, 99), 3) if lat else None,
+        "max": round(lat[-1], 3) if lat else None,
+    }
+
+
+def canary(config_path: str = "../config/config.json", count: int = 0) -> int:
+    """Inject a probe every canary.interval_sec and track file -> watcher -> Telegram latency.
+
+    Needs a running watcher (--watch / --daemon) and canary.chat_id, so
+    probes never reach the public channel.
+    """
+    cfg = load_config(config_path)
+    _check_purpose(cfg)
+    ccfg = cfg.get("canary", {})
+    if not str(ccfg.get("chat_id", "") or "").strip():
+        raise ValueError("Canary blocked: set canary.chat_id (dedicated test chat) so probes stay out of the main channel")
+
+    interval = float(ccfg.get("interval_sec", 300))
+    timeout = float(ccfg.get("timeout_sec", 120))
+    window: deque = deque(maxlen=max(5, int(ccfg.get("window", 50))))
+    min_samples = int(ccfg.get("min_samples", 5))
+    p95_alert = float(ccfg.get("p95_alert_sec", 30))
+    loss_alert = float(ccfg.get("loss_alert_pct", 10))
+    cooldown = float(ccfg.get("alert_cooldown_min", 30)) * 60
+    stats_file = str(ccfg.get("stats_file", "") or "") or str(Path(cfg["state_file"]).with_name("canary_stats.json"))
+
+    acks = ProbeAckWatcher(cfg)
+    approx = "" if acks.exact else "~"
+    last_alert = 0.0
+    alerting = False
+    done = 0
+    log(f"Canary started: interval={interval}s timeout={timeout}s window={window.maxlen} -> chat {ccfg['chat_id']}")
+    if not acks.exact:
+        log("Canary: no latency.log_file, ack times are approximate (state_file polling, ~0.5s resolution)")
+    while True:
+        cycle_start = time.monotonic()
+        signal_file, pair, tf = _probe_target(cfg)
+        injected = time.time()
+        probe_id = append_test_signal(signal_file, pair, tf, source="canary")
+
+        latency = None
+        while time.time() - injected < timeout:
+            acked = acks.acked_at(probe_id)
+            if acked is not None:
+                latency = max(0.0, acked - injected)
+                break
+            time.sleep(0.5)
+        window.append(latency)
+
+        stats = _rolling_stats(window)
+        stats.update({
+            "updated_at": datetime.now().isoformat(timespec="seconds"), "last_id": probe_id, "last_latency_sec": latency,
+            "ack_source": "latency_log" if acks.exact else "state_poll_approx",
+        })
+        Path(stats_file).parent.mkdir(parents=True, exist_ok=True)
+        Path(stats_file).write_text(json.dumps(stats, indent=2), encoding="utf-8")
+        log(f"Canary probe {probe_id}: " + (f"{approx}{latency:.2f}s" if latency is not None else f"LOST (>{timeout:.0f}s)")
+            + f" | n={stats['n']} p50={stats['p50']} p95={stats['p95']} p99={stats['p99']} loss={stats['loss_pct']}%")
+
+        problems = []
+        if stats["n"] >= min_samples:
+            if stats["p95"] is not None and stats["p95"] > p95_alert:
+                problems.append(f"p95 {stats['p95']:.1f}s > {p95_alert:.0f}s")
+            if stats["loss_pct"] > loss_alert:
+                problems.append(f"loss {stats['loss_pct']}% > {loss_alert:.0f}%")
+        now = time.monotonic()
+        if problems and (not alerting or now - last_alert >= cooldown):
+            _send_ops(cfg, f"[CANARY] {' | '.join(problems)} (n={stats['n']}, p50={approx}{stats['p50']}s, p99={approx}{stats['p99']}s)")
+            alerting, last_alert = True, now
+        elif not problems and alerting:
+            _send_ops(cfg, f"[CANARY] recovered: p95={stats['p95']}s loss={stats['loss_pct']}% (n={stats['n']})")
+            alerting = False
+
+        done += 1
+        if count and done >= count:
+            return 0 if not problems else 1
+        time.sleep(max(0.0, interval - (time.monotonic() - cycle_start)))
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--config", default="../config/config.json")
+    parser.add_argument("--canary", action="store_true", help="Keep probing a running watcher (needs canary.chat_id)")
+    parser.add_argument("--count", type=int, default=0, help="Canary: stop after N probes (0 = forever)")
     args = parser.parse_args()
+    if args.canary:
+        raise SystemExit(canary(args.config, args.count))
     raise SystemExit(main(args.config))
@@ -0,0 +1,92 @@
+import threading
+import time
+from typing import Any, Dict
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# One keep-alive session per scheme://host so repeated calls (Telegram, Ollama,
+# OAuth, ForexFactory) reuse TCP/TLS connections instead of handshaking each time.
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 16
+
+_sessions: Dict[str, requests.Session] = {}
+_stats: Dict[str, Dict[str, float]] = {}
+_lock = threading.Lock()
+
+
+def _host_key(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+def session_for(url: str) -> requests.Session:
+    key = _host_key(url)
+    with _lock:
+        s = _sessions.get(key)
+        if s is None:
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE)
+            s.mount("http://", adapter)
+            s.mount("https://", adapter)
+            _sessions[key] = s
+        return s
+
+
+def _record(key: str, elapsed_ms: float, ok: bool) -> None:
+    with _lock:
+        st = _stats.get(key)
+        if st is None:
+            st = {"count": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0, "last_ms": 0.0}
+            _stats[key] = st
+        st["count"] += 1
+        if not ok:
+            st["errors"] += 1
+        st["total_ms"] += elapsed_ms
+        st["max_ms"] = max(st["max_ms"], elapsed_ms)
+        st["last_ms"] = elapsed_ms
+
+
+def request(method: str, url: str, **kwargs: Any) -> requests.Response:
+    """Same as requests.request, but on the pooled session for the URL's host."""
+    key = _host_key(url)
+    started = time.perf_counter()
+    ok = False
+    try:
+        r = session_for(url).request(method, url, **kwargs)
+        ok = r.status_code < 500
+        return r
+    finally:
+        _record(key, (time.perf_counter() - started) * 1000.0, ok)
+
+
+def get(url: str, **kwargs: Any) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs: Any) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def host_stats(reset: bool = False) -> Dict[str, Dict[str, float]]:
+    """Per-host call count, errors (exceptions / 5xx) and latency in ms."""
+    with _lock:
+        out = {}
+        for key, st in _stats.items():
+            row = dict(st)
+            row["avg_ms"] = round(st["total_ms"] / st["count"], 1) if st["count"] else 0.0
+            row["total_ms"] = round(st["total_ms"], 1)
+            row["max_ms"] = round(st["max_ms"], 1)
+            row["last_ms"] = round(st["last_ms"], 1)
+            out[key] = row
+        if reset:
+            _stats.clear()
+        return out
+
+
+def close_all() -> None:
+    with _lock:
+        for s in _sessions.values():
+            s.close()
+        _sessions.clear()
@@ -0,0 +1,148 @@
+import argparse
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List
+
+# Stages reported by the CLI: name -> (from field, to field)
+STAGES = {
+    "read": ("e", "r"),  # EA write -> watcher read
+    "queue": ("r", "s"),  # watcher read -> send start (batching, rate limit, outbox)
+    "telegram": ("s", "a"),  # send start -> Telegram ack
+    "total": ("e", "a"),
+}
+
+
+def _ms(t: float) -> int:
+    return int(round(float(t) * 1000))
+
+
+def signal_trace(signal: Dict[str, Any], sid: str, read_at: float, written_at: float = 0.0) -> Dict[str, Any]:
+    """Trace stub for one signal: id, pair, tf, EA write time and watcher read time (epoch ms).
+
+    The EA write time is ``emit_ts`` (TimeGMT epoch seconds written by the
+    EA); older EA builds do not have it, then the file mtime is used and the
+    record is flagged ``est``.
+    """
+    trace = {"id": sid, "p": str(signal.get("pair") or ""), "tf": str(signal.get("tf") or ""), "r": _ms(read_at)}
+    try:
+        trace["e"] = _ms(float(signal["emit_ts"]))
+    except (KeyError, TypeError, ValueError):
+        trace["e"] = _ms(written_at or read_at)
+        trace["est"] = 1
+    return trace
+
+
+class LatencyLog:
+    """Append-only JSONL of per-signal delivery timestamps (epoch ms).
+
+    One compact line per delivered signal:
+    ``{"id":..,"p":pair,"tf":..,"e":ea_write,"r":read,"s":send_start,"a":ack}``.
+    Safe to call from several sender threads.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+
+    def write(self, traces: Iterable[Dict[str, Any]], send_start: float, ack: float) -> None:
+        lines = []
+        for t in traces:
+            row = dict(t)
+            row["s"] = _ms(send_start)
+            row["a"] = _ms(ack)
+            lines.append(json.dumps(row, separators=(",", ":"), ensure_ascii=False))
+        if not lines:
+            return
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+
+
+def read_records(path: str, since_ms: int = 0) -> Iterator[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(rec, dict) and int(rec.get("a", 0)) >= since_ms:
+                yield rec
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, int(-(-q * len(sorted_values) // 100)) - 1))
+    return sorted_values[k]
+
+
+def _group_key(rec: Dict[str, Any], by: str) -> str:
+    if by == "pair":
+        return str(rec.get("p") or "-")
+    if by == "tf":
+        return str(rec.get("tf") or "-")
+    when = datetime.fromtimestamp(int(rec.get("e", 0)) / 1000, tz=timezone.utc)
+    if by == "day":
+        return when.strftime("%Y-%m-%d")
+    return when.strftime("%H:00 UTC")
+
+
+def report(records: Iterable[Dict[str, Any]], by: str = "pair", stage: str = "total") -> List[Dict[str, Any]]:
+    """p50/p95/p99/max (ms) of ``stage`` per group, plus an "ALL" row."""
+    a, b = STAGES[stage]
+    groups: Dict[str, List[float]] = {}
+    for rec in records:
+        try:
+            v = float(rec[b]) - float(rec[a])
+        except (KeyError, TypeError, ValueError):
+            continue
+        groups.setdefault(_group_key(rec, by), []).append(v)
+        groups.setdefault("ALL", []).append(v)
+    out = []
+    for key in sorted(groups, key=lambda k: (k == "ALL", k)):
+        vals = sorted(groups[key])
+        out.append(
+            {
+                by: key,
+                "n": len(vals),
+                "p50": percentile(vals, 50),
+                "p95": percentile(vals, 95),
+                "p99": percentile(vals, 99),
+                "max": vals[-1],
+            }
+        )
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="AlphaLyceum signal latency report (EA write -> Telegram ack)")
+    ap.add_argument("--file", required=True, help="latency log (config latency.log_file)")
+    ap.add_argument("--by", choices=["pair", "hour", "day", "tf"], default="pair", help="hour = UTC hour of day")
+    ap.add_argument("--stage", choices=list(STAGES), default="total")
+    ap.add_argument("--since-hours", type=float, default=0.0, help="only records acked in the last N hours")
+    ap.add_argument("--json", action="store_true")
+    args = ap.parse_args()
+
+    since_ms = _ms(time.time() - args.since_hours * 3600) if args.since_hours > 0 else 0
+    rows = report(read_records(args.file, since_ms), by=args.by, stage=args.stage)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return
+    print(f"stage={args.stage} ({STAGES[args.stage][0]} -> {STAGES[args.stage][1]}), ms")
+    print(f"{args.by:<14}{'n':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    for r in rows:
+        print(f"{r[args.by]:<14}{r['n']:>7}{r['p50']:>9.0f}{r['p95']:>9.0f}{r['p99']:>9.0f}{r['max']:>9.0f}")
+
+
+if __name__ == "__main__":
+    main()
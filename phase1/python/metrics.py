@@ -0,0 +1,193 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DELAY_BUCKETS = (0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 900.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _key(labels: Dict[str, str] | None) -> LabelKey:
+    return tuple(sorted((str(k), str(v)) for k, v in (labels or {}).items()))
+
+
+def _fmt_labels(key: LabelKey, extra: Iterable[Tuple[str, str]] = ()) -> str:
+    items = list(key) + list(extra)
+    if not items:
+        return ""
+    body = ",".join(f'{k}="{v}"'.replace("\n", " ") for k, v in ((k, v.replace("\\", "\\\\").replace('"', '\\"')) for k, v in items))
+    return "{" + body + "}"
+
+
+def _fmt_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._lock = threading.Lock()
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        super().__init__(name, help_text)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        k = _key(labels)
+        with self._lock:
+            self._values[k] = self._values.get(k, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(_key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{_fmt_labels(k)} {_fmt_value(v)}" for k, v in sorted(self._values.items())]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str):
+        super().__init__(name, help_text)
+        self._values: Dict[LabelKey, float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[_key(labels)] = float(value)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{_fmt_labels(k)} {_fmt_value(v)}" for k, v in sorted(self._values.items())]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text)
+        self.buckets = sorted(float(b) for b in buckets)
+        self._series: Dict[LabelKey, List[float]] = {}  # bucket counts..., sum, count
+
+    def observe(self, value: float, **labels: str) -> None:
+        k = _key(labels)
+        with self._lock:
+            row = self._series.get(k)
+            if row is None:
+                row = [0.0] * (len(self.buckets) + 2)
+                self._series[k] = row
+            for i, b in enumerate(self.buckets):
+                if value <= b:
+                    row[i] += 1
+            row[-2] += value
+            row[-1] += 1
+
+    def render(self) -> List[str]:
+        out = []
+        with self._lock:
+            for k, row in sorted(self._series.items()):
+                for i, b in enumerate(self.buckets):
+                    out.append(f"{self.name}_bucket{_fmt_labels(k, [('le', _fmt_value(b))])} {_fmt_value(row[i])}")
+                out.append(f"{self.name}_bucket{_fmt_labels(k, [('le', '+Inf')])} {_fmt_value(row[-1])}")
+                out.append(f"{self.name}_sum{_fmt_labels(k)} {_fmt_value(row[-2])}")
+                out.append(f"{self.name}_count{_fmt_labels(k)} {_fmt_value(row[-1])}")
+        return out
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, help_text: str, **kwargs) -> _Metric:
+        with self._lock:
+            m = self._metrics.get(name)
+            if m is None:
+                m = cls(name, help_text, **kwargs)
+                self._metrics[name] = m
+            return m
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        return self._get(Counter, name, help_text)
+
+    def gauge(self, name: str, help_text: str) -> Gauge:
+        return self._get(Gauge, name, help_text)
+
+    def histogram(self, name: str, help_text: str, buckets: Iterable[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help_text, buckets=buckets)
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for m in metrics:
+            lines.append(f"# HELP {m.name} {m.help}")
+            lines.append(f"# TYPE {m.name} {m.kind}")
+            lines.extend(m.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# V1 watcher metrics (process-wide; updated by signal_watcher / telegram_publisher)
+SCANNED_LINES = REGISTRY.counter("alphalyceum_scanned_lines_total", "Signal file lines read by the watcher")
+MESSAGES_SENT = REGISTRY.counter("alphalyceum_messages_sent_total", "Telegram messages delivered (kind=outbox: sent by the delivery worker)")
+MESSAGES_FAILED = REGISTRY.counter("alphalyceum_messages_failed_total", "Telegram deliveries that failed after retries")
+MESSAGES_RETRIED = REGISTRY.counter("alphalyceum_messages_retried_total", "Telegram API calls retried (429, 5xx, network)")
+SIGNALS_SUPPRESSED = REGISTRY.counter("alphalyceum_signals_suppressed_total", "New signals dropped/merged as repeats of an open signal")
+LIFECYCLE_CLOSES = REGISTRY.counter("alphalyceum_lifecycle_closes_total", "Signals closed by TP/SL")
+CYCLE_SECONDS = REGISTRY.histogram("alphalyceum_cycle_duration_seconds", "Duration of one watcher cycle")
+TELEGRAM_SECONDS = REGISTRY.histogram("alphalyceum_telegram_call_seconds", "Latency of one Telegram API call")
+FILE_TO_SEND_SECONDS = REGISTRY.histogram(
+    "alphalyceum_file_to_send_seconds",
+    "Signal file write (mtime) to successful send",
+    buckets=DELAY_BUCKETS,
+)
+BACKLOG_BYTES = REGISTRY.gauge("alphalyceum_backlog_bytes", "Unread bytes per feed (file_size - offset)")
+OPEN_SIGNALS = REGISTRY.gauge("alphalyceum_open_signals", "Signals tracked for TP/SL")
+OUTBOX_BACKLOG = REGISTRY.gauge("alphalyceum_outbox_backlog", "Outbox rows pending or in flight")
+QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "alphalyceum_queue_wait_seconds",
+    "Outbound message queued to send start, per priority class",
+    buckets=DELAY_BUCKETS,
+)
+DEADLINE_MISSES = REGISTRY.counter("alphalyceum_deadline_misses_total", "Outbound messages that started after their class deadline")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    registry: Registry = REGISTRY
+
+    def do_GET(self) -> None:
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        # keep the watcher log clean (watchdog reads it)
+        pass
+
+
+def start_metrics_server(host: str = "127.0.0.1", port: int = 9108) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, int(port)), _Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
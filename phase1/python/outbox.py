@@ -0,0 +1,323 @@
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    dedup_key TEXT UNIQUE,
+    kind TEXT NOT NULL,
+    chat_id TEXT NOT NULL,
+    text TEXT NOT NULL,
+    meta TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    created_at REAL NOT NULL,
+    claimed_at REAL,
+    sent_at REAL,
+    last_error TEXT,
+    priority INTEGER NOT NULL DEFAULT 1,
+    after_key TEXT
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at);
+"""
+
+# Columns added after the first release; older outbox files are migrated on open.
+_MIGRATIONS = {
+    "priority": "ALTER TABLE outbox ADD COLUMN priority INTEGER NOT NULL DEFAULT 1",
+    "after_key": "ALTER TABLE outbox ADD COLUMN after_key TEXT",
+}
+
+# A row is ready once its after_key message is no longer waiting (sent, dead or unknown).
+_READY = (
+    "status='pending' AND next_attempt_at <= ? AND (after_key IS NULL OR NOT EXISTS ("
+    "SELECT 1 FROM outbox AS dep WHERE dep.dedup_key = outbox.after_key AND dep.status IN ('pending', 'sending')))"
+)
+
+DEFAULT_RETRY_SCHEDULE = [2, 5, 15, 30, 60, 120, 300]
+
+
+def _ts() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def log(msg: str) -> None:
+    print(f"[{_ts()}] {msg}", flush=True)
+
+
+class Outbox:
+    """Durable queue of outgoing Telegram messages (SQLite in WAL mode).
+
+    Ingest only enqueues; delivery workers claim due rows, send them and
+    mark them sent or schedule a retry. Rows for one chat are never claimed
+    while another row of that chat is in flight, so per-chat order holds
+    with several workers. Within a chat, rows go by ``priority`` (0 =
+    results, 1 = signals, 2 = ops) and then by id; a row with ``after_key``
+    waits until that message is delivered, so a result never overtakes
+    its own signal. Each thread gets its own SQLite connection.
+    """
+
+    def __init__(self, path: str, lease_sec: float = 120.0):
+        self.path = path
+        self.lease_sec = float(lease_sec)
+        self._local = threading.local()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        conn = self._conn()
+        conn.executescript(_SCHEMA)
+        have = {r["name"] for r in conn.execute("PRAGMA table_info(outbox)")}
+        for column, ddl in _MIGRATIONS.items():
+            if column not in have:
+                conn.execute(ddl)
+        # In-flight rows from a crashed process go back to the queue.
+        conn.execute(
+            "UPDATE outbox SET status='pending' WHERE status='sending' AND claimed_at < ?",
+            (time.time() - self.lease_sec,),
+        )
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def enqueue(
+        self,
+        kind: str,
+        chat_id: str,
+        text: str,
+        dedup_key: str | None = None,
+        meta: Dict[str, Any] | None = None,
+        priority: int = 1,
+        after_key: str | None = None,
+    ) -> bool:
+        """Returns False when a row with the same dedup_key already exists."""
+        now = time.time()
+        cur = self._conn().execute(
+            "INSERT OR IGNORE INTO outbox (dedup_key, kind, chat_id, text, meta, next_attempt_at, created_at, priority, after_key) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (dedup_key, kind, str(chat_id), text, json.dumps(meta or {}, ensure_ascii=False), now, now, int(priority), after_key),
+        )
+        return cur.rowcount > 0
+
+    def claim(self, limit: int = 10) -> List[sqlite3.Row]:
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "UPDATE outbox SET status='pending' WHERE status='sending' AND claimed_at < ?",
+                (now - self.lease_sec,),
+            )
+            # the chat holding the most urgent ready row
+            first = conn.execute(
+                f"SELECT chat_id FROM outbox WHERE {_READY} "
+                "AND chat_id NOT IN (SELECT chat_id FROM outbox WHERE status='sending') "
+                "ORDER BY priority, id LIMIT 1",
+                (now,),
+            ).fetchone()
+            if first is None:
+                conn.execute("COMMIT")
+                return []
+            rows = conn.execute(
+                f"SELECT * FROM outbox WHERE {_READY} AND chat_id=? ORDER BY priority, id LIMIT ?",
+                (now, first["chat_id"], max(1, int(limit))),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE outbox SET status='sending', claimed_at=? WHERE id=?",
+                [(now, r["id"]) for r in rows],
+            )
+            conn.execute("COMMIT")
+            return rows
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def urgent_waiting(self, priority: int) -> bool:
+        """True when a ready row of a more urgent class (lower priority) is queued."""
+        row = self._conn().execute(
+            f"SELECT 1 FROM outbox WHERE {_READY} AND priority < ? LIMIT 1",
+            (time.time(), int(priority)),
+        ).fetchone()
+        return row is not None
+
+    def mark_sent(self, row_id: int) -> None:
+        self._conn().execute(
+            "UPDATE outbox SET status='sent', sent_at=?, attempts=attempts+1, last_error=NULL WHERE id=?",
+            (time.time(), row_id),
+        )
+
+    def mark_failed(self, row_id: int, error: str, retry_in: float | None) -> None:
+        """Schedule a retry after ``retry_in`` seconds, or mark dead when None."""
+        if retry_in is None:
+            self._conn().execute(
+                "UPDATE outbox SET status='dead', attempts=attempts+1, last_error=? WHERE id=?",
+                (error[:500], row_id),
+            )
+            return
+        self._conn().execute(
+            "UPDATE outbox SET status='pending', attempts=attempts+1, last_error=?, next_attempt_at=? WHERE id=?",
+            (error[:500], time.time() + max(0.0, retry_in), row_id),
+        )
+
+    def release(self, row_id: int) -> None:
+        # Back to the queue without counting an attempt (e.g. worker shutdown).
+        self._conn().execute("UPDATE outbox SET status='pending' WHERE id=? AND status='sending'", (row_id,))
+
+    def counts(self) -> Dict[str, int]:
+        rows = self._conn().execute("SELECT status, COUNT(*) AS n FROM outbox GROUP BY status").fetchall()
+        return {r["status"]: int(r["n"]) for r in rows}
+
+    def backlog(self) -> int:
+        row = self._conn().execute(
+            "SELECT COUNT(*) AS n FROM outbox WHERE status IN ('pending', 'sending')"
+        ).fetchone()
+        return int(row["n"])
+
+    def next_due_in(self) -> float | None:
+        row = self._conn().execute(
+            "SELECT MIN(next_attempt_at) AS t FROM outbox WHERE status='pending'"
+        ).fetchone()
+        if row is None or row["t"] is None:
+            return None
+        return max(0.0, float(row["t"]) - time.time())
+
+    def purge(self, keep_sent_sec: float = 7 * 86400) -> int:
+        cur = self._conn().execute(
+            "DELETE FROM outbox WHERE status='sent' AND sent_at < ?",
+            (time.time() - keep_sent_sec,),
+        )
+        return cur.rowcount
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+def retry_after_from_error(exc: Exception) -> float | None:
+    """Telegram 429 responses carry parameters.retry_after (seconds)."""
+    resp = getattr(exc, "response", None)
+    if resp is None or getattr(resp, "status_code", None) != 429:
+        return None
+    try:
+        return float(resp.json().get("parameters", {}).get("retry_after"))
+    except Exception:
+        return None
+
+
+def is_permanent_error(exc: Exception) -> bool:
+    # 400/401/403/404 from Telegram will not succeed on retry (bad chat, blocked bot, bad HTML).
+    resp = getattr(exc, "response", None)
+    code = getattr(resp, "status_code", None)
+    return code is not None and 400 <= int(code) < 500 and int(code) != 429
+
+
+class DeliveryWorker(threading.Thread):
+    """Drains the outbox with its own retry schedule, independent of ingest."""
+
+    def __init__(
+        self,
+        outbox: Outbox,
+        send: Callable[[str, str], None],
+        retry_schedule: List[float] | None = None,
+        max_attempts: int = 20,
+        poll_interval: float = 1.0,
+        batch: int = 10,
+        wakeup: threading.Event | None = None,
+        name: str = "outbox-worker",
+        on_sent: Callable[[sqlite3.Row, float, float], None] | None = None,
+        on_failed: Callable[[sqlite3.Row, Exception, float | None], None] | None = None,
+    ):
+        super().__init__(name=name, daemon=True)
+        self.outbox = outbox
+        self.send = send
+        self.retry_schedule = [float(x) for x in (retry_schedule or DEFAULT_RETRY_SCHEDULE)]
+        self.max_attempts = max(1, int(max_attempts))
+        self.poll_interval = float(poll_interval)
+        self.batch = max(1, int(batch))
+        self.wakeup = wakeup or threading.Event()
+        self.on_sent = on_sent
+        self.on_failed = on_failed
+        self._stopping = threading.Event()
+
+    def _retry_in(self, attempts: int, exc: Exception) -> float | None:
+        if is_permanent_error(exc) or attempts + 1 >= self.max_attempts:
+            return None
+        ra = retry_after_from_error(exc)
+        if ra is not None:
+            return max(1.0, ra)
+        return self.retry_schedule[min(attempts, len(self.retry_schedule) - 1)]
+
+    def drain_once(self, max_seconds: float | None = None) -> int:
+        """Send every due message; returns number delivered."""
+        delivered = 0
+        started = time.monotonic()
+        while not self._stopping.is_set():
+            rows = self.outbox.claim(self.batch)
+            if not rows:
+                break
+            for i, row in enumerate(rows):
+                if self._stopping.is_set() or (max_seconds is not None and time.monotonic() - started > max_seconds):
+                    for rest in rows[i:]:
+                        self.outbox.release(rest["id"])
+                    return delivered
+                if i > 0 and self.outbox.urgent_waiting(row["priority"]):
+                    # a result came in behind this batch: re-claim so it goes next
+                    for rest in rows[i:]:
+                        self.outbox.release(rest["id"])
+                    break
+                err: Exception | None = None
+                try:
+                    sent_start = time.time()
+                    self.send(row["chat_id"], row["text"])
+                    acked = time.time()
+                    self.outbox.mark_sent(row["id"])
+                    delivered += 1
+                    if self.on_sent is not None:
+                        try:
+                            self.on_sent(row, sent_start, acked)
+                        except Exception as e:
+                            log(f"Outbox on_sent hook error id={row['id']}: {e}")
+                except Exception as e:
+                    err = e
+                    retry_in = self._retry_in(int(row["attempts"]), e)
+                    self.outbox.mark_failed(row["id"], str(e), retry_in)
+                    state = "dead" if retry_in is None else f"retry in {retry_in:.0f}s"
+                    log(f"Outbox send failed id={row['id']} kind={row['kind']} chat={row['chat_id']}: {e} ({state})")
+                    if self.on_failed is not None:
+                        try:
+                            self.on_failed(row, e, retry_in)
+                        except Exception as hook_err:
+                            log(f"Outbox on_failed hook error id={row['id']}: {hook_err}")
+                    # keep the rest of this chat's batch in order behind the failed row
+                    for rest in rows[i + 1 :]:
+                        self.outbox.release(rest["id"])
+                if err is not None:
+                    break
+        return delivered
+
+    def run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                self.drain_once()
+            except Exception as e:
+                log(f"Outbox worker error: {e}")
+            due = self.outbox.next_due_in()
+            wait = self.poll_interval if due is None else min(self.poll_interval, due)
+            self.wakeup.wait(timeout=max(0.05, wait))
+            self.wakeup.clear()
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self.wakeup.set()
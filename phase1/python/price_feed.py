@@ -0,0 +1,216 @@
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, List
+
+
+def _ts() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _to_float(v: Any) -> float | None:
+    try:
+        if v is None or v == "":
+            return None
+        return float(v)
+    except Exception:
+        return None
+
+
+def _file_id(st: os.stat_result) -> list[int]:
+    return [int(st.st_dev), int(st.st_ino)]
+
+
+def parse_price_row(row: Dict[str, Any]) -> tuple[str, Dict[str, Any]] | None:
+    pair = str(row.get("pair") or row.get("symbol") or "").strip()
+    if not pair:
+        return None
+    price = _to_float(row.get("price") or row.get("bid") or row.get("last"))
+    if price is None:
+        return None
+    return pair, {"price": price, "time": str(row.get("time") or row.get("ts") or _ts())}
+
+
+def _parse_price_map_obj(obj: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    out = {}
+    for k, v in (obj or {}).items():
+        if isinstance(v, dict):
+            price = _to_float(v.get("price") or v.get("bid") or v.get("last"))
+            if price is not None:
+                out[str(k)] = {
+                    "price": price,
+                    "time": str(v.get("time") or v.get("ts") or _ts()),
+                }
+        else:
+            price = _to_float(v)
+            if price is not None:
+                out[str(k)] = {"price": price, "time": _ts()}
+    return out
+
+
+class PriceFeedReader:
+    """Incremental reader for the MT5 realtime price feed.
+
+    Supports the same two formats as before:
+    1) JSON object map: {"XAUUSD.vx": {"price": 4688.0, "time": "..."}, ...}
+       (small, rewritten in place -> re-read when size/mtime change)
+    2) JSONL rows appended by PublishRealtimePrice
+       (only bytes after the remembered offset are parsed)
+
+    Truncation (size < offset) and rotation (different file id) restart
+    reading at the top of the new file. A fresh reader, or one that fell
+    too far behind, only reads the last ``tail_bytes`` of the file.
+    """
+
+    def __init__(self, price_file: str, tail_bytes: int = 64 * 1024, max_catchup_bytes: int = 4 * 1024 * 1024):
+        self.path = price_file
+        self.tail_bytes = max(1024, int(tail_bytes))
+        self.max_catchup_bytes = max(self.tail_bytes, int(max_catchup_bytes))
+        self.offset: int | None = None
+        self.file_id: list[int] | None = None
+        self.latest: Dict[str, Dict[str, Any]] = {}
+        self.map_mode = False
+        self._map_key: tuple | None = None
+        self.rotations = 0
+        self._pushed: Dict[str, List[Dict[str, Any]]] = {}
+
+    @classmethod
+    def from_state(cls, price_file: str, saved: Dict[str, Any] | None, **kwargs: Any) -> "PriceFeedReader":
+        reader = cls(price_file, **kwargs)
+        saved = saved or {}
+        if saved.get("path") == price_file:
+            reader.offset = saved.get("offset")
+            reader.file_id = saved.get("file_id")
+            reader.latest = dict(saved.get("latest") or {})
+        return reader
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "offset": self.offset,
+            "file_id": self.file_id,
+            "latest": self.latest,
+        }
+
+    def price_map(self) -> Dict[str, Dict[str, Any]]:
+        return self.latest
+
+    def _detect_map(self, st: os.stat_result) -> bool:
+        # A single JSON object (possibly pretty-printed) rather than JSONL rows.
+        if st.st_size == 0 or st.st_size > 1024 * 1024:
+            return False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                raw = f.read().strip()
+            if not raw.startswith("{"):
+                return False
+            obj = json.loads(raw)
+        except Exception:
+            return False
+        return isinstance(obj, dict) and not parse_price_row(obj) and bool(_parse_price_map_obj(obj))
+
+    def _poll_map(self, st: os.stat_result) -> Dict[str, List[Dict[str, Any]]]:
+        key = (st.st_size, st.st_mtime_ns)
+        if key == self._map_key:
+            return {}
+        self._map_key = key
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                obj = json.loads(f.read().strip() or "{}")
+        except Exception:
+            return {}
+        rows = _parse_price_map_obj(obj) if isinstance(obj, dict) else {}
+        self.latest.update(rows)
+        return {pair: [tick] for pair, tick in rows.items()}
+
+    def push(self, ticks: Dict[str, List[Dict[str, Any]]]) -> None:
+        """Ticks that arrived another way (socket ingest); returned by the next poll()."""
+        for pair, rows in ticks.items():
+            if rows:
+                self._pushed.setdefault(pair, []).extend(rows)
+                self.latest[pair] = rows[-1]
+
+    def poll(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Parse newly appended rows; returns new ticks per pair (oldest first)."""
+        out = self._poll_file()
+        if self._pushed:
+            for pair, rows in self._pushed.items():
+                out.setdefault(pair, []).extend(rows)
+            self._pushed = {}
+        return out
+
+    def _poll_file(self) -> Dict[str, List[Dict[str, Any]]]:
+        if not self.path:
+            return {}
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return {}
+
+        fid = _file_id(st)
+        if self.offset is None or fid != self.file_id:
+            self.map_mode = self._detect_map(st)
+        if self.map_mode:
+            self.file_id = fid
+            self.offset = st.st_size
+            return self._poll_map(st)
+
+        size = st.st_size
+        skip_partial = False
+        if self.offset is None:
+            start = max(0, size - self.tail_bytes)
+            skip_partial = start > 0
+        elif fid != self.file_id or size < self.offset:
+            self.rotations += 1
+            start = 0
+            if size > self.max_catchup_bytes:
+                start = size - self.tail_bytes
+                skip_partial = True
+        elif size - self.offset > self.max_catchup_bytes:
+            start = size - self.tail_bytes
+            skip_partial = True
+        else:
+            start = self.offset
+        self.file_id = fid
+
+        if size <= start:
+            self.offset = start
+            return {}
+
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            data = f.read(size - start)
+
+        pos = 0
+        if skip_partial:
+            nl = data.find(b"\n")
+            if nl < 0:
+                self.offset = start
+                return {}
+            pos = nl + 1
+
+        # Never consume a half-written last line; it is re-read next poll.
+        end = data.rfind(b"\n")
+        if end < pos:
+            self.offset = start + pos
+            return {}
+        self.offset = start + end + 1
+
+        out: Dict[str, List[Dict[str, Any]]] = {}
+        for ln in data[pos:end].decode("utf-8", errors="replace").splitlines():
+            ln = ln.strip()
+            if not ln:
+                continue
+            try:
+                row = json.loads(ln)
+            except Exception:
+                continue
+            if not isinstance(row, dict):
+                continue
+            parsed = parse_price_row(row)
+            if not parsed:
+                continue
+            pair, tick = parsed
+            out.setdefault(pair, []).append(tick)
+            self.latest[pair] = tick
+        return out
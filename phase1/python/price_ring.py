@@ -0,0 +1,284 @@
+import argparse
+import json
+import mmap
+import os
+import struct
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List
+
+from price_feed import parse_price_row
+from tick_path import tick_epoch
+
+# File layout (little endian, fixed size, never grows):
+#   header  64 bytes: magic, version, max_pairs, depth, slot_size
+#   slot[i] slot_size bytes, one per pair, claimed in order:
+#     seq u64    seqlock counter: odd while the writer is inside the slot
+#     count u64  ticks ever written to this slot
+#     pair 24s   symbol, NUL padded (empty = free slot)
+#     ring[depth] of (price f64, bid f64, ask f64, time_ms i64), entry = (count - 1) % depth
+MAGIC = b"ALPRING1"
+VERSION = 1
+HEADER = struct.Struct("<8sIIII")
+HEADER_SIZE = 64
+SLOT_HEAD = struct.Struct("<QQ24s")
+SEQ = struct.Struct("<Q")
+ENTRY = struct.Struct("<dddq")
+PAIR_BYTES = 24
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def slot_size(depth: int) -> int:
+    raw = SLOT_HEAD.size + ENTRY.size * depth
+    return (raw + 63) // 64 * 64
+
+
+def _time_ms(value: Any) -> int:
+    """Tick time (broker time string or epoch seconds) -> naive epoch ms, same clock as tick_path."""
+    if isinstance(value, (int, float)):
+        return int(float(value) * 1000)
+    t = tick_epoch(str(value or ""))
+    if t is None:
+        t = (datetime.now() - _EPOCH).total_seconds()
+    return int(t * 1000)
+
+
+def _time_str(ms: int) -> str:
+    return (_EPOCH + timedelta(milliseconds=ms)).strftime("%Y.%m.%d %H:%M:%S")
+
+
+class PriceRingWriter:
+    """Reference writer (tests, replay of recorded JSONL feeds); the layout is what an EA would write.
+
+    The shipped EA does not write a ring (it writes the price_file JSONL); a
+    live producer is a separate process, e.g. ``--replay`` over that file.
+
+    A new pair claims the next free slot; writes to a slot are wrapped in a
+    seqlock (seq odd while writing) so readers never see a half-written tick.
+    """
+
+    def __init__(self, path: str, max_pairs: int = 32, depth: int = 64):
+        self.path = path
+        if os.path.exists(path) and os.path.getsize(path) >= HEADER_SIZE:
+            with open(path, "rb") as f:
+                magic, version, max_pairs, depth, _ = HEADER.unpack_from(f.read(HEADER_SIZE))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a price ring file")
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, "wb") as f:
+                head = HEADER.pack(MAGIC, VERSION, max_pairs, depth, slot_size(depth))
+                f.write(head.ljust(HEADER_SIZE, b"\0"))
+                f.truncate(HEADER_SIZE + max_pairs * slot_size(depth))
+        self.max_pairs = int(max_pairs)
+        self.depth = int(depth)
+        self.slot_size = slot_size(self.depth)
+        self._f = open(path, "r+b")
+        self._mm = mmap.mmap(self._f.fileno(), HEADER_SIZE + self.max_pairs * self.slot_size)
+        self._slots: Dict[str, int] = {}
+        for i in range(self.max_pairs):
+            _, _, raw = SLOT_HEAD.unpack_from(self._mm, HEADER_SIZE + i * self.slot_size)
+            pair = raw.rstrip(b"\0").decode("utf-8", errors="replace")
+            if pair:
+                self._slots[pair] = i
+
+    def _slot(self, pair: str) -> int:
+        idx = self._slots.get(pair)
+        if idx is not None:
+            return idx
+        if len(self._slots) >= self.max_pairs:
+            raise ValueError(f"Price ring full ({self.max_pairs} pairs)")
+        idx = len(self._slots)
+        base = HEADER_SIZE + idx * self.slot_size
+        SLOT_HEAD.pack_into(self._mm, base, 0, 0, pair.encode("utf-8")[:PAIR_BYTES])
+        self._slots[pair] = idx
+        return idx
+
+    def write(self, pair: str, price: float, time_value: Any = None, bid: float | None = None, ask: float | None = None) -> None:
+        base = HEADER_SIZE + self._slot(pair) * self.slot_size
+        seq, count, _ = SLOT_HEAD.unpack_from(self._mm, base)
+        SEQ.pack_into(self._mm, base, seq + 1)  # odd: write in progress
+        entry = base + SLOT_HEAD.size + (count % self.depth) * ENTRY.size
+        ENTRY.pack_into(
+            self._mm, entry, float(price),
+            float(price if bid is None else bid), float(price if ask is None else ask),
+            _time_ms(time_value),
+        )
+        SEQ.pack_into(self._mm, base + 8, count + 1)
+        SEQ.pack_into(self._mm, base, seq + 2)
+
+    def write_row(self, row: Dict[str, Any]) -> bool:
+        """One price_file JSONL row ({"pair","price","bid","ask","time"}); False if unusable."""
+        parsed = parse_price_row(row)
+        if parsed is None:
+            return False
+        pair, tick = parsed
+        bid = row.get("bid")
+        ask = row.get("ask")
+        self.write(pair, tick["price"], row.get("time") or row.get("ts"), None if bid is None else float(bid), None if ask is None else float(ask))
+        return True
+
+    def close(self) -> None:
+        self._mm.flush()
+        self._mm.close()
+        self._f.close()
+
+
+class PriceRingReader:
+    """Reads a price ring with the PriceFeedReader interface (poll / price_map / to_state).
+
+    No parsing: each poll reads the slot headers and, for pairs whose tick
+    count moved, the new ring entries (at most ``depth``; older ones were
+    overwritten). A slot is re-read when its seqlock changed under us.
+    """
+
+    def __init__(self, path: str, retries: int = 8):
+        self.path = path
+        self.retries = retries
+        self.latest: Dict[str, Dict[str, Any]] = {}
+        self.counts: Dict[str, int] = {}
+        self.rotations = 0
+        self.dropped = 0
+        self._mm: mmap.mmap | None = None
+        self._file_id: tuple | None = None
+        self._pushed: Dict[str, List[Dict[str, Any]]] = {}
+
+    @classmethod
+    def from_state(cls, path: str, saved: Dict[str, Any] | None, **kwargs: Any) -> "PriceRingReader":
+        reader = cls(path)
+        saved = saved or {}
+        if saved.get("path") == path and saved.get("kind") == "ring":
+            reader.latest = dict(saved.get("latest") or {})
+            reader.counts = {str(k): int(v) for k, v in (saved.get("counts") or {}).items()}
+        return reader
+
+    def to_state(self) -> Dict[str, Any]:
+        return {"path": self.path, "kind": "ring", "latest": self.latest, "counts": self.counts}
+
+    def price_map(self) -> Dict[str, Dict[str, Any]]:
+        return self.latest
+
+    def push(self, ticks: Dict[str, List[Dict[str, Any]]]) -> None:
+        for pair, rows in ticks.items():
+            if rows:
+                self._pushed.setdefault(pair, []).extend(rows)
+                self.latest[pair] = rows[-1]
+
+    def _map(self) -> bool:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            self.close()
+            return False
+        fid = (st.st_dev, st.st_ino)
+        if self._mm is not None and fid == self._file_id:
+            return True
+        if self._mm is not None:
+            # file replaced: start over (the new writer counts from 0)
+            self.rotations += 1
+            self.counts = {}
+            self.close()
+        if st.st_size < HEADER_SIZE:
+            return False
+        with open(self.path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.max_pairs, self.depth, self.slot_size = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC or version != VERSION or len(mm) < HEADER_SIZE + self.max_pairs * self.slot_size:
+            mm.close()
+            return False
+        self._mm, self._file_id = mm, fid
+        return True
+
+    def _read_slot(self, base: int) -> tuple[str, int, List[Dict[str, Any]]] | None:
+        mm = self._mm
+        for _ in range(self.retries):
+            seq, count, raw = SLOT_HEAD.unpack_from(mm, base)
+            if seq & 1:
+                continue
+            pair = raw.rstrip(b"\0").decode("utf-8", errors="replace")
+            if not pair:
+                return "", 0, []
+            last = self.counts.get(pair)
+            if last is not None and last > count:
+                last = None  # writer restarted the slot
+            n = 1 if last is None else min(count - last, self.depth)
+            if n <= 0 or count == 0:
+                return pair, count, []
+            ticks = []
+            for k in range(count - n, count):
+                price, bid, ask, ms = ENTRY.unpack_from(mm, base + SLOT_HEAD.size + (k % self.depth) * ENTRY.size)
+                ticks.append({"price": price, "bid": bid, "ask": ask, "time": _time_str(ms)})
+            if SEQ.unpack_from(mm, base)[0] == seq:
+                if last is not None and count - last > self.depth:
+                    self.dropped += count - last - self.depth
+                return pair, count, ticks
+        return None  # writer kept the slot busy; next poll
+
+    def poll(self) -> Dict[str, List[Dict[str, Any]]]:
+        """New ticks per pair (oldest first) since the previous poll."""
+        out: Dict[str, List[Dict[str, Any]]] = {}
+        if self.path and self._map():
+            for i in range(self.max_pairs):
+                got = self._read_slot(HEADER_SIZE + i * self.slot_size)
+                if got is None:
+                    continue
+                pair, count, ticks = got
+                if not pair:
+                    break  # slots are claimed in order
+                self.counts[pair] = count
+                if ticks:
+                    out[pair] = ticks
+                    self.latest[pair] = ticks[-1]
+        if self._pushed:
+            for pair, rows in self._pushed.items():
+                out.setdefault(pair, []).extend(rows)
+            self._pushed = {}
+        return out
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+            self._file_id = None
+
+
+def replay(jsonl_path: str, ring_path: str, speed: float = 0.0, max_pairs: int = 32, depth: int = 64) -> int:
+    """Write a recorded price_file JSONL into a ring; ``speed`` > 0 keeps the original pacing (x speed)."""
+    writer = PriceRingWriter(ring_path, max_pairs=max_pairs, depth=depth)
+    n = 0
+    prev = None
+    try:
+        with open(jsonl_path, "rb") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except ValueError:
+                    continue
+                if not isinstance(row, dict):
+                    continue
+                if speed > 0:
+                    t = tick_epoch(str(row.get("time") or ""))
+                    if prev is not None and t is not None and t > prev:
+                        time.sleep((t - prev) / speed)
+                    prev = t if t is not None else prev
+                n += writer.write_row(row)
+    finally:
+        writer.close()
+    return n
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Price ring buffer: replay a JSONL price feed into it, or dump it")
+    parser.add_argument("ring", help="Ring file path")
+    parser.add_argument("--replay", help="price_file JSONL to write into the ring")
+    parser.add_argument("--speed", type=float, default=0.0, help="Replay pacing (1 = real time, 0 = as fast as possible)")
+    parser.add_argument("--max-pairs", type=int, default=32)
+    parser.add_argument("--depth", type=int, default=64, help="Ticks kept per pair")
+    args = parser.parse_args()
+    if args.replay:
+        print(f"replayed {replay(args.replay, args.ring, args.speed, args.max_pairs, args.depth)} tick(s) into {args.ring}")
+    reader = PriceRingReader(args.ring)
+    reader.poll()
+    for pair, tick in sorted(reader.latest.items()):
+        print(f"{pair:<16} {tick['price']:<14} bid={tick.get('bid')} ask={tick.get('ask')} {tick['time']}  ticks={reader.counts.get(pair, 0)}")
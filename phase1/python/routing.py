@@ -0,0 +1,91 @@
+from itertools import product
+from typing import Any, Dict, List
+
+WILDCARD = "*"
+
+RouteKey = tuple[str, str, str, str]  # pair, tf, side, kind
+
+
+def _norm_tf(tf: Any) -> str:
+    return str(tf or "").upper().replace("PERIOD_", "")
+
+
+def _values(raw: Any, norm=lambda v: str(v)) -> frozenset[str] | None:
+    """Config list/str -> set of values; None means "any" (missing, empty or "*")."""
+    if raw is None or raw == "" or raw == []:
+        return None
+    items = raw if isinstance(raw, list) else [raw]
+    if any(str(x).strip() == WILDCARD for x in items):
+        return None
+    return frozenset(norm(x) for x in items if str(x).strip())
+
+
+class RoutingTable:
+    """Destination chats per (pair, tf, side), compiled from config ``routes``.
+
+    Each route: {"name", "chat_id", "pairs", "tfs", "sides", "results"};
+    pairs/tfs/sides are lists (or "*" / missing for any). ``results: false``
+    sends only the signal, not its TP/SL/expiry updates. Fully explicit
+    routes are expanded into a dict at compile time; lookups that involve
+    wildcard routes are resolved once per key and memoized, so every signal
+    after the first of its kind is a single dict hit.
+
+    Without ``routes`` the table has one catch-all route to telegram.chat_id.
+    """
+
+    def __init__(self, routes: List[Dict[str, Any]]):
+        self.routes = []
+        for i, r in enumerate(routes):
+            chat = str(r.get("chat_id", "") or "").strip()
+            if not chat:
+                raise ValueError(f"Route '{r.get('name') or i + 1}' has no chat_id")
+            self.routes.append({
+                "name": str(r.get("name") or f"route{i + 1}"),
+                "chat_id": chat,
+                "pairs": _values(r.get("pairs")),
+                "tfs": _values(r.get("tfs"), _norm_tf),
+                "sides": _values(r.get("sides"), lambda v: str(v).upper()),
+                "results": bool(r.get("results", True)),
+            })
+        self._exact: Dict[RouteKey, List[int]] = {}
+        self._wild: List[int] = []
+        for i, r in enumerate(self.routes):
+            if r["pairs"] is None or r["tfs"] is None or r["sides"] is None:
+                self._wild.append(i)
+                continue
+            kinds = ("signal", "result") if r["results"] else ("signal",)
+            for key in product(r["pairs"], r["tfs"], r["sides"], kinds):
+                self._exact.setdefault(key, []).append(i)
+        self._memo: Dict[RouteKey, tuple[str, ...]] = {}
+
+    @classmethod
+    def from_config(cls, cfg: dict) -> "RoutingTable":
+        routes = cfg.get("routes")
+        if not isinstance(routes, list) or not routes:
+            routes = [{"name": "default", "chat_id": cfg.get("telegram", {}).get("chat_id", "")}]
+        return cls(routes)
+
+    def _match(self, i: int, pair: str, tf: str, side: str, kind: str) -> bool:
+        r = self.routes[i]
+        return (
+            (r["pairs"] is None or pair in r["pairs"])
+            and (r["tfs"] is None or tf in r["tfs"])
+            and (r["sides"] is None or side in r["sides"])
+            and (kind == "signal" or r["results"])
+        )
+
+    def chats(self, pair: str, tf: str, side: str, kind: str = "signal") -> tuple[str, ...]:
+        """Chats for a signal (kind="signal") or for its result updates (kind="result")."""
+        key = (str(pair), _norm_tf(tf), str(side).upper(), kind)
+        hit = self._memo.get(key)
+        if hit is not None:
+            return hit
+        idxs = set(self._exact.get(key, ()))
+        idxs.update(i for i in self._wild if self._match(i, *key))
+        out: list[str] = []
+        for i in sorted(idxs):  # config order
+            chat = self.routes[i]["chat_id"]
+            if chat not in out:
+                out.append(chat)
+        self._memo[key] = tuple(out)
+        return self._memo[key]
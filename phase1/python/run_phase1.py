@@ -1,16 +1,159 @@
 import argparse
+import os
 import time
 
-from signal_watcher import run_once
+from file_watch import FileChangeWatcher
+from metrics import start_metrics_server
+from signal_watcher import WatcherDaemon, feeds_from_config, load_config, log, run_once
+
+
+def _watch_paths(cfg: dict) -> tuple[list[str], list[str], str]:
+    feeds = feeds_from_config(cfg)
+    signal_files = [f["signal_file"] for f in feeds if f["signal_file"] and not f["segments"]]
+    segment_patterns = [f["segments"] for f in feeds if f["segments"]]
+    price_file = ""
+    if bool(cfg.get("monitoring", {}).get("enabled", True)):
+        price_file = str(cfg.get("monitoring", {}).get("price_file", "")).strip()
+    return signal_files, segment_patterns, price_file
+
+
+def _file_watcher(watched: tuple[list[str], list[str], str], poll_interval: float) -> FileChangeWatcher:
+    signal_files, segment_patterns, price_file = watched
+    return FileChangeWatcher(signal_files + [price_file], poll_interval=poll_interval, patterns=segment_patterns)
+
+
+def _price_ring(cfg: dict) -> bool:
+    # Writes into the mmap'd price ring do not reliably touch the file, so it is
+    # simply polled every price_min_interval_sec (reading it costs no parsing).
+    monitor = cfg.get("monitoring", {})
+    return bool(monitor.get("enabled", True)) and bool(str(monitor.get("price_ring", "") or "").strip())
+
+
+def _abspath(path: str) -> str:
+    return os.path.abspath(path) if path else ""
+
+
+def _mtime(path: str) -> float | None:
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def _start_metrics(cfg: dict) -> None:
+    mcfg = cfg.get("metrics", {})
+    if not bool(mcfg.get("enabled", False)):
+        return
+    host = str(mcfg.get("host", "127.0.0.1"))
+    port = int(mcfg.get("port", 9108))
+    try:
+        start_metrics_server(host, port)
+        log(f"Metrics on http://{host}:{port}/metrics")
+    except OSError as e:
+        log(f"Metrics server not started ({host}:{port}): {e}")
+
+
+def watch(config_path: str, daemon: bool = False) -> None:
+    cfg = load_config(config_path)
+    _start_metrics(cfg)
+    runtime = cfg.get("runtime", {})
+    heartbeat = float(runtime.get("watch_heartbeat_sec", 60))
+    poll_interval = float(runtime.get("watch_poll_interval_sec", 0.25))
+    # Price ticks arrive on every MT5 tick; only the lifecycle check cares about them.
+    price_min_interval = float(runtime.get("price_min_interval_sec", 2.0))
+    # Signals of one bar close land within a moment of each other; wait this long
+    # after the first one so a burst is read (and coalesced) in a single run.
+    coalesce_window = float(runtime.get("coalesce_window_sec", 0.0))
+
+    # All feeds share one watcher: another EA output is one more watched path.
+    watched = _watch_paths(cfg)
+    watcher = _file_watcher(watched, poll_interval)
+    cfg_mtime = _mtime(config_path)
+    runner = WatcherDaemon(config_path) if daemon else None
+    mode = "daemon" if daemon else "watch"
+    # Socket ingest wakes the loop like a file change; ticks count as price updates.
+    price_tags = {_abspath(watched[2]), "ingest:tick"}
+    price_ring = _price_ring(cfg)
+    if runner and runner.ingest is not None:
+        runner.ingest.on_event = lambda kind: watcher.notify("ingest:tick" if kind == "tick" else "ingest:signal")
+    elif bool(cfg.get("ingest", {}).get("enabled", False)):
+        log("ingest.enabled is ignored outside --daemon mode")
+    log(f"{mode.capitalize()} mode started (backend={watcher.backend}, heartbeat={heartbeat}s)")
+
+    last_run = 0.0
+    pending_price = False
+    try:
+        while True:
+            stats = None
+            try:
+                stats = runner.cycle() if runner else run_once(config_path)
+            except Exception as e:
+                print(f"[ERROR] {e}")
+            last_run = time.monotonic()
+
+            # A reloaded config can add signal feeds or move the price file: watch the new paths.
+            if runner:
+                cfg = runner.cfg
+            elif _mtime(config_path) != cfg_mtime:
+                cfg_mtime = _mtime(config_path)
+                try:
+                    cfg = load_config(config_path)
+                except (OSError, ValueError) as e:
+                    print(f"[ERROR] {e}")
+            try:
+                paths = _watch_paths(cfg)
+            except ValueError as e:  # e.g. a duplicate feed name: keep watching the old paths
+                print(f"[ERROR] {e}")
+                paths = watched
+            if paths != watched:
+                watched = paths
+                old, watcher = watcher, _file_watcher(watched, poll_interval)
+                old.close()
+                price_tags = {_abspath(watched[2]), "ingest:tick"}
+                log(f"Watched paths changed after config reload (backend={watcher.backend})")
+            price_ring = _price_ring(cfg)
+            pending_price = price_ring
+
+            # Cap reached with lines still unread: continue right away.
+            if stats and stats.get("cap_reached"):
+                continue
+
+            while True:
+                timeout = heartbeat - (time.monotonic() - last_run)
+                if pending_price:
+                    timeout = min(timeout, price_min_interval - (time.monotonic() - last_run))
+                if timeout <= 0:
+                    break
+                changed = watcher.wait(timeout=timeout)
+                if not changed:
+                    continue
+                # Anything but the price feed is a signal file (or a new segment / socket signal).
+                if changed - price_tags:
+                    settle_until = time.monotonic() + coalesce_window
+                    while time.monotonic() < settle_until:
+                        watcher.wait(timeout=settle_until - time.monotonic())
+                    break
+                pending_price = True
+    finally:
+        watcher.close()
+        if runner:
+            runner.close()
 
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--config", default="../config/config.json")
     parser.add_argument("--loop", action="store_true", help="Run every 60 seconds")
+    parser.add_argument("--watch", action="store_true", help="Run on signal/price file changes (inotify or polling)")
+    parser.add_argument("--daemon", action="store_true", help="Watch mode with in-memory state and append-only journal")
     args = parser.parse_args()
 
-    if args.loop:
+    if args.daemon:
+        watch(args.config, daemon=True)
+    elif args.watch:
+        watch(args.config)
+    elif args.loop:
+        _start_metrics(load_config(args.config))
         while True:
             try:
                 run_once(args.config)
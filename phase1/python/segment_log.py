@@ -0,0 +1,188 @@
+import argparse
+import glob
+import json
+import os
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+
+def time_key(value: Any) -> str:
+    """Sortable form of EA times: '2026.02.14 12:05', '2026-02-14T12:05' -> '2026.02.14 12:05'."""
+    return str(value or "").strip().replace("-", ".").replace("T", " ")
+
+
+def default_manifest_path(pattern: str) -> str:
+    # alphalyceum_signals_live_m5_*.jsonl -> alphalyceum_signals_live_m5_manifest.json
+    base = pattern[:-6] if pattern.endswith(".jsonl") else pattern
+    return base.replace("*", "manifest") + ".json"
+
+
+class SegmentLog:
+    """Signal log split into segment files plus a manifest describing them.
+
+    Segments are the files matching ``pattern`` (e.g. daily
+    ``alphalyceum_signals_live_m5_20260214.jsonl`` written by the EA with
+    InpSegmentDaily=true); their names sort chronologically. The manifest
+    keeps, per segment, the indexed byte range, record count, first/last
+    signal_time and a sparse (offset, signal_time) mark every ``mark_every``
+    records. ``refresh`` only reads bytes appended since the last refresh.
+    """
+
+    def __init__(self, pattern: str, manifest_file: str = "", mark_every: int = 256):
+        self.pattern = pattern
+        self.manifest_file = manifest_file or default_manifest_path(pattern)
+        self.mark_every = max(1, int(mark_every))
+        self.segments: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.manifest_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("pattern") == self.pattern:
+            self.segments = {s["name"]: s for s in data.get("segments", [])}
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        Path(self.manifest_file).parent.mkdir(parents=True, exist_ok=True)
+        tmp = f"{self.manifest_file}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"pattern": self.pattern, "segments": self.entries()}, f, indent=2)
+        os.replace(tmp, self.manifest_file)
+        self._dirty = False
+
+    def entries(self) -> List[Dict[str, Any]]:
+        return [self.segments[n] for n in sorted(self.segments)]
+
+    def path_of(self, name: str) -> str:
+        return os.path.join(os.path.dirname(self.pattern), name)
+
+    def _index(self, entry: Dict[str, Any], path: str, size: int) -> None:
+        start = int(entry["bytes"])
+        with open(path, "rb") as f:
+            f.seek(start)
+            data = f.read(size - start)
+        end = data.rfind(b"\n")
+        if end < 0:
+            return
+        pos = start
+        for raw in data[: end + 1].split(b"\n")[:-1]:
+            line_start = pos
+            pos += len(raw) + 1
+            raw = raw.strip()
+            if not raw:
+                continue
+            try:
+                rec = json.loads(raw)
+            except Exception:
+                continue
+            if not isinstance(rec, dict):
+                continue
+            t = time_key(rec.get("signal_time") or rec.get("time"))
+            if t:
+                if not entry["first_time"] or t < entry["first_time"]:
+                    entry["first_time"] = t
+                if not entry["last_time"] or t > entry["last_time"]:
+                    entry["last_time"] = t
+                if entry["records"] % self.mark_every == 0:
+                    entry["marks"].append([line_start, t])
+            entry["records"] += 1
+        entry["bytes"] = pos
+
+    def refresh(self) -> List[Dict[str, Any]]:
+        """Sync the manifest with the segment files; returns entries oldest first."""
+        seen = set()
+        for path in glob.glob(self.pattern):
+            name = os.path.basename(path)
+            if name.endswith(".tmp"):
+                continue
+            seen.add(name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entry = self.segments.get(name)
+            if entry is None or st.st_size < int(entry["bytes"]) or entry.get("inode") != st.st_ino:
+                entry = {
+                    "name": name,
+                    "inode": st.st_ino,
+                    "bytes": 0,
+                    "records": 0,
+                    "first_time": "",
+                    "last_time": "",
+                    "marks": [],
+                }
+                self.segments[name] = entry
+                self._dirty = True
+            if st.st_size > int(entry["bytes"]):
+                self._index(entry, path, st.st_size)
+                self._dirty = True
+        for name in list(self.segments):
+            if name not in seen:
+                del self.segments[name]
+                self._dirty = True
+        self.save()
+        return self.entries()
+
+    def query(self, start: str = "", end: str = "") -> Iterator[Dict[str, Any]]:
+        """Records with ``start <= signal_time <= end``, using the manifest to skip segments."""
+        start, end = time_key(start), time_key(end)
+        for entry in self.refresh():
+            if start and entry["last_time"] and entry["last_time"] < start:
+                continue
+            if end and entry["first_time"] and entry["first_time"][: len(end)] > end:
+                continue
+            offset = 0
+            if start and entry["marks"]:
+                # start at the last mark before ``start``
+                times = [m[1] for m in entry["marks"]]
+                i = bisect_left(times, start)
+                offset = entry["marks"][i - 1][0] if i > 0 else 0
+            with open(self.path_of(entry["name"]), "rb") as f:
+                f.seek(offset)
+                for raw in f:
+                    raw = raw.strip()
+                    if not raw:
+                        continue
+                    try:
+                        rec = json.loads(raw)
+                    except Exception:
+                        continue
+                    if not isinstance(rec, dict):
+                        continue
+                    t = time_key(rec.get("signal_time") or rec.get("time"))
+                    if start and t < start:
+                        continue
+                    if end and t[: len(end)] > end:
+                        continue
+                    yield rec
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Query a segmented AlphaLyceum signal log")
+    ap.add_argument("--pattern", required=True, help="segment glob, e.g. .../alphalyceum_signals_live_m5_*.jsonl")
+    ap.add_argument("--manifest", default="", help="manifest path (default: derived from --pattern)")
+    ap.add_argument("--from", dest="start", default="", help="e.g. '2026.02.14 08:00'")
+    ap.add_argument("--to", dest="end", default="", help="e.g. '2026.02.14' (inclusive)")
+    ap.add_argument("--pair", default="")
+    ap.add_argument("--manifest-only", action="store_true", help="print the segment table and exit")
+    args = ap.parse_args()
+
+    seglog = SegmentLog(args.pattern, args.manifest)
+    if args.manifest_only:
+        for e in seglog.refresh():
+            print(f"{e['name']}  bytes=0..{e['bytes']}  records={e['records']}  {e['first_time'] or '-'} -> {e['last_time'] or '-'}")
+        return
+    for rec in seglog.query(args.start, args.end):
+        if args.pair and rec.get("pair") != args.pair:
+            continue
+        print(json.dumps(rec, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
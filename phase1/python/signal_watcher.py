@@ -1,14 +1,37 @@
+import glob
+import hashlib
 import json
 import os
+import threading
 import time
 from datetime import datetime
-from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Callable, Dict
 
+import http_client
+import metrics
+from dedup_store import DedupStore
+from duplicate_index import DuplicateIndex
+from expiry_queue import ExpiryQueue
+from latency_log import LatencyLog, signal_trace
+from outbox import DeliveryWorker, Outbox
+from price_feed import PriceFeedReader
+from price_ring import PriceRingReader
+from routing import RoutingTable
+from segment_log import SegmentLog
+from signal_record import SignalRecord, decode_signal, parse_time
+from socket_ingest import IngestServer
+from state_journal import StateJournal, journal_path, replay, write_snapshot
+from tail_reader import tail_records
+from trigger_index import TriggerIndex
+from telegram_dispatch import class_table, default_dispatcher, default_limiter, message_class
+from tick_path import TickPath, not_before, tick_epoch
 from telegram_publisher import (
+    TELEGRAM_API,
+    format_signal_digest,
     format_signal_message,
     format_signal_result_message,
     send_telegram_message,
+    telegram_api_base,
 )
 
 
@@ -27,18 +50,24 @@ def load_config(config_path: str) -> dict:
 
 def load_state(state_file: str) -> dict:
     if not os.path.exists(state_file):
-        return {"offset": 0, "sent_ids": [], "active_signals": {}, "closed_results": {}}
-    with open(state_file, "r", encoding="utf-8") as f:
-        state = json.load(f)
+        state = {"offset": 0, "sent_ids": [], "active_signals": {}, "closed_results": {}}
+    else:
+        with open(state_file, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    state.setdefault("sent_ids", [])
     state.setdefault("active_signals", {})
     state.setdefault("closed_results", {})
+    # A daemon may have journaled changes since the last snapshot.
+    replay(state, state_file)
     return state
 
 
 def save_state(state_file: str, state: dict) -> None:
-    Path(state_file).parent.mkdir(parents=True, exist_ok=True)
-    with open(state_file, "w", encoding="utf-8") as f:
-        json.dump(state, f, indent=2)
+    write_snapshot(state_file, state)
+    jp = journal_path(state_file)
+    if os.path.exists(jp):
+        with open(jp, "w", encoding="utf-8"):
+            pass
 
 
 def _safe_id(signal: Dict[str, Any]) -> str:
@@ -48,141 +77,29 @@ def _safe_id(signal: Dict[str, Any]) -> str:
     return str(sid)
 
 
-def _to_float(v: Any) -> float | None:
-    try:
-        if v is None or v == "":
-            return None
-        return float(v)
-    except Exception:
-        return None
-
-
-def _load_price_map(price_file: str) -> Dict[str, Dict[str, Any]]:
-    if not price_file or (not os.path.exists(price_file)):
-        return {}
-
-    # Supports:
-    # 1) JSON object map: {"XAUUSD.vx": {"price": 4688.0, "time": "..."}, ...}
-    # 2) JSONL rows: {"pair":"XAUUSD.vx","price":4688.0,"time":"..."}
-    try:
-        with open(price_file, "r", encoding="utf-8") as f:
-            raw = f.read().strip()
-        if not raw:
-            return {}
-
-        if raw.startswith("{"):
-            try:
-                obj = json.loads(raw)
-                out = {}
-                for k, v in (obj or {}).items():
-                    if isinstance(v, dict):
-                        price = _to_float(v.get("price") or v.get("bid") or v.get("last"))
-                        if price is not None:
-                            out[str(k)] = {
-                                "price": price,
-                                "time": str(v.get("time") or v.get("ts") or _ts()),
-                            }
-                    else:
-                        price = _to_float(v)
-                        if price is not None:
-                            out[str(k)] = {"price": price, "time": _ts()}
-                if out:
-                    return out
-            except Exception:
-                # if not a single JSON object, fall through to JSONL parsing
-                pass
-
-        out = {}
-        for ln in raw.splitlines()[-200:]:
-            ln = ln.strip()
-            if not ln:
-                continue
-            try:
-                row = json.loads(ln)
-            except Exception:
-                continue
-            pair = str(row.get("pair") or row.get("symbol") or "").strip()
-            if not pair:
-                continue
-            price = _to_float(row.get("price") or row.get("bid") or row.get("last"))
-            if price is None:
-                continue
-            out[pair] = {
-                "price": price,
-                "time": str(row.get("time") or row.get("ts") or _ts()),
-            }
-        return out
-    except Exception:
-        return {}
-
-
-def _signal_duration_min(signal: Dict[str, Any], hit_time: str) -> float | None:
-    st = str(signal.get("signal_time") or "").strip()
-    if not st:
-        return None
-    fmt_candidates = ["%Y.%m.%d %H:%M", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S%z", "%Y-%m-%dT%H:%M:%S"]
-    sdt = None
-    hdt = None
-    for f in fmt_candidates:
-        try:
-            sdt = datetime.strptime(st, f)
-            break
-        except Exception:
-            continue
-    for f in fmt_candidates:
-        try:
-            hdt = datetime.strptime(hit_time, f)
-            break
-        except Exception:
-            continue
+def _signal_duration_min(signal: SignalRecord, hit_time: str) -> float | None:
+    # signal_time was parsed when the record was decoded; hit times repeat and are cached.
+    sdt = signal.signal_dt
+    hdt = parse_time(hit_time)
     if not sdt or not hdt:
         return None
-    return max(0.0, (hdt - sdt).total_seconds() / 60.0)
-
-
-def _evaluate_result(signal: Dict[str, Any], price: float) -> str | None:
-    side = str(signal.get("side", "")).upper()
-    tp = _to_float(signal.get("tp"))
-    sl = _to_float(signal.get("sl"))
-    if tp is None or sl is None:
+    try:
+        return max(0.0, (hdt - sdt).total_seconds() / 60.0)
+    except TypeError:  # offset-aware vs naive
         return None
 
-    # conservative order: for BUY check SL then TP, for SELL check SL then TP
-    # to avoid over-claiming TP in violent move bars.
-    if side == "BUY":
-        if price <= sl:
-            return "SL_HIT"
-        if price >= tp:
-            return "TP_HIT"
-    elif side == "SELL":
-        if price >= sl:
-            return "SL_HIT"
-        if price <= tp:
-            return "TP_HIT"
-    return None
-
 
 def _load_recent_signals(signal_file: str, limit: int = 200) -> list[Dict[str, Any]]:
-    if not os.path.exists(signal_file):
-        return []
-    out = []
+    # Reads backwards from EOF, so cost depends on ``limit`` rather than file size.
     try:
-        with open(signal_file, "r", encoding="utf-8") as f:
-            lines = f.read().splitlines()
-        for ln in lines[-limit:]:
-            ln = ln.strip()
-            if not ln:
-                continue
-            try:
-                out.append(json.loads(ln))
-            except Exception:
-                continue
+        out = tail_records(signal_file, limit)
     except Exception:
         return []
+    out.reverse()
     return out
 
 
-def _bootstrap_active_signals_from_history(signal_file: str, sent_ids: set[str], active_signals: Dict[str, Dict[str, Any]], closed_results: Dict[str, Dict[str, Any]], max_bootstrap: int = 2) -> int:
+def _bootstrap_active_signals_from_history(signal_file: str, sent_ids: "DedupStore | set[str]", active_signals: Dict[str, SignalRecord], closed_results: Dict[str, Dict[str, Any]], max_bootstrap: int = 2, expired: Callable[[SignalRecord], bool] | None = None) -> int:
     if active_signals:
         return 0
     # only bootstrap a small tail to avoid blasting old history results
@@ -198,222 +115,1266 @@ def _bootstrap_active_signals_from_history(signal_file: str, sent_ids: set[str],
             continue
         if sid in active_signals:
             continue
-        active_signals[sid] = {
-            "id": sid,
-            "pair": s.get("pair"),
-            "tf": s.get("tf"),
-            "side": s.get("side"),
-            "entry": s.get("entry"),
-            "sl": s.get("sl"),
-            "tp": s.get("tp"),
-            "signal_time": s.get("signal_time") or s.get("time") or _ts(),
-            "opened_at": _ts(),
-            "status": "OPEN",
-        }
+        rec = SignalRecord.from_dict(s)
+        if expired is not None and expired(rec):
+            # already past monitoring.expiry_bars: do not bring it back
+            continue
+        active_signals[sid] = _new_active_entry(rec, sid)
         added += 1
         if added >= max_bootstrap:
             break
     return added
 
 
-def run_once(config_path: str = "../config/config.json") -> None:
-    cfg = load_config(config_path)
+DEFAULT_FEED = "default"
+
+
+def feeds_from_config(cfg: dict) -> list[Dict[str, Any]]:
+    """Signal feeds to follow: ``feeds`` list, or the legacy signal_file + filters.
+
+    Each feed is {"name", "signal_file", "symbols", "tfs"}. A feed without its
+    own ``filters`` uses the top-level ``filters``.
+    """
+    raw = cfg.get("feeds")
+    if not isinstance(raw, list) or not raw:
+        raw = [{
+            "name": DEFAULT_FEED,
+            "signal_file": cfg.get("signal_file", ""),
+            "signal_segments": cfg.get("signal_segments", ""),
+            "segment_manifest": cfg.get("segment_manifest", ""),
+        }]
+    feeds = []
+    seen = set()
+    for i, item in enumerate(raw):
+        name = str(item.get("name") or f"feed{i + 1}")
+        if name in seen:
+            raise ValueError(f"Duplicate feed name '{name}'")
+        seen.add(name)
+        filters = item.get("filters") or cfg.get("filters", {})
+
+        # Backward compatible: allow either one symbol (allowed_symbol)
+        # or many symbols (allowed_symbols)
+        symbols = set()
+        if isinstance(filters.get("allowed_symbols"), list):
+            symbols = {str(x) for x in filters.get("allowed_symbols", []) if str(x).strip()}
+        if not symbols and filters.get("allowed_symbol"):
+            symbols = {str(filters.get("allowed_symbol"))}
+        tf = filters.get("allowed_tf")
+        tfs = {str(x) for x in tf} if isinstance(tf, list) else {str(tf)}
+
+        feeds.append({
+            "name": name,
+            "signal_file": str(item.get("signal_file", "")).strip(),
+            "segments": str(item.get("signal_segments", "") or "").strip(),
+            "manifest": str(item.get("segment_manifest", "") or "").strip(),
+            "symbols": symbols,
+            "tfs": tfs,
+        })
+    return feeds
 
+
+def _feed_offset(state: dict, name: str) -> int:
+    # The legacy single feed keeps using the top-level offset.
+    if name == DEFAULT_FEED:
+        return int(state.get("offset", 0) or 0)
+    return int(state.setdefault("feed_offsets", {}).get(name, 0) or 0)
+
+
+def _set_feed_offset(state: dict, name: str, offset: int) -> None:
+    if name == DEFAULT_FEED:
+        state["offset"] = offset
+    else:
+        state.setdefault("feed_offsets", {})[name] = offset
+
+
+def _feed_cursor(state: dict, feed: Dict[str, Any]) -> tuple[str, int]:
+    # (segment name, byte offset); plain single-file feeds use segment "".
+    if not feed["segments"]:
+        return "", _feed_offset(state, feed["name"])
+    seg, offset = (state.setdefault("feed_cursors", {}).get(feed["name"]) or ["", 0])
+    return str(seg), int(offset or 0)
+
+
+def _set_feed_cursor(state: dict, feed: Dict[str, Any], cursor: tuple[str, int], journal=None) -> None:
+    if cursor == _feed_cursor(state, feed):
+        return
+    if not feed["segments"]:
+        if journal is not None:
+            journal.append("offset", offset=cursor[1], feed=feed["name"])
+        _set_feed_offset(state, feed["name"], cursor[1])
+        return
+    if journal is not None:
+        journal.append("cursor", feed=feed["name"], segment=cursor[0], offset=cursor[1])
+    state.setdefault("feed_cursors", {})[feed["name"]] = [cursor[0], cursor[1]]
+
+
+def _feed_available(feed: Dict[str, Any]) -> bool:
+    if feed["segments"]:
+        return bool(glob.glob(feed["segments"]))
+    return os.path.exists(feed["signal_file"])
+
+
+def _feed_label(feed: Dict[str, Any]) -> str:
+    return feed["segments"] or feed["signal_file"]
+
+
+def _check_purpose(cfg: dict) -> None:
     purpose = cfg.get("telegram", {}).get("purpose")
     if purpose and purpose != "alphalyceum_trading_only":
         raise ValueError(
             f"Refusing to send: telegram purpose '{purpose}' is not 'alphalyceum_trading_only'"
         )
 
-    signal_file = cfg["signal_file"]
-    state = load_state(cfg["state_file"])
 
-    if not os.path.exists(signal_file):
-        log(f"Signal file not found: {signal_file}")
-        return
+def _hydrate_state(state: dict, cfg: dict | None = None) -> dict:
+    # In-memory form: sent_ids as a bounded insertion-ordered store (O(1) checks).
+    runtime_cfg = (cfg or {}).get("runtime", {})
+    state["sent_ids"] = DedupStore.from_config((str(x) for x in state.get("sent_ids", [])), runtime_cfg)
+    state["active_signals"] = {
+        str(sid): sig if isinstance(sig, SignalRecord) else SignalRecord.from_dict(sig)
+        for sid, sig in (state.get("active_signals") or {}).items()
+    }
+    state["closed_results"] = dict(state.get("closed_results", {}))
+    state["offset"] = int(state.get("offset", 0) or 0)
+    state["feed_offsets"] = {str(k): int(v or 0) for k, v in (state.get("feed_offsets") or {}).items()}
+    state["feed_cursors"] = {str(k): [str(v[0]), int(v[1] or 0)] for k, v in (state.get("feed_cursors") or {}).items()}
+    return state
 
-    file_size = os.path.getsize(signal_file)
-    offset = int(state.get("offset", 0) or 0)
-    if offset > file_size:
-        log(f"Offset ({offset}) > file size ({file_size}), reset to 0 (rotation/truncate detected)")
-        offset = 0
 
-    sent_ids = set(str(x) for x in state.get("sent_ids", []))
-    active_signals: Dict[str, Dict[str, Any]] = dict(state.get("active_signals", {}))
-    closed_results: Dict[str, Dict[str, Any]] = dict(state.get("closed_results", {}))
+def _snapshot_state(state: dict) -> dict:
+    snap = dict(state)
+    sent_ids = state.get("sent_ids")
+    if isinstance(sent_ids, DedupStore):
+        # Oldest first; the store already evicted anything past its bound.
+        snap["sent_ids"] = sent_ids.to_list()
+        sent_ids.save_bloom()
+    else:
+        snap["sent_ids"] = list(sent_ids or [])[-2000:]
+    closed_results = state.get("closed_results", {})
+    # Keep closed results bounded (dicts keep insertion order: drop the oldest).
+    if len(closed_results) > 4000:
+        for k in list(closed_results.keys())[:-3000]:
+            closed_results.pop(k, None)
+    snap["closed_results"] = dict(closed_results)
+    snap["active_signals"] = {
+        sid: sig.to_state() if isinstance(sig, SignalRecord) else sig
+        for sid, sig in (state.get("active_signals") or {}).items()
+    }
+    return snap
 
-    max_per_run = int(cfg.get("runtime", {}).get("max_messages_per_run", 3))
-    sleep_between = float(cfg.get("runtime", {}).get("sleep_between_sends_sec", 1.2))
 
-    monitor_cfg = cfg.get("monitoring", {})
-    monitoring_enabled = bool(monitor_cfg.get("enabled", True))
-    price_file = str(monitor_cfg.get("price_file", "")).strip()
+def _new_active_entry(s: SignalRecord, sid: str) -> SignalRecord:
+    # The decoded line record itself becomes the active entry (no field copies).
+    now = _ts()
+    s.id = sid
+    if not s.signal_time:
+        s.signal_time = now
+        s.signal_dt = parse_time(now)
+    s.opened_at = now
+    s.status = "OPEN"
+    return s
 
-    filters = cfg.get("filters", {})
-    allowed_tf = filters["allowed_tf"]
 
-    # Backward compatible: allow either one symbol (allowed_symbol)
-    # or many symbols (allowed_symbols)
-    allowed_symbols = set()
-    if isinstance(filters.get("allowed_symbols"), list):
-        allowed_symbols = {str(x) for x in filters.get("allowed_symbols", []) if str(x).strip()}
-    if not allowed_symbols and filters.get("allowed_symbol"):
-        allowed_symbols = {str(filters.get("allowed_symbol"))}
+def _price_reader(ctx: dict, state: dict, price_file: str, monitor_cfg: dict) -> PriceFeedReader | PriceRingReader:
+    # monitoring.price_ring (memory-mapped slots) takes precedence over the JSONL price_file.
+    ring = str(monitor_cfg.get("price_ring", "") or "").strip()
+    reader = ctx.get("price_reader")
+    if ring:
+        if reader is None or reader.path != ring:
+            reader = PriceRingReader.from_state(ring, state.get("price_feed"))
+            ctx["price_reader"] = reader
+        return reader
+    if reader is None or reader.path != price_file:
+        reader = PriceFeedReader.from_state(
+            price_file,
+            state.get("price_feed"),
+            tail_bytes=int(monitor_cfg.get("price_tail_bytes", 64 * 1024)),
+            max_catchup_bytes=int(monitor_cfg.get("price_max_catchup_bytes", 4 * 1024 * 1024)),
+        )
+        ctx["price_reader"] = reader
+    return reader
 
-    # Bootstrap tracker for previously-sent signals (before lifecycle feature existed)
-    boot_added = _bootstrap_active_signals_from_history(signal_file, sent_ids, active_signals, closed_results)
-    if boot_added > 0:
-        log(f"Bootstrapped active signals from history: {boot_added}")
 
-    sent_count = 0
-    scanned_lines = 0
-    new_offset = offset
-
-    with open(signal_file, "r", encoding="utf-8") as f:
-        f.seek(offset)
-
-        while True:
-            line_start = f.tell()
-            line = f.readline()
-            if not line:
-                new_offset = f.tell()
-                break
-
-            scanned_lines += 1
-            line = line.strip()
-            if not line:
-                new_offset = f.tell()
-                continue
+def _trigger_index(ctx: dict, active_signals: Dict[str, SignalRecord]) -> TriggerIndex:
+    idx = ctx.get("trigger_index")
+    if idx is None:
+        idx = TriggerIndex.build(active_signals)
+        ctx["trigger_index"] = idx
+    return idx
 
-            try:
-                s = json.loads(line)
-            except json.JSONDecodeError:
-                log("Skip malformed JSON line")
-                new_offset = f.tell()
-                continue
 
-            sid = _safe_id(s)
+def _closing(sid: str, sig: SignalRecord, result: str, px: float | None, hit_time: str) -> tuple[str, Dict[str, Any], str]:
+    """(sid, closed_results entry, result message) for a signal that is being closed."""
+    duration_min = _signal_duration_min(sig, hit_time)
+    msg = format_signal_result_message(sig, result=result, hit_price=px, hit_time=hit_time, duration_min=duration_min)
+    return sid, {
+        "id": sid,
+        "result": result,
+        "hit_price": px,
+        "hit_time": hit_time,
+        "duration_min": duration_min,
+        "closed_at": _ts(),
+    }, msg
 
-            # If this run already hit cap, keep offset at current line for next run.
-            if sent_count >= max_per_run:
-                new_offset = line_start
-                log(f"Reached max messages/run ({max_per_run}), will continue next cycle")
-                break
 
-            if sid and sid in sent_ids:
-                new_offset = f.tell()
-                continue
+def _expiry_queue(ctx: dict, cfg: dict, active_signals: Dict[str, SignalRecord]) -> ExpiryQueue:
+    bars_cfg = cfg.get("monitoring", {}).get("expiry_bars", 0)
+    q = ctx.get("expiry_queue")
+    if q is None or q.bars_cfg != bars_cfg:
+        q = ExpiryQueue.build(bars_cfg, active_signals)
+        ctx["expiry_queue"] = q
+    return q
 
-            if s.get("pair") not in allowed_symbols or s.get("tf") != allowed_tf:
-                new_offset = f.tell()
-                continue
 
-            text = format_signal_message(s)
+def _expiry_clock(cfg: dict, price_map: Dict[str, Dict[str, Any]]) -> tuple[float, str] | None:
+    """(seconds, time string) "now" for expiry: the newest tick time, in broker time like signal_time.
+
+    monitoring.expiry_clock = "local" uses this machine's clock instead (only
+    correct when it runs on broker time). None when no tick time is known.
+    """
+    if str(cfg.get("monitoring", {}).get("expiry_clock", "tick")).lower() == "local":
+        stamp = datetime.now().strftime("%Y.%m.%d %H:%M:%S")
+        return tick_epoch(stamp), stamp
+    best: tuple[float, str] | None = None
+    for tick in price_map.values():
+        stamp = str(tick.get("time") or "")
+        t = tick_epoch(stamp)
+        if t is not None and (best is None or t > best[0]):
+            best = (t, stamp)
+    return best
+
+
+def _duplicate_index(ctx: dict, cfg: dict, active_signals: Dict[str, SignalRecord]) -> DuplicateIndex | None:
+    sup = cfg.get("suppression", {}) or {}
+    if str(sup.get("mode", "off")).lower() not in ("drop", "merge"):
+        ctx.pop("duplicate_index", None)
+        return None
+    window, mult = int(sup.get("window_bars", 6)), float(sup.get("atr_mult", 0.5))
+    index = ctx.get("duplicate_index")
+    if index is None or (index.window_bars, index.atr_mult) != (max(0, window), max(0.0, mult)):
+        index = DuplicateIndex.build(window, mult, active_signals)
+        ctx["duplicate_index"] = index
+    return index
+
+
+def _suppress_duplicates(cfg: dict, state: dict, ctx: dict, journal, batch: list, received: list) -> tuple[list, list, int]:
+    """Drop or merge new signals that repeat an open one (suppression.mode); returns kept batch/received + count.
+
+    A repeat is the same (pair, tf, side) within suppression.window_bars bars
+    and suppression.atr_mult x ATR of entry. It is marked handled (sent_ids)
+    without a post. "merge" also counts it on the open signal (shown in its
+    result update) and moves that signal's window to the repeat's bar, so a
+    run of repeats stays one post.
+    """
+    index = _duplicate_index(ctx, cfg, state["active_signals"])
+    if index is None or not batch:
+        return batch, received, 0
+    merge = str(cfg.get("suppression", {}).get("mode", "")).lower() == "merge"
+    pending: Dict[str, SignalRecord] = {}
+    kept, kept_received = [], []
+    for item, recv in zip(batch, received):
+        _, _, sid, s = item
+        if not sid or _is_probe(cfg, sid):
+            kept.append(item)
+            kept_received.append(recv)
+            continue
+        orig = index.match(s, sid)
+        if orig is None:
+            # later signals in this batch are checked against it too (removed again if its send fails)
+            index.add(sid, s)
+            pending[sid] = s
+            kept.append(item)
+            kept_received.append(recv)
+            continue
+        state["sent_ids"].add(sid)
+        if journal is not None:
+            journal.append("sent", id=sid)
+        metrics.SIGNALS_SUPPRESSED.inc(mode="merge" if merge else "drop")
+        if not merge:
+            log(f"Dropped duplicate signal id={sid} (open: {orig})")
+            continue
+        target = state["active_signals"].get(orig) or pending.get(orig)
+        if target is not None:
+            target.extra["repeats"] = int(target.extra.get("repeats", 0) or 0) + 1
+            target.extra["repeat_time"] = s.signal_time
+            index.add(orig, target, s.signal_time)
+            if journal is not None and orig in state["active_signals"]:
+                journal.append("open", id=orig, signal=target.to_state())
+        log(f"Merged duplicate signal id={sid} into {orig}")
+    return kept, kept_received, len(batch) - len(kept)
+
+
+def _open_signal(state: dict, ctx: dict, journal, sid: str, entry: SignalRecord) -> None:
+    state["active_signals"][sid] = entry
+    _trigger_index(ctx, state["active_signals"]).add(sid, entry)
+    if ctx.get("expiry_queue") is not None:
+        ctx["expiry_queue"].add(sid, entry)
+    if ctx.get("duplicate_index") is not None:
+        ctx["duplicate_index"].add(sid, entry, str(entry.get("repeat_time", "")))
+    if journal is not None:
+        journal.append("open", id=sid, signal=entry.to_state())
+
+
+def _close_signal(state: dict, ctx: dict, journal, sid: str, result: Dict[str, Any] | None) -> None:
+    state["active_signals"].pop(sid, None)
+    _trigger_index(ctx, state["active_signals"]).remove(sid)
+    if ctx.get("expiry_queue") is not None:
+        ctx["expiry_queue"].remove(sid)
+    if ctx.get("duplicate_index") is not None:
+        ctx["duplicate_index"].remove(sid)
+    if result is not None:
+        state["closed_results"][sid] = result
+    if journal is not None:
+        journal.append("close", id=sid, result=result)
+
+
+def _outbox(ctx: dict, cfg: dict) -> Outbox | None:
+    path = str(cfg.get("delivery", {}).get("outbox_file", "") or "").strip()
+    if not path:
+        return None
+    box = ctx.get("outbox")
+    if box is None or box.path != path:
+        box = Outbox(path)
+        ctx["outbox"] = box
+    return box
+
+
+def _latency_log(ctx: dict, cfg: dict) -> LatencyLog | None:
+    path = str(cfg.get("latency", {}).get("log_file", "") or "").strip()
+    if not path:
+        return None
+    llog = ctx.get("latency_log")
+    if llog is None or llog.path != path:
+        llog = LatencyLog(path)
+        ctx["latency_log"] = llog
+    return llog
+
+
+def _timed_send(bot_token: str, chat_id: str, text: str, api_base: str = TELEGRAM_API, limit: bool = True) -> tuple[float, float]:
+    """Send and return (send start, Telegram ack) wall-clock times."""
+    started = time.time()
+    send_telegram_message(bot_token, chat_id, text, api_base=api_base, limit=limit)
+    return started, time.time()
+
+
+def _rate_limited(cfg: dict) -> bool:
+    """telegram.rate_limit.enabled; when on, its limits are applied to the shared limiter."""
+    rate_cfg = cfg.get("telegram", {}).get("rate_limit", {}) or {}
+    if not bool(rate_cfg.get("enabled", True)):
+        return False
+    # configure() keeps the buckets while the limits are unchanged, so pacing carries over between runs
+    default_limiter.configure({k: float(v) for k, v in rate_cfg.items() if k != "enabled" and k != "workers"})
+    return True
+
+
+def _message_classes(cfg: dict) -> Dict[str, Dict[str, float]]:
+    # telegram.priority_classes overrides the built-in result/signal/ops priorities and deadlines.
+    return class_table(cfg.get("telegram", {}).get("priority_classes"))
+
+
+def _deliver_many(
+    cfg: dict,
+    ctx: dict,
+    jobs: list[tuple[str, str, str | None]],
+    traces: list[list[Dict[str, Any]] | None] | None = None,
+    chat_id: str | None = None,
+    chats: list[str] | None = None,
+    after: list[str | None] | None = None,
+    written: list[list[float] | None] | None = None,
+) -> list[Exception | None]:
+    """Deliver (kind, text, dedup_key) jobs; returns the error (or None) per job.
+
+    With delivery.outbox_file set, jobs are only enqueued. Otherwise they are
+    sent right away: through the rate-limited priority dispatcher (chats in
+    parallel), or one by one with runtime.sleep_between_sends_sec when
+    telegram.rate_limit.enabled is false. Either way results go before new
+    signals before ops messages (see telegram_dispatch.MESSAGE_CLASSES).
+
+    ``traces`` (per job, optional) are latency trace stubs of the signals a
+    job carries; they are completed with send/ack times in latency.log_file.
+    ``chat_id`` defaults to telegram.chat_id; ``chats`` (per job) overrides it.
+    ``after`` (per job, outbox only) is the dedup key of a message that must
+    be delivered first; ``written`` (per job, outbox only) the file write
+    times of its signals, observed as file -> send delay once the worker sends.
+    """
+    if not jobs:
+        return []
+    chats = chats or [chat_id or cfg["telegram"]["chat_id"]] * len(jobs)
+    bot_token = cfg["telegram"]["bot_token"]
+    api_base = telegram_api_base(cfg)
+    traces = traces or [None] * len(jobs)
+    after = after or [None] * len(jobs)
+    written = written or [None] * len(jobs)
+    classes = _message_classes(cfg)
+
+    box = _outbox(ctx, cfg)
+    if box is not None:
+        errors: list[Exception | None] = []
+        for (kind, text, dedup_key), trace, chat_id, dep, wrote in zip(jobs, traces, chats, after, written):
+            # the delivery worker writes the latency record / file -> send delay once Telegram acks
+            meta: Dict[str, Any] = {}
+            if trace:
+                meta["trace"] = trace
+            if wrote:
+                meta["written_at"] = wrote
             try:
-                send_telegram_message(
-                    cfg["telegram"]["bot_token"],
-                    cfg["telegram"]["chat_id"],
-                    text,
+                box.enqueue(
+                    kind, chat_id, text, dedup_key=dedup_key, meta=meta or None,
+                    priority=int(classes[message_class(kind)]["priority"]), after_key=dep,
                 )
+                errors.append(None)
             except Exception as e:
-                # Do not advance offset so the same signal retries on next loop.
-                new_offset = line_start
-                log(f"Send failed for signal id={sid or '-'}: {e}")
-                break
+                errors.append(e)
+        wakeup = ctx.get("outbox_wakeup")
+        if wakeup is not None:
+            wakeup.set()
+        return errors
 
-            if sid:
-                sent_ids.add(sid)
-                # Start lifecycle tracking for TP/SL updates
-                active_signals[sid] = {
-                    "id": sid,
-                    "pair": s.get("pair"),
-                    "tf": s.get("tf"),
-                    "side": s.get("side"),
-                    "entry": s.get("entry"),
-                    "sl": s.get("sl"),
-                    "tp": s.get("tp"),
-                    "signal_time": s.get("signal_time") or s.get("time") or _ts(),
-                    "opened_at": _ts(),
-                    "status": "OPEN",
-                }
-            sent_count += 1
-            new_offset = f.tell()
-            log(f"Sent signal id={sid or '-'} pair={s.get('pair')} tf={s.get('tf')} side={s.get('side')}")
-
-            if sent_count < max_per_run:
+    if _rate_limited(cfg):
+        workers = int((cfg.get("telegram", {}).get("rate_limit", {}) or {}).get("workers", 4))
+        dispatcher = default_dispatcher(max_workers=workers)
+        if ctx.get("priority_classes") != classes:
+            dispatcher.configure(classes)
+            ctx["priority_classes"] = classes
+        # one queue per chat, most urgent class first; different chats are sent in parallel.
+        # Queued as one batch so no worker can start a signal before this cycle's results are in.
+        futures = dispatcher.schedule_many([
+            (message_class(kind), chat_id, _timed_send, (bot_token, chat_id, text, api_base), {})
+            for (kind, text, _), chat_id in zip(jobs, chats)
+        ])
+        errors = []
+        times = []
+        for fut in futures:
+            try:
+                times.append(fut.result())
+                errors.append(None)
+            except Exception as e:
+                times.append(None)
+                errors.append(e)
+    else:
+        sleep_between = float(cfg.get("runtime", {}).get("sleep_between_sends_sec", 1.2))
+        errors = [None] * len(jobs)
+        times = [None] * len(jobs)
+        queued = time.monotonic()
+        # stable: same-class jobs keep their order
+        order = sorted(range(len(jobs)), key=lambda i: classes[message_class(jobs[i][0])]["priority"])
+        failed = False
+        for n, i in enumerate(order):
+            if failed:
+                errors[i] = RuntimeError("not attempted after previous send failure")
+                continue
+            if n > 0 and sleep_between > 0:
                 time.sleep(sleep_between)
+            cls = message_class(jobs[i][0])
+            waited = time.monotonic() - queued
+            metrics.QUEUE_WAIT_SECONDS.observe(waited, cls=cls)
+            if waited > classes[cls]["deadline_sec"]:
+                metrics.DEADLINE_MISSES.inc(cls=cls)
+            try:
+                times[i] = _timed_send(bot_token, chats[i], jobs[i][1], api_base, limit=False)
+            except Exception as e:
+                errors[i] = e
+                failed = True
+
+    for (kind, _, _), err in zip(jobs, errors):
+        (metrics.MESSAGES_SENT if err is None else metrics.MESSAGES_FAILED).inc(kind=kind)
+    llog = _latency_log(ctx, cfg)
+    if llog is not None:
+        for trace, t in zip(traces, times):
+            if trace and t is not None:
+                llog.write(trace, *t)
+    return errors
+
+
+def _routing(ctx: dict, cfg: dict) -> RoutingTable:
+    key = (json.dumps(cfg.get("routes"), sort_keys=True, default=str), cfg.get("telegram", {}).get("chat_id"))
+    table = ctx.get("routing")
+    if table is None or ctx.get("routing_key") != key:
+        table = RoutingTable.from_config(cfg)
+        ctx["routing"], ctx["routing_key"] = table, key
+    return table
+
+
+def _fan_out(
+    cfg: dict,
+    ctx: dict,
+    jobs: list[tuple[str, str, str | None]],
+    targets: list[tuple[str, ...]],
+    traces: list[list[Dict[str, Any]] | None] | None = None,
+    after: list[str | None] | None = None,
+    written: list[list[float] | None] | None = None,
+) -> list[Exception | None]:
+    """Deliver each job (formatted once) to every chat in its ``targets``, all in one dispatch.
+
+    A job counts as delivered only when every target acked; the chats that
+    already got it are remembered (ctx["fanout_done"], by dedup key) so a
+    retry next cycle only goes to the ones that failed. Outbox dedup keys
+    (and ``after`` keys) get an ``@chat`` suffix for chats other than
+    telegram.chat_id.
+    """
+    default_chat = str(cfg.get("telegram", {}).get("chat_id", "") or "")
+    done: Dict[str, set] = ctx.setdefault("fanout_done", {})
+    traces = traces or [None] * len(jobs)
+    after = after or [None] * len(jobs)
+    written = written or [None] * len(jobs)
+
+    def per_chat(key: str | None, chat: str) -> str | None:
+        return key if key is None or chat == default_chat else f"{key}@{chat}"
+
+    flat: list[tuple[str, str, str | None]] = []
+    flat_chats: list[str] = []
+    flat_traces: list = []
+    flat_after: list[str | None] = []
+    flat_written: list = []
+    owner: list[tuple[int, str]] = []
+    for j, ((kind, text, key), chats, trace, dep, wrote) in enumerate(zip(jobs, targets, traces, after, written)):
+        skip = done.get(key, ()) if key else ()
+        first = True
+        for chat in chats:
+            if chat in skip:
+                continue
+            flat.append((kind, text, per_chat(key, chat)))
+            flat_chats.append(chat)
+            flat_after.append(per_chat(dep, chat))
+            # one latency record per signal: the first chat it goes to
+            flat_traces.append(trace if first else None)
+            flat_written.append(wrote if first else None)
+            first = False
+            owner.append((j, chat))
+
+    errors: list[Exception | None] = [None] * len(jobs)
+    for (j, chat), err in zip(owner, _deliver_many(cfg, ctx, flat, flat_traces, chats=flat_chats, after=flat_after, written=flat_written)):
+        key = jobs[j][2]
+        if err is None:
+            if key and len(targets[j]) > 1:
+                done.setdefault(key, set()).add(chat)
+        elif errors[j] is None:
+            errors[j] = err
+    for (_, _, key), err in zip(jobs, errors):
+        if key and err is None:
+            done.pop(key, None)
+    return errors
+
+
+def _signal_jobs(cfg: dict, batch: list) -> tuple[list[tuple[str, str, str | None]], list[list[int]]]:
+    """Messages for a batch of new signals and which batch items each one carries.
+
+    With runtime.coalesce_min_burst >= 2 and at least that many signals in
+    the batch, they are merged into digest message(s); otherwise one
+    message per signal.
+    """
+    min_burst = int(cfg.get("runtime", {}).get("coalesce_min_burst", 0) or 0)
+    if min_burst < 2 or len(batch) < min_burst:
+        jobs = [("signal", format_signal_message(s), f"signal:{sid}" if sid else None) for _, _, sid, s in batch]
+        return jobs, [[i] for i in range(len(batch))]
+
+    jobs = []
+    groups = []
+    for text, idxs in format_signal_digest([item[3] for item in batch]):
+        sids = ",".join(batch[i][2] or f"{batch[i][0]}@{batch[i][1]}" for i in idxs)
+        key = "digest:" + hashlib.sha1(sids.encode("utf-8")).hexdigest()
+        jobs.append(("digest", text, key))
+        groups.append(idxs)
+    log(f"Coalesced {len(batch)} signals into {len(jobs)} digest message(s)")
+    return jobs, groups
+
+
+PROBE_PREFIX = "HC-"
+
 
-    # Evaluate active signals against latest MT5 prices and send TP/SL updates.
-    lifecycle_updates = 0
+def _canary_chat(cfg: dict) -> str:
+    return str(cfg.get("canary", {}).get("chat_id", "") or "").strip()
+
+
+def _is_probe(cfg: dict, sid: str) -> bool:
+    # Health-check probes only get special routing once a canary chat exists.
+    return bool(sid) and sid.startswith(PROBE_PREFIX) and bool(_canary_chat(cfg))
+
+
+def _batch_jobs(cfg: dict, ctx: dict, batch: list, traces: list | None = None) -> tuple[list, list, list | None, list[list[int]]]:
+    """Messages for new signals: (jobs, targets, job traces, batch items per job).
+
+    Signals go to their routed chats, health-check probes to canary.chat_id
+    when set. Signals with the same destination set share one message build
+    (single or digest) that is then fanned out to all of those chats at once.
+    Signals that match no route are in no job.
+    """
+    routing = _routing(ctx, cfg)
+    groups: Dict[tuple[str, ...], list[int]] = {}
+    for i, (_, _, sid, s) in enumerate(batch):
+        chats = (_canary_chat(cfg),) if _is_probe(cfg, sid) else routing.chats(s.pair, s.tf, s.side)
+        groups.setdefault(chats, []).append(i)
+
+    jobs: list[tuple[str, str, str | None]] = []
+    targets: list[tuple[str, ...]] = []
+    members: list[list[int]] = []
+    for chats, idxs in groups.items():
+        if not chats:
+            continue
+        group_jobs, parts = _signal_jobs(cfg, [batch[i] for i in idxs])
+        jobs.extend(group_jobs)
+        targets.extend([chats] * len(group_jobs))
+        members.extend([idxs[k] for k in part] for part in parts)
+    job_traces = [[traces[i] for i in part] for part in members] if traces else None
+    return jobs, targets, job_traces, members
+
+
+def make_delivery_worker(cfg: dict, box: Outbox, **kwargs: Any) -> DeliveryWorker:
+    delivery = cfg.get("delivery", {})
+    bot_token = cfg["telegram"]["bot_token"]
+    api_base = telegram_api_base(cfg)
+    limit = _rate_limited(cfg)
+
+    def send(chat_id: str, text: str) -> None:
+        # single attempt: the worker owns the retry schedule
+        try:
+            send_telegram_message(bot_token, chat_id, text, max_retries=0, api_base=api_base, limit=limit)
+        except Exception:
+            metrics.MESSAGES_FAILED.inc(kind="outbox")
+            raise
+        metrics.MESSAGES_SENT.inc(kind="outbox")
+
+    llog = _latency_log({}, cfg)
+    classes = _message_classes(cfg)
+
+    def on_sent(row: Any, started: float, acked: float) -> None:
+        cls = message_class(row["kind"])
+        waited = max(0.0, started - float(row["created_at"]))
+        metrics.QUEUE_WAIT_SECONDS.observe(waited, cls=cls)
+        if waited > classes[cls]["deadline_sec"]:
+            metrics.DEADLINE_MISSES.inc(cls=cls)
+        try:
+            meta = json.loads(row["meta"] or "{}")
+        except ValueError:
+            meta = {}
+        if not isinstance(meta, dict):
+            meta = {}
+        for wrote in meta.get("written_at") or []:
+            metrics.FILE_TO_SEND_SECONDS.observe(max(0.0, acked - float(wrote)))
+        if llog is not None and meta.get("trace"):
+            llog.write(meta["trace"], started, acked)
+
+    def on_failed(row: Any, exc: Exception, retry_in: float | None) -> None:
+        if retry_in is not None:
+            metrics.MESSAGES_RETRIED.inc(reason="outbox")
+
+    kwargs.setdefault("on_sent", on_sent)
+    kwargs.setdefault("on_failed", on_failed)
+    return DeliveryWorker(
+        box,
+        send,
+        retry_schedule=delivery.get("retry_schedule_sec"),
+        max_attempts=int(delivery.get("max_attempts", 20)),
+        poll_interval=float(delivery.get("poll_interval_sec", 1.0)),
+        **kwargs,
+    )
+
+
+def _segment_log(ctx: dict, feed: Dict[str, Any]) -> SegmentLog:
+    logs = ctx.setdefault("segment_logs", {})
+    seglog = logs.get(feed["name"])
+    if seglog is None or seglog.pattern != feed["segments"]:
+        seglog = SegmentLog(feed["segments"], feed["manifest"])
+        logs[feed["name"]] = seglog
+    return seglog
+
+
+def _feed_sources(state: dict, ctx: dict, feed: Dict[str, Any]) -> tuple[list[tuple[str, str]], tuple[str, int]]:
+    """Files to read for a feed, oldest first, and the cursor to start from."""
+    seg, offset = _feed_cursor(state, feed)
+    if not feed["segments"]:
+        return [("", feed["signal_file"])], (seg, offset)
+
+    seglog = _segment_log(ctx, feed)
+    names = [e["name"] for e in seglog.refresh()]
+    if seg not in names:
+        # First run, or the cursor segment was removed by retention: go to the next one.
+        later = [n for n in names if n > seg]
+        if seg:
+            log(f"Segment {seg} not found, continue at {later[0] if later else '-'} (feed={feed['name']})")
+        if later:
+            seg, offset = later[0], 0
+    return [(n, seglog.path_of(n)) for n in names if n >= seg], (seg, offset)
+
+
+def _ingest_feed(cfg: dict) -> Dict[str, Any]:
+    """Feed that socket-ingested signals belong to (ingest.feed, default the first one)."""
+    feeds = feeds_from_config(cfg)
+    name = str(cfg.get("ingest", {}).get("feed", "") or "") or feeds[0]["name"]
+    for feed in feeds:
+        if feed["name"] == name:
+            if feed["segments"]:
+                raise ValueError(f"Ingest feed '{name}' must use a plain signal_file, not signal_segments")
+            return feed
+    raise ValueError(f"Unknown ingest.feed '{name}'")
+
+
+def _ingest_signals(ctx: dict, feeds: list[Dict[str, Any]], sent_ids: DedupStore, limit: int) -> list[tuple[str, tuple[str, int], str, SignalRecord, float]]:
+    """Accepted signals queued by the ingest socket: batch items + receive time.
+
+    At most ``limit`` (runtime.max_messages_per_run) are taken; the rest stay
+    queued for the next cycle.
+    """
+    ingest = ctx.get("ingest")
+    if ingest is None:
+        return []
+    feed = next((f for f in feeds if f["name"] == ctx.get("ingest_feed")), None)
+    out = []
+    seen = set()
+    while len(out) < limit:
+        queued = ingest.drain_signals(limit - len(out))
+        if not queued:
+            break
+        for pos, s, received in queued:
+            sid = s.id
+            if feed is None or sid in sent_ids or sid in seen:
+                continue
+            if s.pair not in feed["symbols"] or s.tf not in feed["tfs"]:
+                continue
+            seen.add(sid)
+            out.append((feed["name"], pos, sid, s, received))
+    return out
+
+
+def _scan_feed(state: dict, ctx: dict, feed: Dict[str, Any], sent_ids: DedupStore, batch: list, max_per_run: int, skip: frozenset = frozenset()) -> Dict[str, Any]:
+    """Read new lines of one feed; accepted signals are appended to ``batch``.
+
+    Positions are (segment, offset) cursors; plain feeds use segment "".
+    ``skip``: ids already taken from the ingest socket this cycle.
+    """
+    name = feed["name"]
+    sources, cursor = _feed_sources(state, ctx, feed)
+    cursor_before = cursor
+
+    scanned_lines = 0
+    capped = False
+    taken = 0
+    file_size = 0
+    written_at = 0.0
+    read_at = time.time()
+
+    for i, (seg, path) in enumerate(sources):
+        offset = cursor[1] if i == 0 else 0
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        file_size = st.st_size
+        # best estimate of when the newest lines were written
+        written_at = max(written_at, st.st_mtime)
+        if offset > file_size:
+            log(f"Offset ({offset}) > file size ({file_size}), reset to 0 (rotation/truncate detected, feed={name})")
+            offset = 0
+        cursor = (seg, offset)
+
+        with open(path, "rb") as f:
+            f.seek(offset)
+
+            while True:
+                line_start = f.tell()
+                line = f.readline()
+                if not line:
+                    cursor = (seg, f.tell())
+                    break
+
+                scanned_lines += 1
+                line = line.strip()
+                if not line:
+                    cursor = (seg, f.tell())
+                    continue
+
+                s = decode_signal(line)
+                if s is None:
+                    log("Skip malformed JSON line")
+                    cursor = (seg, f.tell())
+                    continue
+
+                sid = s.id
+
+                if sid and (sid in sent_ids or sid in skip):
+                    cursor = (seg, f.tell())
+                    continue
+
+                # If this run already hit cap, keep offset at current line for next run.
+                if taken >= max_per_run:
+                    cursor = (seg, line_start)
+                    capped = True
+                    log(f"Reached max messages/run ({max_per_run}) on feed {name}, will continue next cycle")
+                    break
+
+                if s.pair not in feed["symbols"] or s.tf not in feed["tfs"]:
+                    cursor = (seg, f.tell())
+                    continue
+
+                batch.append((name, (seg, line_start), sid, s))
+                taken += 1
+                cursor = (seg, f.tell())
+        if capped:
+            break
+
+    stats = {
+        "scanned_lines": scanned_lines,
+        "sent_count": 0,
+        "offset_before": cursor_before[1],
+        "offset_after": cursor[1],
+        "file_size": file_size,
+        "capped": capped,
+        "cursor": cursor,
+        "failed_at": None,
+        "written_at": written_at,
+        "read_at": read_at,
+    }
+    if feed["segments"]:
+        stats["segment_before"] = cursor_before[0]
+        stats["segment_after"] = cursor[0]
+    return stats
+
+
+def _lifecycle_closings(
+    state: dict,
+    ctx: dict,
+    journal,
+    new_ticks: Dict[str, list],
+    price_map: Dict[str, Dict[str, Any]],
+    only: set[str] | None = None,
+) -> list[tuple[str, Dict[str, Any], str]]:
+    """TP/SL hits of active signals (or just ``only``) on this cycle's price path per pair."""
+    active_signals: Dict[str, SignalRecord] = state["active_signals"]
+    index = _trigger_index(ctx, active_signals)
+    # Price path per pair: the ticks appended since the last check, or
+    # the latest known price when nothing new arrived.
+    hits: list[tuple[str, SignalRecord, str, float, str]] = []
+    for pair in index.pairs():
+        ticks = new_ticks.get(pair) or ([price_map[pair]] if pair in price_map else [])
+        if not ticks:
+            continue
+        path = TickPath(ticks)
+        # Only signals with a TP/SL level inside [low, high] of the path.
+        for sid in sorted(index.crossed_range(pair, path.low, path.high)):
+            if only is not None and sid not in only:
+                continue
+            sig = active_signals.get(sid)
+            if not sig:
+                continue
+            hit = path.first_hit(sig.side, sig.tp, sig.sl, not_before(sig))
+            if hit is None:
+                continue
+            result, i = hit
+            hits.append((sid, sig, result, path.price_at(i), path.stamps[i] or _ts()))
+
+    closing = []
+    for sid, sig, result, px, hit_time in hits:
+        # avoid duplicate closure posts
+        if sid in state["closed_results"]:
+            _close_signal(state, ctx, journal, sid, None)
+            continue
+        closing.append(_closing(sid, sig, result, px, hit_time))
+    return closing
+
+
+def _result_jobs(cfg: dict, ctx: dict, state: dict, closing: list) -> tuple[list, list[tuple[str, ...]], list[str | None]]:
+    """Result messages with their routed chats and the key of the signal message each must follow."""
+    active_signals: Dict[str, SignalRecord] = state["active_signals"]
+    routing = _routing(ctx, cfg)
+    announced = ctx.get("announce_keys") or {}
+    jobs, targets, after = [], [], []
+    for sid, _, msg in closing:
+        sig = active_signals[sid]
+        jobs.append(("result", msg, f"result:{sid}"))
+        targets.append(routing.chats(sig.pair, sig.tf, sig.side, "result"))
+        after.append(announced.get(sid, f"signal:{sid}"))
+    return jobs, targets, after
+
+
+def _apply_results(state: dict, ctx: dict, journal, closing: list, errors: list[Exception | None]) -> int:
+    """Close the signals whose result was delivered; returns how many closed."""
+    active_signals: Dict[str, SignalRecord] = state["active_signals"]
+    announced = ctx.get("announce_keys") or {}
+    closed_count = 0
+    for (sid, closed, _), err in zip(closing, errors):
+        if err is not None:
+            log(f"Result send failed for id={sid}: {err}")
+            if closed["result"] == "EXPIRED" and sid in active_signals and ctx.get("expiry_queue") is not None:
+                ctx["expiry_queue"].add(sid, active_signals[sid])  # still due: retried next cycle
+            continue
+        pair = active_signals[sid].pair if sid in active_signals else ""
+        _close_signal(state, ctx, journal, sid, closed)
+        announced.pop(sid, None)
+        closed_count += 1
+        metrics.LIFECYCLE_CLOSES.inc(result=str(closed["result"]))
+        log(f"Closed signal id={sid} result={closed['result']} pair={pair} price={closed['hit_price']}")
+    return closed_count
+
+
+def run_cycle(cfg: dict, state: dict, journal=None, ctx: dict | None = None) -> dict | None:
+    """One ingest + lifecycle pass over an in-memory (hydrated) state.
+
+    Mutates ``state`` in place. When ``journal`` is given, every change is
+    also appended to it as a small record. ``ctx`` holds live helpers (price
+    reader, ...) that a long-running caller keeps between cycles.
+    """
+    ctx = {} if ctx is None else ctx
+    started = time.perf_counter()
+    feeds = [f for f in feeds_from_config(cfg) if _feed_available(f)]
+    for f in feeds_from_config(cfg):
+        if not _feed_available(f):
+            log(f"Signal file not found: {_feed_label(f)} (feed={f['name']})")
+    if not feeds:
+        return None
+
+    sent_ids: DedupStore = state["sent_ids"]
+    active_signals: Dict[str, SignalRecord] = state["active_signals"]
+    closed_results: Dict[str, Dict[str, Any]] = state["closed_results"]
+
+    max_per_run = int(cfg.get("runtime", {}).get("max_messages_per_run", 3))
+    if _outbox(ctx, cfg) is not None:
+        # Ingest only enqueues; pacing and retries belong to the delivery workers.
+        max_per_run = int(cfg.get("delivery", {}).get("max_enqueue_per_run", 1000))
+
+    monitor_cfg = cfg.get("monitoring", {})
+    monitoring_enabled = bool(monitor_cfg.get("enabled", True))
+    price_file = str(monitor_cfg.get("price_file", "")).strip()
+    price_ring = str(monitor_cfg.get("price_ring", "") or "").strip()
+
+    expiry = _expiry_queue(ctx, cfg, active_signals)
+
+    # Bootstrap tracker for previously-sent signals (before lifecycle feature existed)
+    boot_added = 0
+    if not active_signals:
+        booted: Dict[str, SignalRecord] = {}
+        clock = _expiry_clock(cfg, (state.get("price_feed") or {}).get("latest") or {})
+        expired = (lambda sig: expiry.expired(sig, clock[0])) if clock is not None else None
+        for feed in feeds:
+            history = feed["signal_file"]
+            if feed["segments"]:
+                seglog = _segment_log(ctx, feed)
+                segs = seglog.refresh()
+                history = seglog.path_of(segs[-1]["name"]) if segs else ""
+            feed_booted: Dict[str, SignalRecord] = {}
+            boot_added += _bootstrap_active_signals_from_history(history, sent_ids, feed_booted, closed_results, expired=expired)
+            booted.update(feed_booted)
+        for sid, sig in booted.items():
+            _open_signal(state, ctx, journal, sid, sig)
+    if boot_added > 0:
+        log(f"Bootstrapped active signals from history: {boot_added}")
+
+    # Signals that came in over the ingest socket are already decoded; the
+    # file scan below skips their (audit) lines.
+    pushed = _ingest_signals(ctx, feeds, sent_ids, max_per_run)
+    skip = frozenset(item[2] for item in pushed)
+
+    # Scan every feed first, then deliver all accepted signals in one batch so
+    # sends to different chats/feeds go out concurrently.
+    feed_stats: Dict[str, Dict[str, Any]] = {}
+    batch: list[tuple[str, tuple[str, int], str, SignalRecord]] = []
+    for feed in feeds:
+        # socket signals count against their feed's per-run cap
+        cap = max_per_run - len(pushed) if feed["name"] == ctx.get("ingest_feed") else max_per_run
+        feed_stats[feed["name"]] = _scan_feed(state, ctx, feed, sent_ids, batch, cap, skip)
+    received = [None] * len(batch) + [item[4] for item in pushed]
+    batch.extend(item[:4] for item in pushed)
+    batch, received, suppressed = _suppress_duplicates(cfg, state, ctx, journal, batch, received)
+
+    traces = None
+    if _latency_log(ctx, cfg) is not None:
+        traces = [
+            signal_trace(s, sid, recv or feed_stats[name]["read_at"], recv or feed_stats[name]["written_at"])
+            for (name, _, sid, s), recv in zip(batch, received)
+        ]
+
+    # Lifecycle is evaluated before anything is sent: TP/SL/expiry results go
+    # out in the same dispatch as the new signals and ahead of them.
+    price_rows = 0
+    new_ticks: Dict[str, list] = {}
+    ingest = ctx.get("ingest")
+    has_prices = bool(price_file or price_ring) or ingest is not None
+    if monitoring_enabled and has_prices:
+        reader = _price_reader(ctx, state, price_file, monitor_cfg)
+        if reader.rotations > int(ctx.get("price_rotations_seen", 0)):
+            log(f"Price feed rotation/truncate detected (price feed='{price_ring or price_file}')")
+            ctx["price_rotations_seen"] = reader.rotations
+        if ingest is not None:
+            reader.push(ingest.drain_ticks())
+        new_ticks = reader.poll()
+        price_rows = sum(len(v) for v in new_ticks.values())
+        state["price_feed"] = reader.to_state()
+        if journal is not None:
+            # position only (offset / ring counts): a restart must not re-read consumed ticks
+            mark = json.dumps({k: v for k, v in state["price_feed"].items() if k != "latest"}, sort_keys=True)
+            if price_rows or mark != ctx.get("price_feed_journaled"):
+                journal.append("price_feed", feed=state["price_feed"])
+                ctx["price_feed_journaled"] = mark
+
+    closing: list[tuple[str, Dict[str, Any], str]] = []
+    price_map = ctx["price_reader"].price_map() if monitoring_enabled and has_prices else {}
     if monitoring_enabled and active_signals:
-        price_map = _load_price_map(price_file)
         if not price_map:
-            log(f"Monitoring enabled but no price map loaded (price_file='{price_file}')")
+            log(f"Monitoring enabled but no price map loaded (price feed='{price_ring or price_file}')")
         else:
-            for sid, sig in list(active_signals.items()):
-                pair = str(sig.get("pair") or "")
-                px = _to_float((price_map.get(pair) or {}).get("price"))
-                hit_time = str((price_map.get(pair) or {}).get("time") or _ts())
-                if px is None:
-                    continue
+            closing = _lifecycle_closings(state, ctx, journal, new_ticks, price_map)
 
-                result = _evaluate_result(sig, px)
-                if not result:
+    # Signals open for monitoring.expiry_bars bars without TP/SL: only the due ones are popped.
+    if active_signals and len(expiry):
+        clock = _expiry_clock(cfg, price_map)
+        if clock is not None:
+            closing_ids = {sid for sid, _, _ in closing}
+            for sid in expiry.pop_due(clock[0]):
+                sig = active_signals.get(sid)
+                if not sig or sid in closing_ids:
                     continue
-
-                # avoid duplicate closure posts
                 if sid in closed_results:
-                    active_signals.pop(sid, None)
+                    _close_signal(state, ctx, journal, sid, None)
                     continue
+                px = (price_map.get(sig.pair) or {}).get("price")
+                closing.append(_closing(sid, sig, "EXPIRED", px, clock[1]))
 
-                duration_min = _signal_duration_min(sig, hit_time)
-                msg = format_signal_result_message(sig, result=result, hit_price=px, hit_time=hit_time, duration_min=duration_min)
-                try:
-                    send_telegram_message(cfg["telegram"]["bot_token"], cfg["telegram"]["chat_id"], msg)
-                except Exception as e:
-                    log(f"Result send failed for id={sid}: {e}")
-                    continue
+    jobs, targets, job_traces, members = _batch_jobs(cfg, ctx, batch, traces)
+    result_jobs, result_targets, result_after = _result_jobs(cfg, ctx, state, closing)
+    job_written = None
+    if ctx.get("outbox") is not None:
+        # file -> send delay is observed by the delivery worker (see make_delivery_worker)
+        wrote = [recv or feed_stats[name]["written_at"] for (name, _, _, _), recv in zip(batch, received)]
+        job_written = [[wrote[i] for i in part if wrote[i]] for part in members] + [None] * len(result_jobs)
+    errors = _fan_out(
+        cfg,
+        ctx,
+        jobs + result_jobs,
+        targets + result_targets,
+        (job_traces or [None] * len(jobs)) + [None] * len(result_jobs),
+        [None] * len(jobs) + result_after,
+        job_written,
+    )
+    batch_errors: list[Exception | None] = [None] * len(batch)
+    for j, part in enumerate(members):
+        for i in part:
+            batch_errors[i] = errors[j]
+    lifecycle_updates = _apply_results(state, ctx, journal, closing, errors[len(jobs):])
 
-                closed_results[sid] = {
-                    "id": sid,
-                    "result": result,
-                    "hit_price": px,
-                    "hit_time": hit_time,
-                    "duration_min": duration_min,
-                    "closed_at": _ts(),
-                }
-                active_signals.pop(sid, None)
-                lifecycle_updates += 1
-                log(f"Closed signal id={sid} result={result} pair={pair} price={px}")
-
-    # Keep recent IDs in stable order.
-    sent_ids_tail = sorted(sent_ids)[-2000:]
-    # Keep closed results bounded.
-    if len(closed_results) > 4000:
-        # approximate trim by key sort
-        for k in sorted(closed_results.keys())[:-3000]:
-            closed_results.pop(k, None)
+    verb = "Queued" if ctx.get("outbox") is not None else "Sent"
+    announced: Dict[str, str] = ctx.setdefault("announce_keys", {})
+    opened: set[str] = set()
+    job_of = {i: j for j, part in enumerate(members) for i in part}
+    for i, ((name, pos, sid, s), err) in enumerate(zip(batch, batch_errors)):
+        fs = feed_stats[name]
+        if err is not None:
+            # Do not advance offset past this signal so it retries on next loop.
+            if fs["failed_at"] is None or pos < fs["failed_at"]:
+                fs["failed_at"] = pos
+            log(f"Send failed for signal id={sid or '-'}: {err}")
+            if ctx.get("duplicate_index") is not None and sid not in active_signals:
+                ctx["duplicate_index"].remove(sid)
+            continue
+        if i not in job_of:
+            # no route matched: nothing delivered, so no lifecycle tracking either
+            if sid:
+                sent_ids.add(sid)
+                if journal is not None:
+                    journal.append("sent", id=sid)
+                if ctx.get("duplicate_index") is not None:
+                    ctx["duplicate_index"].remove(sid)
+            log(f"Dropped (no route) signal id={sid or '-'} pair={s.pair} tf={s.tf} side={s.side}")
+            continue
+        if sid:
+            sent_ids.add(sid)
+            if journal is not None:
+                journal.append("sent", id=sid)
+            # Start lifecycle tracking for TP/SL updates (canary probes are not trades)
+            if not _is_probe(cfg, sid):
+                _open_signal(state, ctx, journal, sid, _new_active_entry(s, sid))
+                opened.add(sid)
+                if jobs[job_of[i]][2]:
+                    announced[sid] = jobs[job_of[i]][2]
+        fs["sent_count"] += 1
+        if ctx.get("outbox") is None and fs["written_at"]:
+            metrics.FILE_TO_SEND_SECONDS.observe(max(0.0, time.time() - fs["written_at"]))
+        log(f"{verb} signal id={sid or '-'} pair={s.pair} tf={s.tf} side={s.side}")
+
+    # Signals opened just now still get this cycle's ticks (after their own announcement).
+    if opened and price_map:
+        late = _lifecycle_closings(state, ctx, journal, new_ticks, price_map, only=opened)
+        if late:
+            result_jobs, result_targets, result_after = _result_jobs(cfg, ctx, state, late)
+            errors = _fan_out(cfg, ctx, result_jobs, result_targets, None, result_after)
+            lifecycle_updates += _apply_results(state, ctx, journal, late, errors)
+
+    for feed in feeds:
+        fs = feed_stats[feed["name"]]
+        failed_at = fs.pop("failed_at")
+        cursor = fs.pop("cursor")
+        fs.pop("written_at")
+        fs.pop("read_at")
+        if failed_at is not None:
+            cursor = failed_at
+            fs["offset_after"] = cursor[1]
+            if feed["segments"]:
+                fs["segment_after"] = cursor[0]
+            fs["capped"] = False
+        _set_feed_cursor(state, feed, cursor, journal)
 
-    state["offset"] = new_offset
-    state["sent_ids"] = sent_ids_tail
-    state["active_signals"] = active_signals
-    state["closed_results"] = closed_results
+    first = feed_stats[feeds[0]["name"]]
     state["last_run_at"] = _ts()
     state["last_run_stats"] = {
-        "scanned_lines": scanned_lines,
-        "sent_count": sent_count,
+        "scanned_lines": sum(fs["scanned_lines"] for fs in feed_stats.values()),
+        "sent_count": sum(fs["sent_count"] for fs in feed_stats.values()),
+        "suppressed": suppressed,
         "bootstrapped_active": boot_added,
         "lifecycle_updates": lifecycle_updates,
         "active_open": len(active_signals),
-        "offset_before": offset,
-        "offset_after": new_offset,
-        "file_size": file_size,
+        "offset_before": first["offset_before"],
+        "offset_after": first["offset_after"],
+        "file_size": first["file_size"],
+        "price_rows": price_rows,
+        "outbox_backlog": ctx["outbox"].backlog() if ctx.get("outbox") is not None else None,
+        "cap_reached": any(fs["capped"] for fs in feed_stats.values()),
+        "feeds": feed_stats,
     }
-    save_state(cfg["state_file"], state)
 
-    log(
-        f"Run done: scanned={scanned_lines}, sent={sent_count}, offset {offset}->{new_offset}, file_size={file_size}"
-    )
+    totals = state["last_run_stats"]
+
+    def pos(fs: Dict[str, Any], when: str) -> str:
+        seg = fs.get(f"segment_{when}")
+        return f"{seg}:{fs[f'offset_{when}']}" if seg else str(fs[f"offset_{when}"])
+
+    if len(feed_stats) == 1:
+        where = f"offset {pos(first, 'before')}->{pos(first, 'after')}, file_size={first['file_size']}"
+    else:
+        where = ", ".join(
+            f"{name} {pos(fs, 'before')}->{pos(fs, 'after')}/{fs['file_size']}" for name, fs in feed_stats.items()
+        )
+    for name, fs in feed_stats.items():
+        metrics.SCANNED_LINES.inc(fs["scanned_lines"], feed=name)
+        metrics.BACKLOG_BYTES.set(max(0, fs["file_size"] - fs["offset_after"]), feed=name)
+    metrics.OPEN_SIGNALS.set(len(active_signals))
+    if totals["outbox_backlog"] is not None:
+        metrics.OUTBOX_BACKLOG.set(totals["outbox_backlog"])
+    metrics.CYCLE_SECONDS.observe(time.perf_counter() - started)
+
+    log(f"Run done: scanned={totals['scanned_lines']}, sent={totals['sent_count']}, {where}")
+    return state["last_run_stats"]
+
+
+def run_once(config_path: str = "../config/config.json") -> dict | None:
+    cfg = load_config(config_path)
+    _check_purpose(cfg)
+
+    if not any(_feed_available(f) for f in feeds_from_config(cfg)):
+        log("Signal file not found for any feed: " + ", ".join(_feed_label(f) for f in feeds_from_config(cfg)))
+        return None
+
+    state = _hydrate_state(load_state(cfg["state_file"]), cfg)
+    ctx: dict = {}
+    stats = run_cycle(cfg, state, ctx=ctx)
+    save_state(cfg["state_file"], _snapshot_state(state))
+
+    box = ctx.get("outbox")
+    if box is not None:
+        # One-shot run: deliver what this run (or an earlier one) queued.
+        budget = float(cfg.get("delivery", {}).get("drain_max_sec", 30))
+        delivered = make_delivery_worker(cfg, box).drain_once(max_seconds=budget)
+        log(f"Outbox drained: delivered={delivered}, queue={box.counts()}")
+    return stats
+
+
+class WatcherDaemon:
+    """Long-running watcher that keeps state in memory.
+
+    State is loaded once (snapshot + journal replay); each cycle only appends
+    small journal records, and the journal is compacted into state.json from
+    time to time.
+    """
+
+    def __init__(self, config_path: str = "../config/config.json"):
+        self.config_path = config_path
+        self.cfg = load_config(config_path)
+        _check_purpose(self.cfg)
+        self._cfg_mtime = os.path.getmtime(config_path)
+
+        runtime = self.cfg.get("runtime", {})
+        self.journal = StateJournal(
+            self.cfg["state_file"],
+            compact_every=int(runtime.get("journal_compact_every", 500)),
+            compact_interval_sec=float(runtime.get("journal_compact_interval_sec", 600)),
+        )
+        self.state = _hydrate_state(load_state(self.cfg["state_file"]), self.cfg)
+        self.ctx: dict = {}
+        self.workers: list[DeliveryWorker] = []
+        log(f"Daemon state loaded: sent_ids={len(self.state['sent_ids'])}, active={len(self.state['active_signals'])}, offset={self.state['offset']}, feeds={len(feeds_from_config(self.cfg))}")
+        self._start_workers()
+        self.ingest = self._start_ingest()
+
+    def _start_ingest(self) -> IngestServer | None:
+        icfg = self.cfg.get("ingest", {})
+        if not bool(icfg.get("enabled", False)):
+            return None
+        feed = _ingest_feed(self.cfg)
+        if not os.path.exists(feed["signal_file"]):
+            os.makedirs(os.path.dirname(os.path.abspath(feed["signal_file"])), exist_ok=True)
+            open(feed["signal_file"], "ab").close()
+        server = IngestServer(
+            tcp=str(icfg.get("tcp", "") or ""),
+            unix_path=str(icfg.get("unix", "") or ""),
+            audit_file=feed["signal_file"],
+        ).start()
+        self.ctx["ingest"] = server
+        self.ctx["ingest_feed"] = feed["name"]
+        log(f"Ingest listening on {server.address} (feed={feed['name']})")
+        return server
+
+    def _start_workers(self) -> None:
+        box = _outbox(self.ctx, self.cfg)
+        if box is None:
+            return
+        wakeup = threading.Event()
+        self.ctx["outbox_wakeup"] = wakeup
+        n = max(1, int(self.cfg.get("delivery", {}).get("workers", 1)))
+        for i in range(n):
+            w = make_delivery_worker(self.cfg, box, wakeup=wakeup, name=f"outbox-worker-{i + 1}")
+            w.start()
+            self.workers.append(w)
+        log(f"Outbox delivery started: workers={n}, queue={box.counts()}")
+
+    def _maybe_reload_config(self) -> None:
+        try:
+            mtime = os.path.getmtime(self.config_path)
+        except OSError:
+            return
+        if mtime == self._cfg_mtime:
+            return
+        cfg = load_config(self.config_path)
+        _check_purpose(cfg)
+        if cfg.get("state_file") != self.cfg.get("state_file"):
+            log("Config reload ignored state_file change (restart the daemon to switch state files)")
+            cfg["state_file"] = self.cfg.get("state_file")
+        if cfg.get("delivery") != self.cfg.get("delivery"):
+            log("Config reload ignored delivery change (restart the daemon to switch outbox settings)")
+            cfg["delivery"] = self.cfg.get("delivery")
+        self.cfg = cfg
+        self._cfg_mtime = mtime
+        log("Config reloaded")
+
+    def cycle(self) -> dict | None:
+        self._maybe_reload_config()
+        stats = run_cycle(self.cfg, self.state, journal=self.journal, ctx=self.ctx)
+        if self.journal.needs_compaction():
+            self.compact()
+        return stats
+
+    def compact(self) -> None:
+        self.journal.compact(_snapshot_state(self.state))
+        box = self.ctx.get("outbox")
+        if box is not None:
+            box.purge(float(self.cfg.get("delivery", {}).get("keep_sent_days", 7)) * 86400)
+
+    def close(self) -> None:
+        if self.ingest is not None:
+            self.ingest.stop()
+        for w in self.workers:
+            w.stop()
+        for w in self.workers:
+            w.join(timeout=5)
+        self.compact()
+        self.journal.close()
+        http_client.close_all()  # keep-alive Telegram connections
 
 
 if __name__ == "__main__":
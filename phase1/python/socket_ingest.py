@@ -0,0 +1,247 @@
+import argparse
+import ipaddress
+import json
+import os
+import socket
+import socketserver
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List
+
+from price_feed import parse_price_row
+from signal_record import SignalRecord, loads
+
+MAX_LINE = 64 * 1024
+
+
+def parse_address(address: str) -> tuple[str, Any]:
+    """"127.0.0.1:9110" -> ("tcp", (host, port)); "unix:/run/alpha.sock" -> ("unix", path)."""
+    address = str(address or "").strip()
+    if address.startswith("unix:"):
+        return "unix", address[5:]
+    host, _, port = address.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"Bad ingest address '{address}' (expected host:port or unix:/path)")
+    return "tcp", (host.strip("[]"), int(port))
+
+
+def _is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def classify(obj: Dict[str, Any]) -> str:
+    """"signal" or "tick": explicit ``type`` wins; otherwise a row with a side is a signal."""
+    kind = str(obj.get("type") or "").lower()
+    if kind in ("signal", "tick"):
+        return kind
+    if obj.get("side") or obj.get("sl") is not None or obj.get("tp") is not None:
+        return "signal"
+    return "tick" if parse_price_row(obj) else "signal"
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        server: "IngestServer" = self.server.ingest  # type: ignore[attr-defined]
+        while True:
+            try:
+                line = self.rfile.readline(MAX_LINE)
+            except OSError:
+                return
+            if not line:
+                return
+            server.handle_line(line)
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+    class _UnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+else:  # Windows
+    _UnixServer = None
+
+
+class IngestServer:
+    """Localhost listener for the EA's JSON lines (signals and price ticks).
+
+    Same line format as the JSONL files. Signals are appended to
+    ``audit_file`` first (so the file stays the durable record and the retry
+    path) and queued with their byte offset for the watcher to process
+    directly; ticks are only queued. ``on_event(kind)`` is called for every
+    accepted line so a waiting loop can wake up.
+    """
+
+    def __init__(self, tcp: str = "", unix_path: str = "", audit_file: str = "", on_event: Callable[[str], None] | None = None):
+        if not tcp and not unix_path:
+            raise ValueError("Ingest needs ingest.tcp and/or ingest.unix")
+        if tcp:
+            host = parse_address(tcp)[1][0]
+            if not _is_loopback(host):
+                raise ValueError(f"Ingest only listens on localhost, not '{host}'")
+        if unix_path and _UnixServer is None:
+            raise ValueError("Unix sockets are not available on this platform, use ingest.tcp")
+        self.tcp = tcp
+        self.unix_path = unix_path
+        self.audit_file = audit_file
+        self.on_event = on_event
+        self._signals: deque = deque()
+        self._ticks: deque = deque()
+        self._write_lock = threading.Lock()
+        self._servers: list = []
+        self.stats = {"signals": 0, "ticks": 0, "malformed": 0}
+
+    def start(self) -> "IngestServer":
+        if self.tcp:
+            self._servers.append(_TCPServer(parse_address(self.tcp)[1], _Handler))
+        if self.unix_path:
+            if os.path.exists(self.unix_path):
+                os.remove(self.unix_path)  # stale socket from a previous run
+            self._servers.append(_UnixServer(self.unix_path, _Handler))
+        for srv in self._servers:
+            srv.ingest = self
+            threading.Thread(target=srv.serve_forever, name="ingest-listener", daemon=True).start()
+        return self
+
+    @property
+    def address(self) -> str:
+        """First bound address as a client address string (resolves port 0)."""
+        for srv in self._servers:
+            if isinstance(srv.server_address, tuple):
+                host, port = srv.server_address[:2]
+                return f"{host}:{port}"
+            return f"unix:{srv.server_address}"
+        return ""
+
+    def stop(self) -> None:
+        for srv in self._servers:
+            srv.shutdown()
+            srv.server_close()
+        self._servers = []
+        if self.unix_path and os.path.exists(self.unix_path):
+            os.remove(self.unix_path)
+
+    def _persist(self, line: bytes) -> tuple[str, int] | None:
+        if not self.audit_file:
+            return None
+        Path(self.audit_file).parent.mkdir(parents=True, exist_ok=True)
+        with self._write_lock, open(self.audit_file, "ab") as f:
+            start = f.tell()
+            f.write(line + b"\n")
+        return "", start
+
+    def handle_line(self, line: bytes) -> None:
+        line = line.strip()
+        if not line:
+            return
+        try:
+            obj = loads(line)
+        except ValueError:
+            obj = None
+        if not isinstance(obj, dict):
+            self.stats["malformed"] += 1
+            return
+        kind = classify(obj)
+        if kind == "tick":
+            parsed = parse_price_row(obj)
+            if parsed is None:
+                self.stats["malformed"] += 1
+                return
+            self._ticks.append(parsed)
+            self.stats["ticks"] += 1
+        else:
+            pos = self._persist(line)
+            # no id -> cannot be deduplicated against the file scan; the file path handles it
+            if obj.get("id"):
+                self._signals.append((pos, SignalRecord.from_dict(obj), time.time()))
+            self.stats["signals"] += 1
+        if self.on_event is not None:
+            self.on_event(kind)
+
+    def drain_signals(self, limit: int | None = None) -> List[tuple[tuple[str, int] | None, SignalRecord, float]]:
+        """Queued signals (at most ``limit``): (position in audit_file, record, received at)."""
+        out = []
+        while self._signals and (limit is None or len(out) < limit):
+            out.append(self._signals.popleft())
+        return out
+
+    def drain_ticks(self) -> Dict[str, List[Dict[str, Any]]]:
+        out: Dict[str, List[Dict[str, Any]]] = {}
+        while self._ticks:
+            pair, tick = self._ticks.popleft()
+            out.setdefault(pair, []).append(tick)
+        return out
+
+
+class IngestClient:
+    """Reference client: keeps one connection and sends JSON lines (reconnects once on error)."""
+
+    def __init__(self, address: str, timeout: float = 5.0):
+        self.kind, self.target = parse_address(address)
+        self.timeout = timeout
+        self._sock: socket.socket | None = None
+
+    def _connect(self) -> socket.socket:
+        if self.kind == "unix":
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            sock = socket.socket(socket.AF_INET6 if ":" in self.target[0] else socket.AF_INET, socket.SOCK_STREAM)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.settimeout(self.timeout)
+        sock.connect(self.target)
+        return sock
+
+    def send_lines(self, lines: Iterable[str | bytes]) -> None:
+        data = b"".join((ln.encode("utf-8") if isinstance(ln, str) else ln).rstrip(b"\n") + b"\n" for ln in lines)
+        for attempt in (1, 2):
+            try:
+                if self._sock is None:
+                    self._sock = self._connect()
+                self._sock.sendall(data)
+                return
+            except OSError:
+                self.close()
+                if attempt == 2:
+                    raise
+
+    def send(self, *objs: Dict[str, Any]) -> None:
+        self.send_lines(json.dumps(o, ensure_ascii=False) for o in objs)
+
+    def close(self) -> None:
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+
+    def __enter__(self) -> "IngestClient":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Send JSON lines (signals / ticks) to a running watcher's ingest socket")
+    parser.add_argument("--connect", default="127.0.0.1:9110", help="host:port or unix:/path")
+    parser.add_argument("--file", help="JSONL file to send (default: stdin)")
+    args = parser.parse_args()
+    src = open(args.file, "rb") if args.file else sys.stdin.buffer
+    with IngestClient(args.connect) as client:
+        n = 0
+        for raw in src:
+            if raw.strip():
+                client.send_lines([raw])
+                n += 1
+    print(f"sent {n} line(s) to {args.connect}")
@@ -0,0 +1,110 @@
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+
+def journal_path(state_file: str) -> str:
+    return f"{state_file}.journal"
+
+
+def apply_record(state: Dict[str, Any], rec: Dict[str, Any]) -> None:
+    op = rec.get("op")
+    sid = str(rec.get("id") or "")
+    if op == "offset":
+        feed = rec.get("feed")
+        if feed and feed != "default":
+            state.setdefault("feed_offsets", {})[str(feed)] = int(rec.get("offset", 0) or 0)
+        else:
+            state["offset"] = int(rec.get("offset", 0) or 0)
+    elif op == "cursor":
+        state.setdefault("feed_cursors", {})[str(rec.get("feed"))] = [str(rec.get("segment") or ""), int(rec.get("offset", 0) or 0)]
+    elif op == "sent":
+        state.setdefault("sent_ids", []).append(sid)
+    elif op == "open":
+        state.setdefault("active_signals", {})[sid] = rec.get("signal") or {}
+    elif op == "close":
+        state.setdefault("active_signals", {}).pop(sid, None)
+        if rec.get("result") is not None:
+            state.setdefault("closed_results", {})[sid] = rec["result"]
+    elif op == "price_feed":
+        state["price_feed"] = rec.get("feed") or {}
+
+
+def replay(state: Dict[str, Any], state_file: str) -> int:
+    """Apply journal records on top of a JSON snapshot; returns records applied."""
+    path = journal_path(state_file)
+    if not os.path.exists(path):
+        return 0
+    applied = 0
+    with open(path, "r", encoding="utf-8") as f:
+        for ln in f:
+            ln = ln.strip()
+            if not ln:
+                continue
+            try:
+                rec = json.loads(ln)
+            except json.JSONDecodeError:
+                # torn write at crash time: everything before it is still valid
+                break
+            apply_record(state, rec)
+            applied += 1
+    return applied
+
+
+def write_snapshot(state_file: str, snapshot: Dict[str, Any]) -> None:
+    Path(state_file).parent.mkdir(parents=True, exist_ok=True)
+    tmp = f"{state_file}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, indent=2)
+    os.replace(tmp, state_file)
+
+
+class StateJournal:
+    """Append-only log of small state changes next to state.json.
+
+    Records are one JSON object per line. ``compact`` writes a full snapshot
+    and truncates the journal, so replay on restart stays short.
+    """
+
+    def __init__(self, state_file: str, compact_every: int = 500, compact_interval_sec: float = 600.0):
+        self.state_file = state_file
+        self.path = journal_path(state_file)
+        self.compact_every = max(1, int(compact_every))
+        self.compact_interval_sec = float(compact_interval_sec)
+        self.records = 0
+        self.last_compact = time.monotonic()
+        self._fh = None
+
+    def _handle(self):
+        if self._fh is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._fh = open(self.path, "a", encoding="utf-8")
+        return self._fh
+
+    def append(self, op: str, **fields: Any) -> None:
+        fh = self._handle()
+        fh.write(json.dumps({"op": op, **fields}, ensure_ascii=False, separators=(",", ":")) + "\n")
+        fh.flush()
+        self.records += 1
+
+    def needs_compaction(self) -> bool:
+        if self.records >= self.compact_every:
+            return True
+        # nothing journaled since the last snapshot: no need to rewrite it
+        return self.records > 0 and (time.monotonic() - self.last_compact) >= self.compact_interval_sec
+
+    def compact(self, snapshot: Dict[str, Any]) -> None:
+        write_snapshot(self.state_file, snapshot)
+        self.close()
+        # snapshot already contains everything the journal described
+        with open(self.path, "w", encoding="utf-8"):
+            pass
+        self.records = 0
+        self.last_compact = time.monotonic()
+
+    def close(self) -> None:
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
@@ -0,0 +1,175 @@
+import json
+import os
+from typing import Any, Callable, Dict, Iterator, List
+
+DEFAULT_BLOCK = 64 * 1024
+
+Record = Dict[str, Any]
+
+
+def iter_lines_reversed(path: str, end: int | None = None, block_size: int = DEFAULT_BLOCK) -> Iterator[tuple[int, bytes]]:
+    """Yield (line_start_offset, line_bytes) from ``end`` (default EOF) back to the top.
+
+    The file is read backwards in fixed-size blocks, so stopping early only
+    costs the blocks actually visited. Line bytes exclude the newline.
+    """
+    block_size = max(1024, int(block_size))
+    with open(path, "rb") as f:
+        if end is None:
+            f.seek(0, os.SEEK_END)
+            end = f.tell()
+        pos = end
+        buf = b""
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+            parts = buf.split(b"\n")
+            # parts[0] may continue in the previous block; keep it for the next round
+            starts = [pos]
+            for p in parts[:-1]:
+                starts.append(starts[-1] + len(p) + 1)
+            for k in range(len(parts) - 1, 0, -1):
+                if parts[k]:
+                    yield starts[k], parts[k]
+            buf = parts[0]
+        if buf:
+            yield 0, buf
+
+
+def _parse(line: bytes) -> Record | None:
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        obj = json.loads(line)
+    except Exception:
+        return None
+    return obj if isinstance(obj, dict) else None
+
+
+def tail_records(
+    path: str,
+    limit: int,
+    match: Callable[[Record], bool] | None = None,
+    block_size: int = DEFAULT_BLOCK,
+) -> List[Record]:
+    """Last ``limit`` JSONL records (newest first) that satisfy ``match``."""
+    out: List[Record] = []
+    if limit <= 0 or not os.path.exists(path):
+        return out
+    for _, line in iter_lines_reversed(path, block_size=block_size):
+        rec = _parse(line)
+        if rec is None or (match is not None and not match(rec)):
+            continue
+        out.append(rec)
+        if len(out) >= limit:
+            break
+    return out
+
+
+class TailIndex:
+    """Small per-key index (e.g. per pair) of the newest records of a JSONL file.
+
+    ``recent(key, n)`` scans backwards only as far as needed to find ``n``
+    records for that key, remembering every record it passes, so the next
+    key continues where the previous scan stopped. Appended lines are picked
+    up incrementally; truncation/rotation resets the index.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        key: Callable[[Record], Any] = lambda r: r.get("pair"),
+        match: Callable[[Record], bool] | None = None,
+        max_per_key: int = 50,
+        block_size: int = DEFAULT_BLOCK,
+    ):
+        self.path = path
+        self.key = key
+        self.match = match
+        self.max_per_key = max(1, int(max_per_key))
+        self.block_size = block_size
+        self._reset(None)
+
+    def _reset(self, file_id: tuple | None) -> None:
+        self._file_id = file_id
+        self._by_key: Dict[Any, List[tuple[int, Record]]] = {}
+        self._low: int | None = None  # reverse scan reached this offset
+        self._high = 0  # lines before this offset are indexed
+
+    def _accept(self, rec: Record | None) -> Any:
+        if rec is None or (self.match is not None and not self.match(rec)):
+            return None
+        return self.key(rec)
+
+    def _sync(self) -> None:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            self._reset(None)
+            return
+        fid = (st.st_dev, st.st_ino)
+        if fid != self._file_id or st.st_size < self._high:
+            self._reset(fid)
+        if self._low is None:
+            # start from the last complete line; a half-written one is picked up later
+            self._low = self._high = self._last_newline_before(st.st_size)
+            return
+        if st.st_size <= self._high:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._high)
+            data = f.read(st.st_size - self._high)
+        last_nl = data.rfind(b"\n")
+        if last_nl < 0:
+            return
+        pos = self._high
+        for line in data[: last_nl + 1].split(b"\n")[:-1]:
+            rec = _parse(line)
+            k = self._accept(rec)
+            if k is not None:
+                rows = self._by_key.setdefault(k, [])
+                rows.insert(0, (pos, rec))
+                del rows[self.max_per_key :]
+            pos += len(line) + 1
+        self._high = pos
+
+    def _last_newline_before(self, size: int) -> int:
+        with open(self.path, "rb") as f:
+            pos = size
+            while pos > 0:
+                step = min(self.block_size, pos)
+                pos -= step
+                f.seek(pos)
+                nl = f.read(step).rfind(b"\n")
+                if nl >= 0:
+                    return pos + nl + 1
+        return 0
+
+    def recent(self, key: Any, n: int) -> List[Record]:
+        """Newest ``n`` records for ``key`` (newest first)."""
+        n = min(int(n), self.max_per_key)
+        self._sync()
+        rows = self._by_key.get(key, [])
+        if len(rows) < n and self._low:
+            for start, line in iter_lines_reversed(self.path, self._low, self.block_size):
+                self._low = start
+                rec = _parse(line)
+                k = self._accept(rec)
+                if k is None:
+                    continue
+                krows = self._by_key.setdefault(k, [])
+                if len(krows) < self.max_per_key:
+                    krows.append((start, rec))
+                if k == key and len(krows) >= n:
+                    break
+            else:
+                self._low = 0
+            rows = self._by_key.get(key, [])
+        return [rec for _, rec in rows[:n]]
+
+    def offsets(self, key: Any) -> List[int]:
+        """Byte offsets of the indexed records for ``key`` (newest first)."""
+        return [start for start, _ in self._by_key.get(key, [])]
@@ -0,0 +1,310 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict
+
+import metrics
+
+# Telegram Bot API limits (https://core.telegram.org/bots/faq#my-bot-is-hitting-limits-how-do-i-avoid-this):
+# ~30 messages/second per bot, ~1 message/second per private chat,
+# ~20 messages/minute per group or channel.
+DEFAULT_LIMITS = {
+    "global_per_sec": 30.0,
+    "global_burst": 30,
+    "private_per_sec": 1.0,
+    "private_burst": 1,
+    "group_per_min": 20.0,
+    "group_burst": 3,
+}
+
+
+class TokenBucket:
+    """Thread-safe token bucket with reservations.
+
+    ``reserve`` always takes a token and returns how long the caller must
+    wait before using it, so concurrent callers are served in arrival order.
+    """
+
+    def __init__(self, rate_per_sec: float, capacity: float):
+        self.rate = max(1e-6, float(rate_per_sec))
+        self.capacity = max(1.0, float(capacity))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1.0
+            wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+            return max(wait, self.blocked_until - now)
+
+    def block_for(self, seconds: float) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self.blocked_until = max(self.blocked_until, now + max(0.0, seconds))
+            # nothing saved up while blocked
+            self.tokens = min(self.tokens, 0.0)
+            self.updated = now
+
+
+def _is_group_chat(chat_id: str) -> bool:
+    # "@channelname" and negative ids are channels/groups; positive ids are private chats.
+    s = str(chat_id).strip()
+    return s.startswith("@") or s.startswith("-")
+
+
+class TelegramRateLimiter:
+    """Per-bot and per-chat token buckets shared by every sender in the process."""
+
+    def __init__(self, limits: Dict[str, float] | None = None):
+        self.limits = dict(DEFAULT_LIMITS)
+        self.limits.update(limits or {})
+        self._bots: Dict[str, TokenBucket] = {}
+        self._chats: Dict[tuple[str, str], TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, limits: Dict[str, float] | None) -> None:
+        """Apply new limits; the buckets (and their spent tokens) are only reset when a limit changed."""
+        merged = dict(DEFAULT_LIMITS)
+        merged.update(limits or {})
+        with self._lock:
+            if merged == self.limits:
+                return
+            self.limits = merged
+            self._bots.clear()
+            self._chats.clear()
+
+    def _buckets(self, bot_token: str, chat_id: str) -> tuple[TokenBucket, TokenBucket]:
+        key = (bot_token, str(chat_id))
+        with self._lock:
+            bot = self._bots.get(bot_token)
+            if bot is None:
+                bot = TokenBucket(self.limits["global_per_sec"], self.limits["global_burst"])
+                self._bots[bot_token] = bot
+            chat = self._chats.get(key)
+            if chat is None:
+                if _is_group_chat(chat_id):
+                    chat = TokenBucket(self.limits["group_per_min"] / 60.0, self.limits["group_burst"])
+                else:
+                    chat = TokenBucket(self.limits["private_per_sec"], self.limits["private_burst"])
+                self._chats[key] = chat
+            return bot, chat
+
+    def acquire(self, bot_token: str, chat_id: str) -> float:
+        """Block until a message to ``chat_id`` may be sent; returns seconds waited."""
+        bot, chat = self._buckets(bot_token, chat_id)
+        wait = max(chat.reserve(), bot.reserve())
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def on_retry_after(self, bot_token: str, chat_id: str, seconds: float) -> None:
+        _, chat = self._buckets(bot_token, chat_id)
+        chat.block_for(seconds)
+
+
+default_limiter = TelegramRateLimiter()
+
+
+def retry_after_seconds(resp: Any, default: float = 3.0) -> float:
+    try:
+        return float((resp.json() or {}).get("parameters", {}).get("retry_after", default))
+    except Exception:
+        return default
+
+
+# Outbound message classes: a lower priority is always sent first; within a
+# class the earliest deadline (queued at + deadline_sec) goes first.
+MESSAGE_CLASSES = {
+    "result": {"priority": 0.0, "deadline_sec": 5.0},
+    "signal": {"priority": 1.0, "deadline_sec": 30.0},
+    "ops": {"priority": 2.0, "deadline_sec": 300.0},
+}
+_KIND_CLASS = {"result": "result", "signal": "signal", "digest": "signal", "ops": "ops", "health": "ops"}
+
+
+def message_class(kind: str) -> str:
+    """Scheduling class of a message kind; unknown kinds are treated as signals."""
+    return _KIND_CLASS.get(str(kind or ""), "signal")
+
+
+def class_table(overrides: Dict[str, Any] | None = None) -> Dict[str, Dict[str, float]]:
+    """MESSAGE_CLASSES with overrides, e.g. {"result": {"deadline_sec": 2}} or {"ops": 600} (deadline only)."""
+    merged = {name: dict(c) for name, c in MESSAGE_CLASSES.items()}
+    for name, over in (overrides or {}).items():
+        row = merged.setdefault(str(name), {"priority": float(len(merged)), "deadline_sec": 60.0})
+        if isinstance(over, dict):
+            row.update({k: float(v) for k, v in over.items() if k in ("priority", "deadline_sec")})
+        else:
+            row["deadline_sec"] = float(over)
+    return merged
+
+
+class TelegramDispatcher:
+    """Priority scheduler for outbound Telegram sends.
+
+    Each job has a message class (MESSAGE_CLASSES). Whenever a worker is
+    free it takes the most urgent queued job of any idle chat, so a TP/SL
+    result never waits behind queued signals or ops messages. At most one
+    job per chat runs at a time: jobs of one class stay in schedule order
+    within a chat, and different chats are sent in parallel. Pacing comes
+    from the rate limiter inside the send function.
+
+    Queue wait (schedule -> start) is recorded per class; a job that starts
+    after its class deadline counts as a deadline miss.
+    """
+
+    def __init__(self, max_workers: int = 4, classes: Dict[str, Any] | None = None):
+        self.max_workers = max(1, int(max_workers))
+        self._cond = threading.Condition()
+        self._queues: Dict[str, list] = {}  # chat -> heap of jobs
+        self._ready: list = []  # heap of (priority, deadline, seq, chat): head job of each idle chat
+        self._running: set[str] = set()
+        self._threads: list[threading.Thread] = []
+        self._seq = itertools.count()
+        self._names = itertools.count()
+        self._stopping = False
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self.classes: Dict[str, Dict[str, float]] = {}
+        self.configure(classes)
+
+    def configure(self, classes: Dict[str, Any] | None, max_workers: int | None = None) -> None:
+        """Class priorities / deadlines (see class_table); applies to jobs queued from now on.
+
+        ``max_workers`` changes the worker cap too; workers above a lowered cap exit once idle.
+        """
+        merged = class_table(classes)
+        with self._cond:
+            self.classes = merged
+            if max_workers is not None:
+                self.max_workers = max(1, int(max_workers))
+                self._cond.notify_all()
+
+    def schedule(self, msg_class: str, chat_id: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+        """Queue ``fn(*args, **kwargs)`` for ``chat_id`` as a ``msg_class`` message."""
+        return self.schedule_many([(msg_class, chat_id, fn, args, kwargs)])[0]
+
+    def schedule_many(self, jobs: list[tuple[str, str, Callable[..., Any], tuple, Dict[str, Any]]]) -> list[Future]:
+        """Queue (msg_class, chat_id, fn, args, kwargs) jobs at once.
+
+        No worker starts before the last one is queued, so a result in the
+        batch always goes ahead of the batch's signals to the same chat.
+        """
+        futures: list[Future] = []
+        now = time.monotonic()
+        with self._cond:
+            if self._stopping:
+                raise RuntimeError("dispatcher is shut down")
+            for msg_class, chat_id, fn, args, kwargs in jobs:
+                fut: Future = Future()
+                key = str(chat_id)
+                cls = msg_class if msg_class in self.classes else "signal"
+                c = self.classes[cls]
+                job = (c["priority"], now + c["deadline_sec"], next(self._seq), cls, now, fut, fn, args, kwargs)
+                heap = self._queues.setdefault(key, [])
+                heapq.heappush(heap, job)
+                if key not in self._running and heap[0] is job:
+                    heapq.heappush(self._ready, (job[0], job[1], job[2], key))
+                futures.append(fut)
+            while len(self._threads) < min(self.max_workers, len(self._queues)):  # one busy chat needs one worker
+                t = threading.Thread(target=self._work, name=f"tg-dispatch-{next(self._names)}", daemon=True)
+                self._threads.append(t)
+                t.start()
+            self._cond.notify(len(jobs))
+        return futures
+
+    def _pick(self) -> tuple[str, tuple] | None:
+        while self._ready:
+            _, _, seq, key = heapq.heappop(self._ready)
+            heap = self._queues.get(key)
+            # stale entry: chat busy, drained, or its head changed (a fresher entry exists)
+            if key in self._running or not heap or heap[0][2] != seq:
+                continue
+            self._running.add(key)
+            return key, heapq.heappop(heap)
+        return None
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                picked = self._pick()
+                while picked is None:
+                    if self._stopping:
+                        return
+                    if len(self._threads) > self.max_workers:
+                        self._threads.remove(threading.current_thread())
+                        return
+                    self._cond.wait()
+                    picked = self._pick()
+            key, (_, deadline, _, cls, queued, fut, fn, args, kwargs) = picked
+            started = time.monotonic()
+            self._record(cls, started - queued, started > deadline)
+            if fut.set_running_or_notify_cancel():
+                try:
+                    fut.set_result(fn(*args, **kwargs))
+                except BaseException as e:
+                    fut.set_exception(e)
+            with self._cond:
+                self._running.discard(key)
+                heap = self._queues.get(key)
+                if heap:
+                    head = heap[0]
+                    heapq.heappush(self._ready, (head[0], head[1], head[2], key))
+                    self._cond.notify()
+                else:
+                    self._queues.pop(key, None)
+
+    def _record(self, cls: str, waited: float, missed: bool) -> None:
+        metrics.QUEUE_WAIT_SECONDS.observe(waited, cls=cls)
+        if missed:
+            metrics.DEADLINE_MISSES.inc(cls=cls)
+        with self._cond:
+            st = self._stats.setdefault(cls, {"count": 0, "missed": 0, "total_ms": 0.0, "max_ms": 0.0})
+            st["count"] += 1
+            st["missed"] += int(missed)
+            st["total_ms"] += waited * 1000.0
+            st["max_ms"] = max(st["max_ms"], waited * 1000.0)
+
+    def stats(self, reset: bool = False) -> Dict[str, Dict[str, float]]:
+        """Per-class started jobs, deadline misses and queue wait in ms."""
+        with self._cond:
+            out = {}
+            for cls, st in self._stats.items():
+                row = dict(st)
+                row["avg_ms"] = round(st["total_ms"] / st["count"], 1) if st["count"] else 0.0
+                row["total_ms"] = round(st["total_ms"], 1)
+                row["max_ms"] = round(st["max_ms"], 1)
+                out[cls] = row
+            if reset:
+                self._stats.clear()
+            return out
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting jobs; queued ones still run."""
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if wait:
+            for t in list(self._threads):
+                t.join()
+
+
+_default_dispatcher: TelegramDispatcher | None = None
+_dispatcher_lock = threading.Lock()
+
+
+def default_dispatcher(max_workers: int | None = None) -> TelegramDispatcher:
+    """The process-wide dispatcher; ``max_workers`` (telegram.rate_limit.workers, default 4) is applied on every call."""
+    global _default_dispatcher
+    with _dispatcher_lock:
+        if _default_dispatcher is None:
+            _default_dispatcher = TelegramDispatcher(max_workers=4 if max_workers is None else max_workers)
+        elif max_workers is not None and _default_dispatcher.max_workers != max(1, int(max_workers)):
+            _default_dispatcher.configure(_default_dispatcher.classes, max_workers=max_workers)
+        return _default_dispatcher
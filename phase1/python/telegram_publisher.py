@@ -1,9 +1,13 @@
 import html
 import time
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 import requests
 
+import http_client
+import metrics
+from telegram_dispatch import default_limiter, retry_after_seconds
+
 
 def _to_float(value: Any) -> float | None:
     try:
@@ -68,8 +72,20 @@ def _fmt_rr(signal: Dict[str, Any]) -> str:
     return f"{rr:.2f}"
 
 
-def send_telegram_message(bot_token: str, chat_id: str, text: str, max_retries: int = 5) -> None:
-    url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
+TELEGRAM_API = "https://api.telegram.org"
+
+
+def telegram_api_base(cfg: Dict[str, Any]) -> str:
+    """Bot API base URL: telegram.api_base (e.g. a local telegram_stub.py), else the public API."""
+    return str(cfg.get("telegram", {}).get("api_base", "") or "") or TELEGRAM_API
+
+
+def send_telegram_message(
+    bot_token: str, chat_id: str, text: str, max_retries: int = 5, api_base: str = TELEGRAM_API, limit: bool = True
+) -> None:
+    # api_base: telegram.api_base, e.g. a local telegram_stub.py for benchmarks
+    # limit: pace through the shared token buckets (off when telegram.rate_limit.enabled is false)
+    url = f"{(api_base or TELEGRAM_API).rstrip('/')}/bot{bot_token}/sendMessage"
     payload = {
         "chat_id": chat_id,
         "text": text,
@@ -80,26 +96,32 @@ def send_telegram_message(bot_token: str, chat_id: str, text: str, max_retries:
     backoff = 1
     for attempt in range(max_retries + 1):
         try:
-            r = requests.post(url, json=payload, timeout=20)
-
-            # Respect Telegram rate limits
+            # Per-bot and per-chat token buckets (shared by all senders in this process)
+            if limit:
+                default_limiter.acquire(bot_token, str(chat_id))
+            started = time.perf_counter()
+            try:
+                r = http_client.post(url, json=payload, timeout=20)
+            finally:
+                metrics.TELEGRAM_SECONDS.observe(time.perf_counter() - started)
+
+            # Respect Telegram rate limits: the next acquire() waits out retry_after
             if r.status_code == 429:
-                retry_after = 3
-                try:
-                    data = r.json()
-                    retry_after = int(data.get("parameters", {}).get("retry_after", 3))
-                except Exception:
-                    pass
-
+                retry_after = max(1.0, retry_after_seconds(r))
+                if limit:
+                    default_limiter.on_retry_after(bot_token, str(chat_id), retry_after)
                 if attempt >= max_retries:
                     r.raise_for_status()
-                time.sleep(max(1, retry_after))
+                metrics.MESSAGES_RETRIED.inc(reason="429")
+                if not limit:
+                    time.sleep(retry_after)
                 continue
 
             # Retry transient server-side errors
             if r.status_code >= 500:
                 if attempt >= max_retries:
                     r.raise_for_status()
+                metrics.MESSAGES_RETRIED.inc(reason="5xx")
                 time.sleep(backoff)
                 backoff = min(backoff * 2, 15)
                 continue
@@ -110,11 +132,22 @@ def send_telegram_message(bot_token: str, chat_id: str, text: str, max_retries:
         except requests.RequestException:
             if attempt >= max_retries:
                 raise
+            metrics.MESSAGES_RETRIED.inc(reason="network")
             time.sleep(backoff)
             backoff = min(backoff * 2, 15)
 
 
-def format_signal_message(signal: Dict[str, Any]) -> str:
+TELEGRAM_MAX_TEXT = 4096
+_SIGNAL_HEADER = "📡 <b>ALPHALYCEUM LIVE SIGNAL SCALPING TF 5M</b>\n"
+_DISCLAIMER = "<i>Disclaimer: edukasi, bukan financial advice. Selalu pakai risk management.</i>"
+
+
+def _tg_len(text: str) -> int:
+    # Telegram counts UTF-16 code units (emoji outside the BMP count twice).
+    return len(text.encode("utf-16-le")) // 2
+
+
+def _signal_block(signal: Dict[str, Any]) -> str:
     pair = html.escape(str(signal.get("pair", "-")))
     tf = html.escape(str(signal.get("tf", "-")).replace("PERIOD_", ""))
     side_raw = str(signal.get("side", "-")).upper()
@@ -132,7 +165,6 @@ def format_signal_message(signal: Dict[str, Any]) -> str:
     rsi = _fmt_num(signal.get("rsi"), digits=2)
 
     return (
-        "📡 <b>ALPHALYCEUM LIVE SIGNAL SCALPING TF 5M</b>\n"
         f"{side_icon} Pair: <b>{pair}</b> ({tf})\n"
         f"Arah: <b>{side}</b>\n"
         f"Entry: <b>{entry}</b>\n"
@@ -140,11 +172,43 @@ def format_signal_message(signal: Dict[str, Any]) -> str:
         f"TP: <b>{tp}</b> (RR {rr})\n"
         f"ADX: {adx} | RSI: {rsi}\n"
         f"Waktu: {signal_time}\n"
-        f"ID: <code>{signal_id}</code>\n\n"
-        "<i>Disclaimer: edukasi, bukan financial advice. Selalu pakai risk management.</i>"
+        f"ID: <code>{signal_id}</code>"
     )
 
 
+def format_signal_message(signal: Dict[str, Any]) -> str:
+    return _SIGNAL_HEADER + _signal_block(signal) + "\n\n" + _DISCLAIMER
+
+
+def format_signal_digest(signals: List[Dict[str, Any]], max_len: int = TELEGRAM_MAX_TEXT) -> List[tuple[str, List[int]]]:
+    """Merge several signals into as few messages as fit Telegram's text limit.
+
+    Returns (text, indexes into ``signals``) per message. Blocks are never
+    split, so HTML tags stay balanced in every part.
+    """
+    sep = "\n\n〰️〰️〰️〰️〰️\n\n"
+    # room for the header with part numbers and the disclaimer
+    budget = max_len - _tg_len(_DISCLAIMER) - 120
+    parts: List[List[int]] = [[]]
+    size = 0
+    blocks = [_signal_block(s) for s in signals]
+    for i, block in enumerate(blocks):
+        extra = _tg_len(block) + (_tg_len(sep) if parts[-1] else 0)
+        if parts[-1] and size + extra > budget:
+            parts.append([])
+            size = 0
+            extra = _tg_len(block)
+        parts[-1].append(i)
+        size += extra
+
+    out = []
+    for n, idxs in enumerate(parts, start=1):
+        part = f" ({n}/{len(parts)})" if len(parts) > 1 else ""
+        header = f"📡 <b>ALPHALYCEUM LIVE SIGNAL BURST</b> — {len(signals)} signal{part}\n\n"
+        out.append((header + sep.join(blocks[i] for i in idxs) + "\n\n" + _DISCLAIMER, idxs))
+    return out
+
+
 def format_signal_result_message(signal: Dict[str, Any], result: str, hit_price: Any, hit_time: str, duration_min: float | None = None) -> str:
     pair = html.escape(str(signal.get("pair", "-")))
     tf = html.escape(str(signal.get("tf", "-")).replace("PERIOD_", ""))
@@ -156,10 +220,12 @@ def format_signal_result_message(signal: Dict[str, Any], result: str, hit_price:
     tp = _fmt_num(signal.get("tp"), digits=2)
     hit = _fmt_num(hit_price, digits=2)
 
-    icon = "✅" if str(result).upper() == "TP_HIT" else "🛑" if str(result).upper() == "SL_HIT" else "ℹ️"
+    icon = {"TP_HIT": "✅", "SL_HIT": "🛑", "EXPIRED": "⌛"}.get(str(result).upper(), "ℹ️")
     result_txt = "TP HIT" if str(result).upper() == "TP_HIT" else "SL HIT" if str(result).upper() == "SL_HIT" else html.escape(str(result))
 
     dur = f"{duration_min:.1f} menit" if isinstance(duration_min, (int, float)) else "-"
+    repeats = signal.get("repeats")
+    repeat_line = f"Signal serupa digabung: {int(repeats)}x\n" if repeats else ""
 
     return (
         f"{icon} <b>UPDATE HASIL SIGNAL</b>\n"
@@ -170,5 +236,6 @@ def format_signal_result_message(signal: Dict[str, Any], result: str, hit_price:
         f"Entry: {entry} | SL: {sl} | TP: {tp}\n"
         f"Waktu Hit: {html.escape(hit_time)}\n"
         f"Durasi: {dur}\n"
+        f"{repeat_line}"
         f"ID: <code>{signal_id}</code>"
     )
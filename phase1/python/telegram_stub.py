@@ -0,0 +1,159 @@
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List
+
+
+class StubState:
+    """Behaviour and bookkeeping of the stub Bot API (shared by handler threads)."""
+
+    def __init__(
+        self,
+        latency_ms: float = 50.0,
+        jitter_ms: float = 20.0,
+        p429: float = 0.0,
+        p5xx: float = 0.0,
+        retry_after: int = 1,
+        seed: int | None = None,
+    ):
+        self.latency_ms = float(latency_ms)
+        self.jitter_ms = float(jitter_ms)
+        self.p429 = float(p429)
+        self.p5xx = float(p5xx)
+        self.retry_after = max(1, int(retry_after))
+        self._rand = random.Random(seed)
+        self._lock = threading.Lock()
+        self.counts: Dict[str, int] = {"ok": 0, "429": 0, "5xx": 0}
+        self.received: List[Dict[str, Any]] = []  # accepted messages: method, chat_id, bytes, at
+
+    def decide(self) -> tuple[float, int]:
+        """(delay seconds, status) for the next call."""
+        with self._lock:
+            delay = max(0.0, self.latency_ms + self._rand.uniform(-self.jitter_ms, self.jitter_ms)) / 1000.0
+            roll = self._rand.random()
+        if roll < self.p429:
+            return delay, 429
+        if roll < self.p429 + self.p5xx:
+            return delay, 502
+        return delay, 200
+
+    def record(self, status: int, method: str, payload: Dict[str, Any], size: int) -> int:
+        with self._lock:
+            if status == 429:
+                self.counts["429"] += 1
+            elif status >= 500:
+                self.counts["5xx"] += 1
+            else:
+                self.counts["ok"] += 1
+                self.received.append({"method": method, "chat_id": str(payload.get("chat_id", "")), "bytes": size, "at": time.time()})
+            return len(self.received)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"counts": dict(self.counts), "messages": len(self.received)}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    stub: StubState
+
+    def _reply(self, status: int, body: Dict[str, Any]) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self) -> None:
+        if self.path.startswith("/stats"):
+            self._reply(200, self.stub.stats())
+            return
+        self._api()
+
+    def do_POST(self) -> None:
+        self._api()
+
+    def _api(self) -> None:
+        # /bot<token>/<method>
+        parts = self.path.split("?", 1)[0].strip("/").split("/")
+        if len(parts) != 2 or not parts[0].startswith("bot"):
+            self._reply(404, {"ok": False, "error_code": 404, "description": "Not Found"})
+            return
+        method = parts[1]
+        size = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(size) if size else b""
+        payload: Dict[str, Any] = {}
+        if raw and "json" in (self.headers.get("Content-Type") or ""):
+            try:
+                payload = json.loads(raw)
+            except ValueError:
+                payload = {}
+
+        delay, status = self.stub.decide()
+        if delay:
+            time.sleep(delay)
+        message_id = self.stub.record(status, method, payload, size)
+        if status == 429:
+            ra = self.stub.retry_after
+            self._reply(429, {
+                "ok": False,
+                "error_code": 429,
+                "description": f"Too Many Requests: retry after {ra}",
+                "parameters": {"retry_after": ra},
+            })
+        elif status >= 500:
+            self._reply(status, {"ok": False, "error_code": status, "description": "Bad Gateway"})
+        elif method == "getMe":
+            self._reply(200, {"ok": True, "result": {"id": 1, "is_bot": True, "username": "alphalyceum_stub_bot"}})
+        else:
+            self._reply(200, {"ok": True, "result": {"message_id": message_id, "chat": {"id": payload.get("chat_id")}, "date": int(time.time())}})
+
+    def log_message(self, format: str, *args) -> None:
+        pass
+
+
+def start_stub(host: str = "127.0.0.1", port: int = 0, **behaviour: Any) -> tuple[ThreadingHTTPServer, StubState]:
+    """Start the stub in a daemon thread; port 0 picks a free port (see server.server_address)."""
+    stub = StubState(**behaviour)
+    handler = type("StubHandler", (_Handler,), {"stub": stub})
+    server = ThreadingHTTPServer((host, int(port)), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="telegram-stub", daemon=True).start()
+    return server, stub
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Local stand-in for the Telegram Bot API (benchmarks only)")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8081)
+    ap.add_argument("--latency-ms", type=float, default=50.0)
+    ap.add_argument("--jitter-ms", type=float, default=20.0)
+    ap.add_argument("--p429", type=float, default=0.0, help="share of calls answered with 429")
+    ap.add_argument("--p5xx", type=float, default=0.0, help="share of calls answered with 502")
+    ap.add_argument("--retry-after", type=int, default=1)
+    args = ap.parse_args()
+
+    server, stub = start_stub(
+        args.host,
+        args.port,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        p429=args.p429,
+        p5xx=args.p5xx,
+        retry_after=args.retry_after,
+    )
+    host, port = server.server_address[:2]
+    print(f"Telegram stub on http://{host}:{port} (set telegram.api_base to this URL)", flush=True)
+    try:
+        while True:
+            time.sleep(10)
+            print(json.dumps(stub.stats()), flush=True)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import csv
+import json
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from backfill_outcomes import backfill, summary, write_rows
+
+
+def _jsonl(path, rows):
+    with open(path, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row) + "\n")
+    return str(path)
+
+
+def _signal(sid, side, entry, sl, tp, pair="BTCUSD.vx"):
+    return {"id": sid, "pair": pair, "tf": "PERIOD_M5", "side": side, "entry": entry, "sl": sl, "tp": tp, "time": "2026.02.14 12:00"}
+
+
+@pytest.fixture
+def files(tmp_path):
+    signals = _jsonl(tmp_path / "signals.jsonl", [
+        _signal("tp", "BUY", 100, 90, 110),
+        _signal("sl", "SELL", 100, 110, 90),
+        _signal("late", "BUY", 100, 50, 200),
+        _signal("tp", "BUY", 1, 1, 1),  # duplicate id
+        _signal("HC-1", "BUY", 100, 90, 110),  # health-check probe
+        _signal("gold", "BUY", 2000, 1990, 2030, pair="XAUUSD"),
+    ])
+    prices = _jsonl(tmp_path / "prices.jsonl", [
+        {"pair": "BTCUSD.vx", "price": 80, "time": "2026.02.14 12:04:00"},  # inside the signal bar
+        {"pair": "BTCUSD.vx", "price": 95, "time": "2026.02.14 12:06:00"},
+        {"pair": "BTCUSD.vx", "price": 111, "time": "2026.02.14 12:07:00"},
+        {"pair": "BTCUSD.vx", "price": 250, "time": "2026.02.14 12:20:00"},
+    ])
+    return [signals], [prices]
+
+
+def test_outcomes_hit_times_and_mae(files):
+    rows = {r["id"]: r for r in backfill(*files)}
+    assert list(rows) == ["tp", "sl", "late", "gold"]
+
+    assert rows["tp"]["outcome"] == "TP_HIT"
+    assert (rows["tp"]["hit_price"], rows["tp"]["hit_time"]) == (111.0, "2026.02.14 12:07:00")
+    assert rows["tp"]["time_to_hit_min"] == 7.0
+    assert (rows["tp"]["mae"], rows["tp"]["mae_r"]) == (5.0, 0.5)  # the 12:04 tick is ignored
+
+    assert rows["sl"]["outcome"] == "SL_HIT"
+    assert rows["sl"]["mae_r"] == 1.1
+    assert rows["late"]["outcome"] == "TP_HIT"
+    assert rows["late"]["hit_time"] == "2026.02.14 12:20:00"
+    assert rows["gold"]["outcome"] == "NO_DATA"
+    assert rows["gold"]["hit_price"] is None
+
+
+def test_expiry_bars_stop_the_scan(files):
+    rows = {r["id"]: r for r in backfill(*files, bars_cfg={"PERIOD_M5": 1})}
+    assert rows["tp"]["outcome"] == "TP_HIT"
+    assert rows["late"]["outcome"] == "EXPIRED"
+    assert rows["late"]["hit_time"] is None
+    assert rows["late"]["mae"] == 5.0
+    assert "winrate (TP / TP+SL) = 50.0%" in summary(list(rows.values()))
+
+
+def test_write_rows_csv_and_jsonl(files, tmp_path):
+    rows = backfill(*files)
+    write_rows(rows, str(tmp_path / "out" / "outcomes.csv"))
+    write_rows(rows, str(tmp_path / "out" / "outcomes.jsonl"))
+
+    with open(tmp_path / "out" / "outcomes.csv", encoding="utf-8", newline="") as f:
+        got = list(csv.DictReader(f))
+    assert [r["outcome"] for r in got] == ["TP_HIT", "SL_HIT", "TP_HIT", "NO_DATA"]
+    assert got[3]["hit_time"] == ""
+    lines = (tmp_path / "out" / "outcomes.jsonl").read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == rows
@@ -0,0 +1,25 @@
+import json
+
+from bench_load import LoadGenerator, schedule
+
+
+def test_schedule_shapes():
+    assert schedule("steady", rate=4, duration=1) == [0, 0.25, 0.5, 0.75]
+    assert schedule("burst", rate=0, duration=10, burst_size=3, burst_every=5) == [0, 0, 0, 5, 5, 5]
+    ramp = schedule("ramp", rate=10, duration=2)
+    assert ramp == sorted(ramp) and all(0 < t < 2 for t in ramp)
+    assert len(ramp) == 9  # rate * duration / 2 signals, minus the one landing on the end
+    assert schedule("steady", rate=0, duration=5) == []
+
+
+def test_generator_appends_signals_round_robin(tmp_path):
+    path = tmp_path / "signals.jsonl"
+    gen = LoadGenerator(str(path), ["EURUSD", "XAUUSD"], run_id="T")
+    gen.run_signals([0, 0, 0])
+    rows = [json.loads(line) for line in path.read_text().splitlines()]
+    assert gen.written == 3
+    assert [r["pair"] for r in rows] == ["EURUSD", "XAUUSD", "EURUSD"]
+    assert [r["id"] for r in rows] == ["T-EURUSD-0", "T-XAUUSD-1", "T-EURUSD-2"]
+    for r in rows:
+        risk = abs(r["entry"] - r["sl"])
+        assert abs(abs(r["tp"] - r["entry"]) - 3 * risk) < 1e-4
@@ -0,0 +1,31 @@
+from dedup_store import BloomFilter, DedupStore
+
+
+def test_evicts_oldest_ids_beyond_max_size():
+    store = DedupStore(max_size=3)
+    for sid in ["a", "b", "c", "a", "d"]:
+        store.add(sid)
+    assert store.to_list() == ["b", "c", "d"]
+    assert "a" not in store
+    assert len(store) == 3
+
+
+def test_evicted_ids_stay_seen_through_the_bloom_filter():
+    store = DedupStore(max_size=2, bloom=BloomFilter(capacity=100, error_rate=1e-6))
+    for sid in ["a", "b", "c", "d"]:
+        store.add(sid)
+    assert store.to_list() == ["c", "d"]
+    assert "a" in store and "b" in store
+    assert "never-sent" not in store
+
+
+def test_bloom_file_round_trip(tmp_path):
+    bloom_file = str(tmp_path / "dedup.bloom")
+    runtime = {"dedup_max_ids": 1, "dedup_bloom_file": bloom_file, "dedup_bloom_capacity": 100}
+    store = DedupStore.from_config(["a", "b"], runtime)
+    store.save_bloom()
+
+    restored = DedupStore.from_config(["b"], runtime)
+    assert restored.bloom is not None and restored.bloom.count == 1
+    assert "a" in restored
+    assert BloomFilter.load(str(tmp_path / "missing.bloom")) is None
@@ -0,0 +1,46 @@
+from duplicate_index import DuplicateIndex, signal_atr
+from signal_record import SignalRecord
+
+
+def _sig(t, entry=100.0, side="BUY", tf="PERIOD_M5", **extra):
+    return SignalRecord.from_dict({"pair": "EURUSD", "tf": tf, "side": side, "entry": entry, "sl": entry - 10, "tp": entry + 30, "signal_time": t, **extra})
+
+
+def test_signal_atr_prefers_the_atr_field():
+    assert signal_atr(_sig("2026.02.14 12:05", atr=4)) == 4.0
+    assert signal_atr(_sig("2026.02.14 12:05", atr=0)) == 10.0  # |entry - sl|
+    assert signal_atr(SignalRecord.from_dict({"pair": "EURUSD", "entry": 1.1})) is None
+
+
+def test_match_within_window_bars_and_atr_tolerance():
+    index = DuplicateIndex(window_bars=2, atr_mult=0.5)
+    index.add("a", _sig("2026.02.14 12:05"))
+    assert index.match(_sig("2026.02.14 12:15", entry=104.0)) == "a"  # 2 bars later, 4 <= 0.5 x 10
+    assert index.match(_sig("2026.02.14 12:20")) is None  # 3 bars later
+    assert index.match(_sig("2026.02.14 12:10", entry=106.0)) is None  # too far from the entry
+    assert index.match(_sig("2026.02.14 12:10", side="SELL")) is None
+    assert index.match(_sig("2026.02.14 12:10", tf="PERIOD_M15")) is None
+    assert index.match(_sig("2026.02.14 12:05"), sid="a") is None  # never matches itself
+
+
+def test_add_under_a_later_bar_and_remove():
+    index = DuplicateIndex(window_bars=1, atr_mult=0.5)
+    index.add("a", _sig("2026.02.14 12:05"))
+    assert index.match(_sig("2026.02.14 12:20")) is None
+
+    index.add("a", _sig("2026.02.14 12:05"), "2026.02.14 12:15")  # merged repeat moves the window
+    assert len(index) == 1
+    assert index.match(_sig("2026.02.14 12:20")) == "a"
+
+    index.remove("a")
+    assert "a" not in index and len(index) == 0
+    assert index.match(_sig("2026.02.14 12:20")) is None
+    index.remove("a")  # unknown ids are ignored
+
+
+def test_build_indexes_open_signals_at_their_repeat_bar():
+    active = {"a": _sig("2026.02.14 12:05", repeat_time="2026.02.14 12:30"), "b": _sig("bad time")}
+    index = DuplicateIndex.build(0, 0.5, active)
+    assert len(index) == 1
+    assert index.match(_sig("2026.02.14 12:30")) == "a"
+    assert index.match(_sig("2026.02.14 12:05")) is None
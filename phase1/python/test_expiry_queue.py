@@ -0,0 +1,39 @@
+from expiry_queue import ExpiryQueue, expiry_bars
+from signal_record import SignalRecord
+from tick_path import tick_epoch
+
+
+def _sig(tf="PERIOD_M5", t="2026.02.14 12:00"):
+    return SignalRecord.from_dict({"tf": tf, "signal_time": t})
+
+
+def test_expiry_bars_config_forms():
+    assert expiry_bars(12, "PERIOD_M5") == 12
+    bars = {"PERIOD_M5": 36, "H1": 6, "default": 3}
+    assert [expiry_bars(bars, tf) for tf in ("PERIOD_M5", "PERIOD_H1", "PERIOD_M15")] == [36, 6, 3]
+    assert expiry_bars("bad", "PERIOD_M5") == 0
+
+
+def test_pop_due_returns_earliest_first_and_skips_removed():
+    queue = ExpiryQueue({"PERIOD_M5": 2, "PERIOD_M15": 1})
+    # M5 12:00 bar closes 12:05, +2 bars -> 12:15; M15 12:00 closes 12:15, +1 bar -> 12:30
+    assert queue.add("m5", _sig()) == tick_epoch("2026.02.14 12:15:00")
+    queue.add("m15", _sig("PERIOD_M15"))
+    queue.add("late", _sig(t="2026.02.14 12:20"))
+    queue.add("gone", _sig())
+    queue.remove("gone")
+    assert queue.add("no-expiry", _sig("PERIOD_H1")) is None
+    assert len(queue) == 3
+
+    assert queue.pop_due(tick_epoch("2026.02.14 12:14:59")) == []
+    assert queue.pop_due(tick_epoch("2026.02.14 12:40:00")) == ["m5", "m15", "late"]
+    assert len(queue) == 0
+
+
+def test_readding_moves_the_deadline():
+    queue = ExpiryQueue(2)
+    queue.add("a", _sig())
+    queue.add("a", _sig(t="2026.02.14 13:00"))
+    assert queue.pop_due(tick_epoch("2026.02.14 12:30:00")) == []
+    assert queue.pop_due(tick_epoch("2026.02.14 13:15:00")) == ["a"]
+    assert queue.expired(_sig(), tick_epoch("2026.02.14 12:15:00"))
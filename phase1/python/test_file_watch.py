@@ -0,0 +1,41 @@
+import threading
+
+import pytest
+
+from file_watch import FileChangeWatcher
+
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_wait_returns_appended_file(tmp_path, use_inotify):
+    signals = tmp_path / "signals.jsonl"
+    prices = tmp_path / "prices.jsonl"
+    signals.write_text("")
+    prices.write_text("")
+    watcher = FileChangeWatcher([str(signals), str(prices)], poll_interval=0.02, use_inotify=use_inotify)
+    try:
+        assert watcher.wait(timeout=0.05) == set()
+        with open(signals, "a") as f:
+            f.write('{"id": "a"}\n')
+        assert watcher.wait(timeout=2) == {str(signals)}
+    finally:
+        watcher.close()
+
+
+def test_pattern_picks_up_new_segment(tmp_path):
+    watcher = FileChangeWatcher([], poll_interval=0.02, use_inotify=False, patterns=[str(tmp_path / "signals_*.jsonl")])
+    try:
+        seg = tmp_path / "signals_20260214.jsonl"
+        seg.write_text("x\n")
+        assert watcher.wait(timeout=2) == {str(seg)}
+        assert str(seg) in watcher.paths
+    finally:
+        watcher.close()
+
+
+def test_notify_wakes_wait_from_another_thread(tmp_path):
+    watcher = FileChangeWatcher([str(tmp_path / "missing.jsonl")], poll_interval=5, use_inotify=False)
+    try:
+        threading.Timer(0.05, watcher.notify, args=("ingest",)).start()
+        assert watcher.wait(timeout=2) == {"ingest"}
+    finally:
+        watcher.close()
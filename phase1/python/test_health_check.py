@@ -0,0 +1,75 @@
+import json
+from collections import deque
+
+import pytest
+
+import health_check
+from health_check import ProbeAckWatcher, _rolling_stats, canary
+from state_journal import StateJournal
+
+
+def _config(tmp_path, **extra):
+    cfg = {
+        "signal_file": str(tmp_path / "signals.jsonl"),
+        "state_file": str(tmp_path / "state.json"),
+        "telegram": {"purpose": "alphalyceum_trading_only", "bot_token": "X", "chat_id": "@main"},
+        "filters": {"allowed_symbols": ["BTCUSD.vx"], "allowed_tf": "PERIOD_M5"},
+    }
+    cfg.update(extra)
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps(cfg))
+    return cfg, str(path)
+
+
+def test_ack_from_latency_log_is_exact(tmp_path):
+    lat = tmp_path / "latency.jsonl"
+    lat.write_text(json.dumps({"id": "HC-1", "a": 1700000000500}) + "\n" + json.dumps({"id": "sig-1", "a": 1}) + "\n")
+    cfg, _ = _config(tmp_path, latency={"log_file": str(lat)})
+    acks = ProbeAckWatcher(cfg)
+    assert acks.exact
+    assert acks.acked_at("HC-1") == 1700000000.5
+    assert acks.acked_at("HC-2") is None
+
+
+def test_ack_from_state_is_approximate(tmp_path, monkeypatch):
+    monkeypatch.setattr(health_check, "load_state", None)  # polls never replay the whole state
+    cfg, _ = _config(tmp_path)
+    acks = ProbeAckWatcher(cfg)
+    assert not acks.exact
+    assert acks.acked_at("HC-1") is None
+    journal = StateJournal(cfg["state_file"])
+    journal.append("sent", id="sig-1")
+    journal.append("sent", id="HC-1")  # a running daemon journals before it snapshots
+    assert acks.acked_at("HC-1") is not None
+    assert acks.acked_at("HC-2") is None
+
+    journal.append("sent", id="HC-2")
+    journal.compact({"offset": 0, "sent_ids": ["sig-1", "HC-1", "HC-2"]})  # moved into the snapshot
+    journal.close()
+    assert acks.acked_at("HC-2") is not None
+    assert acks.acked_at("HC-3") is None
+
+
+def test_rolling_stats_count_lost_probes():
+    stats = _rolling_stats(deque([1.0, None, 3.0, 2.0]))
+    assert (stats["n"], stats["lost"], stats["loss_pct"]) == (4, 1, 25.0)
+    assert (stats["p50"], stats["max"]) == (2.0, 3.0)
+    assert _rolling_stats(deque())["p95"] is None
+
+
+def test_canary_labels_state_polling_as_approximate(tmp_path, monkeypatch):
+    stats_file = tmp_path / "canary_stats.json"
+    _, config = _config(tmp_path, canary={"chat_id": "@canary", "timeout_sec": 0.2, "interval_sec": 0, "stats_file": str(stats_file)})
+    monkeypatch.setattr(health_check.time, "sleep", lambda s: None)
+    assert canary(config, count=1) == 0  # below min_samples: no alert yet
+
+    stats = json.loads(stats_file.read_text())
+    assert stats["ack_source"] == "state_poll_approx"
+    assert (stats["n"], stats["lost"]) == (1, 1)
+    assert stats["last_id"].startswith("HC-")
+
+
+def test_canary_requires_a_dedicated_chat(tmp_path):
+    _, config = _config(tmp_path)
+    with pytest.raises(ValueError):
+        canary(config, count=1)
@@ -0,0 +1,51 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import http_client
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        code = 500 if self.path == "/fail" else 200
+        self.send_response(code)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"{}")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+    srv.server_close()
+    http_client.close_all()
+
+
+def test_one_session_per_host(server):
+    assert http_client.session_for(server + "/a") is http_client.session_for(server.upper() + "/b")
+    assert http_client.session_for(server + "/a") is not http_client.session_for("http://localhost:1/")
+
+
+def test_stats_count_calls_and_server_errors(server):
+    http_client.host_stats(reset=True)
+    assert http_client.post(server + "/ok", json={}).status_code == 200
+    assert http_client.post(server + "/fail", json={}).status_code == 500
+    stats = http_client.host_stats()[server]
+    assert stats["count"] == 2 and stats["errors"] == 1
+
+
+def test_close_all_drops_sessions(server):
+    first = http_client.session_for(server)
+    http_client.close_all()
+    assert http_client.session_for(server) is not first
+    assert http_client.post(server + "/ok", json={}).status_code == 200
@@ -0,0 +1,33 @@
+from latency_log import LatencyLog, percentile, read_records, report, signal_trace
+
+
+def test_trace_uses_emit_ts_or_flags_the_estimate():
+    assert signal_trace({"pair": "EURUSD", "tf": "M5", "emit_ts": 100}, "a", 100.25) == {
+        "id": "a", "p": "EURUSD", "tf": "M5", "r": 100250, "e": 100000,
+    }
+    est = signal_trace({"pair": "EURUSD"}, "b", 100.25, written_at=99.5)
+    assert est["e"] == 99500 and est["est"] == 1
+
+
+def test_log_round_trip_and_report(tmp_path):
+    log = LatencyLog(str(tmp_path / "latency.jsonl"))
+    for i, pair in enumerate(["EURUSD", "EURUSD", "XAUUSD"]):
+        log.write([signal_trace({"pair": pair, "emit_ts": 100}, str(i), 100.1)], 100.2, 100.5 + i)
+    log.write([], 0, 0)
+    records = list(read_records(log.path))
+    assert [r["a"] for r in records] == [100500, 101500, 102500]
+    assert list(read_records(log.path, since_ms=101000)) == records[1:]
+
+    rows = {r["pair"]: r for r in report(records, by="pair")}
+    assert rows["EURUSD"]["n"] == 2 and rows["EURUSD"]["max"] == 1500
+    assert rows["ALL"]["p50"] == 1500 and rows["ALL"]["n"] == 3
+    telegram = report(records, stage="telegram")[-1]
+    assert (telegram["pair"], telegram["p50"], telegram["max"]) == ("ALL", 1300, 2300)
+
+
+def test_nearest_rank_percentile():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile(values, 100) == 100
+    assert percentile([], 50) == 0.0
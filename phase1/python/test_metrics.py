@@ -0,0 +1,35 @@
+from metrics import Registry
+
+
+def test_counter_and_gauge_render_with_labels():
+    reg = Registry()
+    sent = reg.counter("sent_total", "Messages sent")
+    sent.inc(kind="signal")
+    sent.inc(2, kind="signal")
+    sent.inc(kind='od"d')
+    reg.gauge("backlog", "Unread bytes").set(1.5, feed="m5")
+    assert reg.counter("sent_total", "ignored") is sent
+    assert sent.value(kind="signal") == 3
+    assert reg.render().splitlines() == [
+        "# HELP sent_total Messages sent",
+        "# TYPE sent_total counter",
+        'sent_total{kind="od\\"d"} 1',
+        'sent_total{kind="signal"} 3',
+        "# HELP backlog Unread bytes",
+        "# TYPE backlog gauge",
+        'backlog{feed="m5"} 1.5',
+    ]
+
+
+def test_histogram_buckets_are_cumulative():
+    reg = Registry()
+    hist = reg.histogram("delay_seconds", "Delay", buckets=(1, 5))
+    for v in (0.5, 3, 10):
+        hist.observe(v)
+    assert hist.render() == [
+        'delay_seconds_bucket{le="1"} 1',
+        'delay_seconds_bucket{le="5"} 2',
+        'delay_seconds_bucket{le="+Inf"} 3',
+        "delay_seconds_sum 13.5",
+        "delay_seconds_count 3",
+    ]
@@ -0,0 +1,64 @@
+import requests
+
+from outbox import DeliveryWorker, Outbox
+
+
+def _http_error(code: int) -> requests.HTTPError:
+    resp = requests.Response()
+    resp.status_code = code
+    return requests.HTTPError(f"{code}", response=resp)
+
+
+def test_enqueue_is_idempotent_per_dedup_key(tmp_path):
+    box = Outbox(str(tmp_path / "outbox.db"))
+    assert box.enqueue("signal", "c", "one", dedup_key="signal:a")
+    assert not box.enqueue("signal", "c", "again", dedup_key="signal:a")
+    assert box.backlog() == 1
+
+
+def test_worker_retries_then_delivers_in_order(tmp_path):
+    box = Outbox(str(tmp_path / "outbox.db"))
+    for text in ["s1", "s2"]:
+        box.enqueue("signal", "c", text, dedup_key=f"signal:{text}")
+    sent, failed = [], []
+
+    def send(chat_id, text):
+        if text == "s1" and not failed:
+            failed.append(text)
+            raise ConnectionError("network down")
+        sent.append(text)
+
+    worker = DeliveryWorker(box, send, retry_schedule=[0])
+    assert worker.drain_once() == 2
+    assert failed == ["s1"]
+    assert sent == ["s1", "s2"]  # s2 waited behind the failed s1
+    assert box.counts() == {"sent": 2}
+
+
+def test_permanent_error_marks_row_dead_and_reports_it(tmp_path):
+    box = Outbox(str(tmp_path / "outbox.db"))
+    box.enqueue("signal", "c", "bad html", dedup_key="signal:x")
+    seen = []
+
+    def send(chat_id, text):
+        raise _http_error(400)
+
+    worker = DeliveryWorker(box, send, on_failed=lambda row, exc, retry_in: seen.append(retry_in))
+    assert worker.drain_once() == 0
+    assert box.counts() == {"dead": 1}
+    assert seen == [None]
+
+
+def test_claim_orders_by_priority_and_holds_rows_behind_after_key(tmp_path):
+    box = Outbox(str(tmp_path / "outbox.db"))
+    box.enqueue("signal", "c", "s1", dedup_key="signal:a")
+    box.enqueue("signal", "c", "s2", dedup_key="signal:b")
+    box.enqueue("result", "c", "ra", dedup_key="result:a", priority=0, after_key="signal:a")
+    box.enqueue("ops", "c", "o", dedup_key="ops:1", priority=2)
+    box.enqueue("result", "c", "rz", dedup_key="result:z", priority=0, after_key="signal:z")  # unknown key: not held
+
+    rows = box.claim()
+    assert [r["text"] for r in rows] == ["rz", "s1", "s2", "o"]  # ra waits until its signal is sent
+    for r in rows:
+        box.mark_sent(r["id"])
+    assert [r["text"] for r in box.claim()] == ["ra"]
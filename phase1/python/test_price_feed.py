@@ -0,0 +1,62 @@
+import json
+import os
+
+from price_feed import PriceFeedReader
+
+
+def _rows(path, *rows, tail=""):
+    with open(path, "a", encoding="utf-8") as f:
+        for pair, price, t in rows:
+            f.write(json.dumps({"pair": pair, "price": price, "time": t}) + "\n")
+        f.write(tail)
+
+
+def test_poll_reads_only_new_complete_lines(tmp_path):
+    path = str(tmp_path / "prices.jsonl")
+    _rows(path, ("EURUSD", 1.1, "2026.02.14 12:00:00"))
+    reader = PriceFeedReader(path)
+    assert reader.poll() == {"EURUSD": [{"price": 1.1, "time": "2026.02.14 12:00:00"}]}
+    assert reader.poll() == {}
+
+    _rows(path, ("EURUSD", 1.2, "2026.02.14 12:00:01"), ("XAUUSD", 2000.0, "2026.02.14 12:00:01"), tail='{"pair": "EURUSD", "pri')
+    got = reader.poll()
+    assert [t["price"] for t in got["EURUSD"]] == [1.2]
+    assert [t["price"] for t in got["XAUUSD"]] == [2000.0]
+    assert reader.offset < os.path.getsize(path)  # the half-written line is left for the next poll
+
+    _rows(path, tail='ce": 1.3, "time": "2026.02.14 12:00:02"}\n')
+    assert [t["price"] for t in reader.poll()["EURUSD"]] == [1.3]
+    assert reader.price_map()["EURUSD"]["price"] == 1.3
+
+
+def test_resumes_from_saved_state_and_detects_truncation(tmp_path):
+    path = str(tmp_path / "prices.jsonl")
+    _rows(path, ("EURUSD", 1.1, "t1"))
+    first = PriceFeedReader(path)
+    first.poll()
+
+    _rows(path, ("EURUSD", 1.2, "t2"))
+    reader = PriceFeedReader.from_state(path, first.to_state())
+    assert [t["price"] for t in reader.poll()["EURUSD"]] == [1.2]
+
+    with open(path, "w", encoding="utf-8"):
+        pass
+    _rows(path, ("EURUSD", 0.9, "t3"))
+    assert [t["price"] for t in reader.poll()["EURUSD"]] == [0.9]
+    assert reader.rotations == 1
+
+
+def test_map_file_and_pushed_ticks(tmp_path):
+    path = str(tmp_path / "prices.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"EURUSD": {"price": 1.1, "time": "t1"}, "XAUUSD": 2000}, f)
+    reader = PriceFeedReader(path)
+    got = reader.poll()
+    assert reader.map_mode
+    assert got["EURUSD"] == [{"price": 1.1, "time": "t1"}]
+    assert got["XAUUSD"][0]["price"] == 2000.0
+    assert reader.poll() == {}  # unchanged file
+
+    reader.push({"EURUSD": [{"price": 1.15, "time": "t2"}]})
+    assert reader.poll() == {"EURUSD": [{"price": 1.15, "time": "t2"}]}
+    assert reader.price_map()["EURUSD"]["price"] == 1.15
@@ -0,0 +1,52 @@
+import json
+
+from price_ring import PriceRingReader, PriceRingWriter, replay
+
+
+def test_reader_returns_new_ticks_with_bid_ask(tmp_path):
+    path = str(tmp_path / "prices.ring")
+    writer = PriceRingWriter(path, max_pairs=4, depth=8)
+    reader = PriceRingReader(path)
+    writer.write("EURUSD", 1.0, "2026.02.14 11:59:59")
+    assert [t["price"] for t in reader.poll()["EURUSD"]] == [1.0]
+
+    writer.write("EURUSD", 1.1, "2026.02.14 12:00:00", bid=1.0999, ask=1.1001)
+    writer.write("XAUUSD", 2000.0, "2026.02.14 12:00:00")
+    writer.write("EURUSD", 1.2, "2026.02.14 12:00:01", bid=1.1999, ask=1.2001)
+    got = reader.poll()
+    assert got["EURUSD"] == [
+        {"price": 1.1, "bid": 1.0999, "ask": 1.1001, "time": "2026.02.14 12:00:00"},
+        {"price": 1.2, "bid": 1.1999, "ask": 1.2001, "time": "2026.02.14 12:00:01"},
+    ]
+    assert got["XAUUSD"] == [{"price": 2000.0, "bid": 2000.0, "ask": 2000.0, "time": "2026.02.14 12:00:00"}]
+    assert reader.poll() == {}
+    writer.close()
+    reader.close()
+
+
+def test_slow_reader_keeps_the_newest_depth_ticks(tmp_path):
+    path = str(tmp_path / "prices.ring")
+    writer = PriceRingWriter(path, max_pairs=2, depth=4)
+    reader = PriceRingReader(path)
+    writer.write("EURUSD", 1.0, 0)
+    reader.poll()
+    for i in range(1, 11):
+        writer.write("EURUSD", 1.0 + i, i)
+    assert [t["price"] for t in reader.poll()["EURUSD"]] == [8.0, 9.0, 10.0, 11.0]
+    assert reader.dropped == 6
+    writer.close()
+    reader.close()
+
+
+def test_state_round_trip_and_replay(tmp_path):
+    jsonl = tmp_path / "prices.jsonl"
+    jsonl.write_text("\n".join(json.dumps({"pair": "EURUSD", "price": p, "time": "2026.02.14 12:00:00"}) for p in (1.1, 1.2)) + "\nbad\n")
+    path = str(tmp_path / "prices.ring")
+    assert replay(str(jsonl), path) == 2
+
+    reader = PriceRingReader(path)
+    assert [t["price"] for t in reader.poll()["EURUSD"]] == [1.2]  # a fresh reader only takes the latest tick
+    resumed = PriceRingReader.from_state(path, reader.to_state())
+    assert resumed.poll() == {}
+    assert resumed.price_map()["EURUSD"]["price"] == 1.2
+    reader.close()
@@ -0,0 +1,32 @@
+import pytest
+
+from routing import RoutingTable
+
+ROUTES = [
+    {"name": "vip", "chat_id": "@vip", "pairs": "*"},
+    {"name": "gold", "chat_id": "@gold", "pairs": ["XAUUSD"], "tfs": ["PERIOD_M5", "M15"], "sides": ["buy", "SELL"], "results": False},
+    {"name": "free", "chat_id": "@free", "pairs": ["EURUSD"], "tfs": "*", "sides": ["BUY"]},
+    {"name": "dup", "chat_id": "@vip", "pairs": ["XAUUSD"], "tfs": ["M5"], "sides": ["BUY"]},
+]
+
+
+def test_exact_and_wildcard_routes_in_config_order():
+    table = RoutingTable(ROUTES)
+    assert table.chats("XAUUSD", "PERIOD_M5", "buy") == ("@vip", "@gold")
+    assert table.chats("XAUUSD", "M15", "SELL") == ("@vip", "@gold")
+    assert table.chats("EURUSD", "PERIOD_H1", "BUY") == ("@vip", "@free")
+    assert table.chats("EURUSD", "PERIOD_H1", "SELL") == ("@vip",)
+
+
+def test_results_false_routes_get_only_the_signal():
+    table = RoutingTable(ROUTES)
+    assert table.chats("XAUUSD", "M5", "BUY", kind="result") == ("@vip",)
+    assert table.chats("EURUSD", "M5", "BUY", kind="result") == ("@vip", "@free")
+
+
+def test_no_match_and_defaults():
+    table = RoutingTable([{"chat_id": "@gold", "pairs": ["XAUUSD"]}])
+    assert table.chats("EURUSD", "M5", "BUY") == ()
+    assert RoutingTable.from_config({"telegram": {"chat_id": "@main"}}).chats("ANY", "M1", "SELL") == ("@main",)
+    with pytest.raises(ValueError):
+        RoutingTable([{"name": "broken", "pairs": ["XAUUSD"]}])
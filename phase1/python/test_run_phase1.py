@@ -0,0 +1,47 @@
+import json
+import os
+import threading
+import time
+
+import run_phase1
+
+
+def test_watch_follows_feeds_added_by_a_config_reload(tmp_path, monkeypatch):
+    config = tmp_path / "config.json"
+    first, second = tmp_path / "a.jsonl", tmp_path / "b.jsonl"
+    first.write_text("")
+    second.write_text("")
+
+    def write_config(*files):
+        feeds = [{"name": f.stem, "signal_file": str(f)} for f in files]
+        runtime = {"watch_heartbeat_sec": 30, "watch_poll_interval_sec": 0.02}
+        config.write_text(json.dumps({"feeds": feeds, "monitoring": {"enabled": False}, "runtime": runtime}))
+
+    runs = []
+
+    def run_once(path):
+        runs.append(path)
+        if len(runs) == 1:
+            write_config(first, second)
+            os.utime(config, (time.time() + 10, time.time() + 10))
+        else:
+            raise SystemExit
+
+    rebuilt = threading.Event()
+    monkeypatch.setattr(run_phase1, "run_once", run_once)
+    monkeypatch.setattr(run_phase1, "log", lambda msg: rebuilt.set() if "paths changed" in msg else None)
+    write_config(first)
+
+    def target():
+        try:
+            run_phase1.watch(str(config))
+        except SystemExit:
+            pass
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    assert rebuilt.wait(5)
+    with open(second, "a") as f:
+        f.write("{}\n")
+    thread.join(5)
+    assert not thread.is_alive() and len(runs) == 2  # woken by the new feed, not the 30s heartbeat
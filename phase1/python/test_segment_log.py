@@ -0,0 +1,44 @@
+import json
+
+from segment_log import SegmentLog, default_manifest_path
+
+
+def _append(path, *times):
+    with open(path, "a", encoding="utf-8") as f:
+        for t in times:
+            f.write(json.dumps({"id": t, "signal_time": t}) + "\n")
+
+
+def test_manifest_rolls_over_to_the_next_segment(tmp_path):
+    pattern = str(tmp_path / "signals_*.jsonl")
+    day1 = tmp_path / "signals_20260214.jsonl"
+    _append(day1, "2026.02.14 08:00", "2026.02.14 12:00")
+    seglog = SegmentLog(pattern, mark_every=1)
+    [entry] = seglog.refresh()
+    assert (entry["name"], entry["records"], entry["bytes"]) == (day1.name, 2, day1.stat().st_size)
+    assert (entry["first_time"], entry["last_time"]) == ("2026.02.14 08:00", "2026.02.14 12:00")
+
+    _append(day1, "2026.02.14 23:55")
+    day2 = tmp_path / "signals_20260215.jsonl"
+    _append(day2, "2026.02.15 00:05")
+    reloaded = SegmentLog(pattern, mark_every=1)  # picks up where the saved manifest stopped
+    entries = reloaded.refresh()
+    assert [e["name"] for e in entries] == [day1.name, day2.name]
+    assert [e["records"] for e in entries] == [3, 1]
+    assert len(entries[0]["marks"]) == 3
+
+    manifest = json.loads(open(default_manifest_path(pattern)).read())
+    assert manifest["pattern"] == pattern and len(manifest["segments"]) == 2
+
+    day1.unlink()
+    assert [e["name"] for e in reloaded.refresh()] == [day2.name]
+
+
+def test_query_uses_time_range(tmp_path):
+    pattern = str(tmp_path / "signals_*.jsonl")
+    _append(tmp_path / "signals_20260214.jsonl", "2026.02.14 08:00", "2026.02.14 12:00")
+    _append(tmp_path / "signals_20260215.jsonl", "2026.02.15 00:05", "2026.02.15 09:00")
+    seglog = SegmentLog(pattern, str(tmp_path / "manifest.json"), mark_every=1)
+    assert [r["id"] for r in seglog.query("2026.02.14 10:00", "2026.02.15 01:00")] == ["2026.02.14 12:00", "2026.02.15 00:05"]
+    assert [r["id"] for r in seglog.query("", "2026.02.14")] == ["2026.02.14 08:00", "2026.02.14 12:00"]
+    assert [r["id"] for r in seglog.query("2026-02-15T08:00")] == ["2026.02.15 09:00"]
@@ -0,0 +1,35 @@
+from datetime import datetime
+
+import pytest
+
+from signal_record import SignalRecord, decode_signal, parse_time, tf_minutes
+
+
+def test_decode_converts_fields_once():
+    sig = decode_signal(b'{"id": 7, "pair": "EURUSD", "tf": "PERIOD_M5", "side": "buy", "entry": "1.1", "sl": 1.09, "tp": "", "signal_time": "2026.02.14 12:05", "atr": 0.002}')
+    assert (sig.id, sig.side, sig.entry, sig.tp) == ("7", "BUY", 1.1, None)
+    assert sig.signal_dt == datetime(2026, 2, 14, 12, 5)
+    assert sig.get("atr") == 0.002 and sig["pair"] == "EURUSD"
+    assert "tp" not in sig
+    with pytest.raises(KeyError):
+        sig["tp"]
+
+
+@pytest.mark.parametrize("line", [b"", b"not json", b"[1, 2]", b'"text"'])
+def test_decode_rejects_non_objects(line):
+    assert decode_signal(line) is None
+
+
+def test_to_state_keeps_merged_repeats():
+    sig = SignalRecord.from_dict({"id": "a", "pair": "EURUSD", "time": "2026-02-14 12:05:00", "repeats": 2, "repeat_time": "2026.02.14 12:10"})
+    state = sig.to_state()
+    assert state["signal_time"] == "2026-02-14 12:05:00"
+    assert (state["repeats"], state["repeat_time"]) == (2, "2026.02.14 12:10")
+    assert SignalRecord.from_dict(state).to_state() == state
+
+
+def test_time_and_timeframe_parsing():
+    assert parse_time("2026.02.14 12:05:30") == datetime(2026, 2, 14, 12, 5, 30)
+    assert parse_time("2026-02-14T12:05:30") == datetime(2026, 2, 14, 12, 5, 30)
+    assert parse_time("soon") is None
+    assert [tf_minutes(t) for t in ("PERIOD_M5", "M15", "PERIOD_H4", "D1", "MN1", "X")] == [5, 15, 240, 1440, 43200, None]
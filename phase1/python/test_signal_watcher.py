@@ -0,0 +1,269 @@
+import json
+import time
+
+import pytest
+
+import signal_watcher as sw
+from telegram_dispatch import TelegramRateLimiter
+
+
+def _signal(i, pair="BTCUSD.vx", tf="PERIOD_M5", side="BUY", entry=100.0, sl=90.0, tp=130.0, t="2026.02.14 12:05"):
+    return {
+        "id": f"{pair}-{tf}-{i}-{side}", "pair": pair, "tf": tf, "side": side,
+        "entry": entry, "sl": sl, "tp": tp, "rr": "1:3", "adx": 30, "rsi": 50, "signal_time": t,
+    }
+
+
+def _append(path, *rows):
+    with open(path, "a", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row) + "\n")
+
+
+def _config(tmp_path, **overrides):
+    cfg = {
+        "signal_file": str(tmp_path / "signals.jsonl"),
+        "state_file": str(tmp_path / "state.json"),
+        "telegram": {"purpose": "alphalyceum_trading_only", "bot_token": "X", "chat_id": "@main"},
+        "filters": {"allowed_symbols": ["BTCUSD.vx"], "allowed_tf": "PERIOD_M5"},
+        "runtime": {"max_messages_per_run": 50, "sleep_between_sends_sec": 0},
+        "monitoring": {"enabled": True, "price_file": str(tmp_path / "prices.jsonl")},
+    }
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(cfg.get(key), dict):
+            cfg[key].update(value)
+        else:
+            cfg[key] = value
+    open(cfg["signal_file"], "a").close()
+    if cfg["monitoring"].get("price_file"):
+        open(cfg["monitoring"]["price_file"], "a").close()
+    path = tmp_path / "config.json"
+    path.write_text(json.dumps(cfg))
+    return str(path)
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    """(chat_id, first line) of every message the watcher sends."""
+    out = []
+    monkeypatch.setattr(sw, "send_telegram_message", lambda token, chat, text, *a, **k: out.append((chat, text.splitlines()[0])))
+    return out
+
+
+def test_each_feed_applies_its_own_filters(tmp_path, sent):
+    m5 = str(tmp_path / "m5.jsonl")
+    m15 = str(tmp_path / "m15.jsonl")
+    feeds = [
+        {"name": "m5", "signal_file": m5},
+        {"name": "m15", "signal_file": m15, "filters": {"allowed_symbols": ["XAUUSD"], "allowed_tf": ["PERIOD_M15"]}},
+    ]
+    config = _config(tmp_path, feeds=feeds)
+    _append(m5, _signal(1), _signal(2, pair="XAUUSD"))
+    _append(m15, _signal(3, pair="XAUUSD", tf="PERIOD_M15"), _signal(4, tf="PERIOD_M15"))
+
+    stats = sw.run_once(config)
+    assert stats["sent_count"] == 2
+    state = sw.load_state(str(tmp_path / "state.json"))
+    assert set(state["sent_ids"]) == {"BTCUSD.vx-PERIOD_M5-1-BUY", "XAUUSD-PERIOD_M15-3-BUY"}
+    assert state["feed_offsets"]["m15"] > 0
+
+    _append(m15, _signal(5, pair="XAUUSD", tf="PERIOD_M15"))
+    assert sw.run_once(config)["sent_count"] == 1
+    assert len(sent) == 3
+
+
+def test_duplicate_feed_names_are_rejected():
+    with pytest.raises(ValueError):
+        sw.feeds_from_config({"feeds": [{"name": "a", "signal_file": "x"}, {"name": "a", "signal_file": "y"}]})
+
+
+def test_segment_cursor_moves_to_the_next_day(tmp_path, sent):
+    day1 = str(tmp_path / "signals_20260214.jsonl")
+    day2 = str(tmp_path / "signals_20260215.jsonl")
+    config = _config(tmp_path, signal_segments=str(tmp_path / "signals_*.jsonl"), monitoring={"enabled": False})
+    _append(day1, _signal(1))
+    assert sw.run_once(config)["sent_count"] == 1
+
+    _append(day1, _signal(2))
+    _append(day2, _signal(3, t="2026.02.15 00:05"))
+    assert sw.run_once(config)["sent_count"] == 2
+    state = sw.load_state(str(tmp_path / "state.json"))
+    assert state["feed_cursors"]["default"][0] == "signals_20260215.jsonl"
+
+    assert sw.run_once(config)["sent_count"] == 0
+    assert len(sent) == 3
+
+
+def test_burst_is_coalesced_into_a_digest(tmp_path, sent):
+    config = _config(tmp_path, runtime={"coalesce_min_burst": 3}, monitoring={"enabled": False})
+    _append(str(tmp_path / "signals.jsonl"), *[_signal(i) for i in range(4)])
+    assert sw.run_once(config)["sent_count"] == 4
+    assert len(sent) == 1 and "SIGNAL BURST" in sent[0][1]
+
+    _append(str(tmp_path / "signals.jsonl"), _signal(9))
+    sw.run_once(config)
+    assert "SIGNAL SCALPING" in sent[-1][1]  # below the burst size: a normal message
+
+
+def _histogram_count(hist):
+    return sum(float(line.split()[-1]) for line in hist.render() if line.startswith(f"{hist.name}_count"))
+
+
+def test_outbox_delivery_records_retries_and_file_to_send(tmp_path, monkeypatch):
+    calls = []
+
+    def send(token, chat, text, *a, **k):
+        calls.append(chat)
+        if len(calls) == 1:
+            raise ConnectionError("network down")
+
+    monkeypatch.setattr(sw, "send_telegram_message", send)
+    config = _config(tmp_path, delivery={"outbox_file": str(tmp_path / "outbox.db"), "retry_schedule_sec": [0]}, monitoring={"enabled": False})
+    retried = sw.metrics.MESSAGES_RETRIED.value(reason="outbox")
+    observed = _histogram_count(sw.metrics.FILE_TO_SEND_SECONDS)
+
+    _append(str(tmp_path / "signals.jsonl"), _signal(1))
+    sw.run_once(config)
+    assert calls == ["@main", "@main"]
+    assert sw.metrics.MESSAGES_RETRIED.value(reason="outbox") == retried + 1
+    assert _histogram_count(sw.metrics.FILE_TO_SEND_SECONDS) == observed + 1
+
+
+def _ticks(path, *ticks):
+    _append(path, *[{"pair": "BTCUSD.vx", "price": p, "time": t} for p, t in ticks])
+
+
+def test_lifecycle_closes_on_the_first_level_crossed(tmp_path, sent):
+    config = _config(tmp_path)
+    prices = str(tmp_path / "prices.jsonl")
+    _append(str(tmp_path / "signals.jsonl"), _signal(1), _signal(2, side="SELL", entry=100.0, sl=110.0, tp=80.0))
+    sw.run_once(config)
+    assert len(sw.load_state(str(tmp_path / "state.json"))["active_signals"]) == 2
+
+    # 12:07 is still inside the 12:05 signal bar: too early to count
+    _ticks(prices, (135.0, "2026.02.14 12:07:00"), (100.0, "2026.02.14 12:10:00"), (131.0, "2026.02.14 12:11:00"), (85.0, "2026.02.14 12:12:00"))
+    stats = sw.run_once(config)
+    assert stats["lifecycle_updates"] == 2
+    state = sw.load_state(str(tmp_path / "state.json"))
+    assert state["active_signals"] == {}
+    buy = state["closed_results"]["BTCUSD.vx-PERIOD_M5-1-BUY"]
+    sell = state["closed_results"]["BTCUSD.vx-PERIOD_M5-2-SELL"]
+    assert (buy["result"], buy["hit_time"]) == ("TP_HIT", "2026.02.14 12:11:00")
+    assert (sell["result"], sell["hit_time"]) == ("SL_HIT", "2026.02.14 12:11:00")
+    assert [line for _, line in sent].count("✅ <b>UPDATE HASIL SIGNAL</b>") == 1
+
+    _ticks(prices, (50.0, "2026.02.14 12:20:00"))
+    assert sw.run_once(config)["lifecycle_updates"] == 0
+
+
+def test_rate_limit_buckets_carry_over_between_runs(monkeypatch):
+    limiter = TelegramRateLimiter()
+    monkeypatch.setattr(sw, "default_limiter", limiter)
+    cfg = {"telegram": {"rate_limit": {"group_per_min": 60, "group_burst": 2, "workers": 2}}}
+    assert sw._rate_limited(cfg)
+    assert [limiter.acquire("X", "@main") for _ in range(2)] == [0, 0]
+    _, chat = limiter._buckets("X", "@main")
+    assert sw._rate_limited(cfg)  # next run, same limits
+    assert limiter._buckets("X", "@main")[1] is chat
+    assert chat.reserve() > 0.9  # the burst spent last run still counts
+    assert not sw._rate_limited({"telegram": {"rate_limit": {"enabled": False}}})
+
+
+def test_result_goes_before_new_signals_in_the_same_cycle(tmp_path, sent, monkeypatch):
+    message_class = sw.message_class
+
+    def slow_message_class(kind):
+        time.sleep(0.05)  # gives an idle dispatcher worker time to grab whatever is already queued
+        return message_class(kind)
+
+    monkeypatch.setattr(sw, "message_class", slow_message_class)
+    config = _config(tmp_path)
+    signals = str(tmp_path / "signals.jsonl")
+    _append(signals, _signal(1))
+    sw.run_once(config)
+
+    _ticks(str(tmp_path / "prices.jsonl"), (131.0, "2026.02.14 12:11:00"))
+    _append(signals, _signal(2, t="2026.02.14 12:10"), _signal(3, t="2026.02.14 12:10"))
+    sent.clear()
+    stats = sw.run_once(config)
+    assert (stats["sent_count"], stats["lifecycle_updates"]) == (2, 1)
+    assert sent[0] == ("@main", "✅ <b>UPDATE HASIL SIGNAL</b>")
+    assert len(sent) == 3
+
+
+def test_routes_fan_out_and_unrouted_signals_are_dropped(tmp_path, sent):
+    routes = [
+        {"name": "vip", "chat_id": "@vip", "pairs": ["BTCUSD.vx"]},
+        {"name": "free", "chat_id": "@free", "pairs": ["BTCUSD.vx"], "sides": ["BUY"], "results": False},
+    ]
+    config = _config(tmp_path, routes=routes, filters={"allowed_symbols": ["BTCUSD.vx", "XAUUSD"]})
+    _append(str(tmp_path / "signals.jsonl"), _signal(1), _signal(2, side="SELL", sl=110.0, tp=80.0), _signal(3, pair="XAUUSD"))
+    stats = sw.run_once(config)
+    assert stats["sent_count"] == 2
+    assert [chat for chat, _ in sent] == ["@vip", "@free", "@vip"]
+
+    state = sw.load_state(str(tmp_path / "state.json"))
+    assert "XAUUSD-PERIOD_M5-3-BUY" in state["sent_ids"]  # never retried...
+    assert "XAUUSD-PERIOD_M5-3-BUY" not in state["active_signals"]  # ...and never tracked
+
+    sent.clear()
+    _ticks(str(tmp_path / "prices.jsonl"), (131.0, "2026.02.14 12:11:00"))
+    sw.run_once(config)
+    assert sorted(sent) == [("@vip", "✅ <b>UPDATE HASIL SIGNAL</b>"), ("@vip", "🛑 <b>UPDATE HASIL SIGNAL</b>")]
+
+
+def test_failed_chat_is_retried_without_resending_to_the_others(tmp_path, monkeypatch):
+    calls = []
+
+    def send(token, chat, text, *a, **k):
+        calls.append(chat)
+        if chat == "@free" and calls.count("@free") == 1:
+            raise ConnectionError("network down")
+
+    monkeypatch.setattr(sw, "send_telegram_message", send)
+    routes = [{"chat_id": "@vip"}, {"chat_id": "@free"}]
+    config = _config(tmp_path, routes=routes, monitoring={"enabled": False})
+    _append(str(tmp_path / "signals.jsonl"), _signal(1))
+    daemon = sw.WatcherDaemon(config)
+    try:
+        assert daemon.cycle()["sent_count"] == 0
+        assert calls == ["@vip", "@free"]
+        assert daemon.cycle()["sent_count"] == 1
+        assert calls[2:] == ["@free"]
+    finally:
+        daemon.close()
+
+
+def test_socket_signals_respect_the_per_run_cap(tmp_path, sent):
+    from socket_ingest import IngestClient
+
+    config = _config(tmp_path, runtime={"max_messages_per_run": 3}, ingest={"enabled": True, "tcp": "127.0.0.1:0"}, monitoring={"enabled": False})
+    daemon = sw.WatcherDaemon(config)
+    try:
+        with IngestClient(daemon.ingest.address) as client:
+            client.send(*[_signal(i) for i in range(8)])
+        deadline = time.monotonic() + 2
+        while daemon.ingest.stats["signals"] < 8 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert [daemon.cycle()["sent_count"] for _ in range(4)] == [3, 3, 2, 0]
+        assert len(sent) == 8
+        # the audit file is the durable record; its lines were all consumed
+        assert daemon.state["offset"] == (tmp_path / "signals.jsonl").stat().st_size
+    finally:
+        daemon.close()
+
+
+def test_repeated_signals_are_merged_into_the_open_one(tmp_path, sent):
+    config = _config(tmp_path, suppression={"mode": "merge", "window_bars": 2, "atr_mult": 0.5})
+    signals = str(tmp_path / "signals.jsonl")
+    _append(signals, _signal(1), _signal(2, entry=103.0, t="2026.02.14 12:10"))
+    stats = sw.run_once(config)
+    assert (stats["sent_count"], stats["suppressed"]) == (1, 1)
+
+    _append(signals, _signal(3, t="2026.02.14 12:20"))  # 2 bars after the merged repeat
+    assert sw.run_once(config)["suppressed"] == 1
+    state = sw.load_state(str(tmp_path / "state.json"))
+    assert list(state["active_signals"]) == ["BTCUSD.vx-PERIOD_M5-1-BUY"]
+    assert state["active_signals"]["BTCUSD.vx-PERIOD_M5-1-BUY"].get("repeats") == 2
+    assert "BTCUSD.vx-PERIOD_M5-3-BUY" in state["sent_ids"]
+    assert len(sent) == 1
@@ -0,0 +1,51 @@
+import json
+import time
+
+import pytest
+
+from socket_ingest import IngestClient, IngestServer, classify, parse_address
+
+
+def _wait_for(cond, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not cond():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_parse_address_and_classify():
+    assert parse_address("127.0.0.1:9110") == ("tcp", ("127.0.0.1", 9110))
+    assert parse_address("unix:/run/alpha.sock") == ("unix", "/run/alpha.sock")
+    with pytest.raises(ValueError):
+        parse_address("9110")
+    assert classify({"pair": "EURUSD", "side": "BUY"}) == "signal"
+    assert classify({"pair": "EURUSD", "price": 1.1}) == "tick"
+    assert classify({"type": "signal", "pair": "EURUSD", "price": 1.1}) == "signal"
+
+
+def test_only_localhost_is_accepted():
+    with pytest.raises(ValueError):
+        IngestServer(tcp="0.0.0.0:0")
+
+
+def test_signals_are_audited_and_queued_ticks_grouped(tmp_path):
+    audit = tmp_path / "signals.jsonl"
+    events = []
+    server = IngestServer(tcp="127.0.0.1:0", audit_file=str(audit), on_event=events.append).start()
+    try:
+        with IngestClient(server.address) as client:
+            client.send({"id": "a", "pair": "EURUSD", "side": "BUY"}, {"pair": "EURUSD", "price": 1.1, "time": "t1"})
+            client.send_lines(["not json", json.dumps({"id": "b", "pair": "XAUUSD", "side": "SELL"})])
+            client.send({"pair": "EURUSD", "price": 1.2, "time": "t2"})
+        _wait_for(lambda: len(events) == 4)
+        assert server.stats == {"signals": 2, "ticks": 2, "malformed": 1}
+
+        first = server.drain_signals(limit=1)
+        rest = server.drain_signals()
+        assert [s.id for _, s, _ in first + rest] == ["a", "b"]
+        lines = audit.read_bytes().splitlines(keepends=True)
+        assert [pos for pos, _, _ in first + rest] == [("", 0), ("", len(lines[0]))]
+        assert server.drain_ticks() == {"EURUSD": [{"price": 1.1, "time": "t1"}, {"price": 1.2, "time": "t2"}]}
+        assert server.drain_signals() == [] and server.drain_ticks() == {}
+    finally:
+        server.stop()
@@ -0,0 +1,56 @@
+import json
+
+from state_journal import StateJournal, journal_path, replay
+
+
+def test_replay_applies_records_over_snapshot(tmp_path):
+    state_file = str(tmp_path / "state.json")
+    journal = StateJournal(state_file)
+    journal.append("offset", feed="default", offset=120)
+    journal.append("offset", feed="m15", offset=40)
+    journal.append("cursor", feed="seg", segment="signals_20260214.jsonl", offset=7)
+    journal.append("sent", id="a")
+    journal.append("open", id="a", signal={"pair": "EURUSD"})
+    journal.append("open", id="b", signal={"pair": "XAUUSD"})
+    journal.append("close", id="b", result={"result": "TP"})
+    journal.append("price_feed", feed={"path": "px.jsonl", "offset": 67})
+    journal.close()
+
+    state = {"offset": 0, "sent_ids": ["old"]}
+    assert replay(state, state_file) == 8
+    assert state["offset"] == 120
+    assert state["feed_offsets"] == {"m15": 40}
+    assert state["feed_cursors"] == {"seg": ["signals_20260214.jsonl", 7]}
+    assert state["sent_ids"] == ["old", "a"]
+    assert state["active_signals"] == {"a": {"pair": "EURUSD"}}
+    assert state["closed_results"] == {"b": {"result": "TP"}}
+    assert state["price_feed"] == {"path": "px.jsonl", "offset": 67}
+
+
+def test_replay_stops_at_torn_line(tmp_path):
+    state_file = str(tmp_path / "state.json")
+    with open(journal_path(state_file), "w", encoding="utf-8") as f:
+        f.write('{"op":"sent","id":"a"}\n{"op":"sent","id"')
+    state: dict = {}
+    assert replay(state, state_file) == 1
+    assert state["sent_ids"] == ["a"]
+
+
+def test_compact_writes_snapshot_and_truncates(tmp_path):
+    state_file = str(tmp_path / "state.json")
+    journal = StateJournal(state_file, compact_every=2, compact_interval_sec=0)
+    assert not journal.needs_compaction()  # nothing journaled yet
+    journal.append("sent", id="a")
+    assert journal.needs_compaction()
+    journal.compact({"offset": 5, "sent_ids": ["a"]})
+
+    assert json.loads((tmp_path / "state.json").read_text()) == {"offset": 5, "sent_ids": ["a"]}
+    assert (tmp_path / "state.json.journal").read_text() == ""
+    assert journal.records == 0
+    assert not journal.needs_compaction()
+
+    journal.append("sent", id="b")
+    journal.close()
+    state = json.loads((tmp_path / "state.json").read_text())
+    assert replay(state, state_file) == 1
+    assert state["sent_ids"] == ["a", "b"]
@@ -0,0 +1,43 @@
+import json
+
+from tail_reader import TailIndex, iter_lines_reversed, tail_records
+
+
+def _write(path, rows, mode="a"):
+    with open(path, mode, encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row) + "\n")
+
+
+def test_iter_lines_reversed_across_small_blocks(tmp_path):
+    path = tmp_path / "x.jsonl"
+    lines = [f"line-{i}-" + "x" * 300 for i in range(20)]
+    path.write_text("\n".join(lines) + "\n")
+    got = list(iter_lines_reversed(str(path), block_size=1024))
+    assert [line.decode() for _, line in got] == lines[::-1]
+    data = path.read_bytes()
+    assert all(data[start:start + len(line)] == line for start, line in got)
+
+
+def test_tail_records_newest_first_with_match(tmp_path):
+    path = str(tmp_path / "signals.jsonl")
+    _write(path, [{"i": i, "pair": "EURUSD" if i % 2 else "XAUUSD"} for i in range(10)])
+    with open(path, "a") as f:
+        f.write("not json\n")
+    assert [r["i"] for r in tail_records(path, 3)] == [9, 8, 7]
+    assert [r["i"] for r in tail_records(path, 2, match=lambda r: r["pair"] == "XAUUSD")] == [8, 6]
+    assert tail_records(str(tmp_path / "missing.jsonl"), 3) == []
+
+
+def test_tail_index_scans_back_once_and_follows_appends(tmp_path):
+    path = str(tmp_path / "prices.jsonl")
+    _write(path, [{"pair": "EURUSD" if i % 3 else "XAUUSD", "i": i} for i in range(30)])
+    index = TailIndex(path, block_size=1024)
+    assert [r["i"] for r in index.recent("XAUUSD", 2)] == [27, 24]
+    assert [r["i"] for r in index.recent("EURUSD", 2)] == [29, 28]
+
+    _write(path, [{"pair": "XAUUSD", "i": 30}])
+    assert [r["i"] for r in index.recent("XAUUSD", 2)] == [30, 27]
+
+    _write(path, [{"pair": "XAUUSD", "i": 0}], mode="w")  # truncated/rotated
+    assert [r["i"] for r in index.recent("XAUUSD", 2)] == [0]
@@ -0,0 +1,79 @@
+import threading
+import time
+
+from telegram_dispatch import TelegramDispatcher, TelegramRateLimiter, TokenBucket
+
+
+def test_token_bucket_spends_burst_then_paces():
+    bucket = TokenBucket(rate_per_sec=10, capacity=2)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert 0.05 < bucket.reserve() <= 0.1
+    assert 0.15 < bucket.reserve() <= 0.2  # reservations queue up behind each other
+
+
+def test_block_for_delays_the_next_reservation():
+    bucket = TokenBucket(rate_per_sec=100, capacity=5)
+    bucket.block_for(0.5)
+    assert 0.4 < bucket.reserve() <= 0.5
+
+
+def test_limiter_uses_group_and_private_chat_limits():
+    limiter = TelegramRateLimiter({"group_per_min": 600, "group_burst": 1, "private_per_sec": 1, "private_burst": 3})
+    _, group = limiter._buckets("bot", "-100123")
+    _, private = limiter._buckets("bot", "42")
+    assert (group.rate, group.capacity) == (10.0, 1.0)
+    assert (private.rate, private.capacity) == (1.0, 3.0)
+
+    started = time.monotonic()
+    assert limiter.acquire("bot", "-100123") == 0
+    limiter.on_retry_after("bot", "-100123", 0.2)
+    assert 0.15 < limiter.acquire("bot", "-100123") <= 0.2  # retry_after outlasts the 0.1s refill
+    assert time.monotonic() - started >= 0.15
+
+
+def test_dispatcher_sends_results_before_signals_and_ops():
+    dispatcher = TelegramDispatcher(max_workers=1)
+    gate = threading.Event()
+    order = []
+    dispatcher.schedule("ops", "other", gate.wait)  # keeps the only worker busy while jobs queue up
+    futures = [
+        dispatcher.schedule(cls, "c", order.append, text)
+        for cls, text in [("ops", "o"), ("signal", "s1"), ("signal", "s2"), ("result", "r"), ("unknown", "s3")]
+    ]
+    gate.set()
+    for fut in futures:
+        fut.result(timeout=5)
+    dispatcher.shutdown()
+    assert order == ["r", "s1", "s2", "s3", "o"]
+    stats = dispatcher.stats()
+    assert (stats["result"]["count"], stats["signal"]["count"], stats["ops"]["count"]) == (1, 3, 2)
+
+
+def test_configure_keeps_spent_tokens_while_limits_are_unchanged():
+    limiter = TelegramRateLimiter({"group_per_min": 60, "group_burst": 1})
+    assert limiter.acquire("bot", "-100123") == 0
+    limiter.configure({"group_per_min": 60, "group_burst": 1})
+    _, group = limiter._buckets("bot", "-100123")
+    assert group.reserve() > 0.9  # burst already spent
+    limiter.configure({"group_per_min": 60, "group_burst": 2})
+    assert limiter.acquire("bot", "-100123") == 0  # new limits: fresh buckets
+
+
+def test_dispatcher_worker_cap_can_be_changed():
+    dispatcher = TelegramDispatcher(max_workers=1)
+    gate = threading.Event()
+    futures = [dispatcher.schedule("signal", chat, gate.wait, 5) for chat in ["a", "b", "c"]]
+    assert len(dispatcher._threads) == 1
+    dispatcher.configure(None, max_workers=3)
+    futures.append(dispatcher.schedule("signal", "d", gate.wait, 5))
+    assert len(dispatcher._threads) == 3
+    gate.set()
+    for fut in futures:
+        fut.result(timeout=5)
+    dispatcher.configure(None, max_workers=1)
+    deadline = time.monotonic() + 5
+    while len(dispatcher._threads) > 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(dispatcher._threads) == 1  # idle extra workers exit
+    dispatcher.shutdown()
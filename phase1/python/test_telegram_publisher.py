@@ -0,0 +1,77 @@
+import requests
+
+import http_client
+import telegram_publisher
+from telegram_publisher import send_telegram_message
+
+
+class _Limiter:
+    def __init__(self):
+        self.acquired = []
+        self.blocked = []
+
+    def acquire(self, bot_token, chat_id):
+        self.acquired.append(chat_id)
+        return 0.0
+
+    def on_retry_after(self, bot_token, chat_id, seconds):
+        self.blocked.append((chat_id, seconds))
+
+
+def _response(code, body=None):
+    resp = requests.Response()
+    resp.status_code = code
+    resp._content = body or b"{}"
+    return resp
+
+
+def _patch(monkeypatch, codes):
+    limiter = _Limiter()
+    calls = []
+    monkeypatch.setattr(telegram_publisher, "default_limiter", limiter)
+    monkeypatch.setattr(telegram_publisher.time, "sleep", lambda s: None)
+
+    def post(url, **kwargs):
+        calls.append((url, kwargs["json"]["chat_id"]))
+        return _response(*codes.pop(0))
+
+    monkeypatch.setattr(http_client, "post", post)
+    return limiter, calls
+
+
+def test_send_paces_through_limiter_and_honours_retry_after(monkeypatch):
+    limiter, calls = _patch(monkeypatch, [(429, b'{"parameters": {"retry_after": 7}}'), (200,)])
+    send_telegram_message("tok", "-100", "hi", api_base="http://stub:1/")
+    assert calls == [("http://stub:1/bottok/sendMessage", "-100")] * 2
+    assert limiter.acquired == ["-100", "-100"]
+    assert limiter.blocked == [("-100", 7.0)]
+
+
+def test_send_without_limit_skips_token_buckets(monkeypatch):
+    limiter, calls = _patch(monkeypatch, [(429, b'{"parameters": {"retry_after": 2}}'), (200,)])
+    send_telegram_message("tok", "42", "hi", limit=False)
+    assert len(calls) == 2
+    assert limiter.acquired == [] and limiter.blocked == []
+
+
+def _utf16_len(text):
+    return len(text.encode("utf-16-le")) // 2
+
+
+def test_digest_parts_fit_the_utf16_limit():
+    # astral emoji count twice in UTF-16, so len() alone would under-count every block
+    signals = [{"id": f"S{i}-" + "🚀" * 60, "pair": "XAUUSD", "tf": "PERIOD_M5", "side": "BUY", "entry": 1, "sl": 1, "tp": 2} for i in range(40)]
+    parts = telegram_publisher.format_signal_digest(signals)
+    assert len(parts) > 1
+    assert [i for _, idxs in parts for i in idxs] == list(range(40))
+    for n, (text, idxs) in enumerate(parts, start=1):
+        assert _utf16_len(text) <= telegram_publisher.TELEGRAM_MAX_TEXT
+        assert f"({n}/{len(parts)})" in text
+        assert text.count("<code>") == text.count("</code>") == len(idxs)
+
+
+def test_small_burst_is_one_digest():
+    signals = [{"id": f"S{i}", "pair": "EURUSD", "side": "SELL"} for i in range(3)]
+    [(text, idxs)] = telegram_publisher.format_signal_digest(signals)
+    assert idxs == [0, 1, 2]
+    assert "— 3 signal\n" in text
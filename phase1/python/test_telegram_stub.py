@@ -0,0 +1,39 @@
+import pytest
+import requests
+
+import http_client
+from telegram_publisher import send_telegram_message
+from telegram_stub import start_stub
+
+
+@pytest.fixture
+def stub_server():
+    started = []
+
+    def start(**behaviour):
+        server, stub = start_stub(latency_ms=0, jitter_ms=0, seed=1, **behaviour)
+        started.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}", stub
+
+    yield start
+    for server in started:
+        server.shutdown()
+        server.server_close()
+    http_client.close_all()
+
+
+def test_stub_accepts_send_message(stub_server):
+    base, stub = stub_server()
+    send_telegram_message("tok", "-100", "hello", api_base=base, limit=False)
+    assert stub.stats() == {"counts": {"ok": 1, "429": 0, "5xx": 0}, "messages": 1}
+    assert stub.received[0]["chat_id"] == "-100"
+    assert requests.get(base + "/stats", timeout=5).json()["messages"] == 1
+
+
+def test_stub_answers_429_with_retry_after(stub_server):
+    base, stub = stub_server(p429=1.0, retry_after=3)
+    with pytest.raises(requests.HTTPError) as err:
+        send_telegram_message("tok", "-100", "hello", max_retries=0, api_base=base, limit=False)
+    assert err.value.response.status_code == 429
+    assert err.value.response.json()["parameters"]["retry_after"] == 3
+    assert stub.stats()["counts"]["429"] == 1
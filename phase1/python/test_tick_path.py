@@ -0,0 +1,43 @@
+import pytest
+
+import tick_path
+from signal_record import SignalRecord
+from tick_path import TickPath, not_before, tick_epoch
+
+
+@pytest.fixture(params=["numpy", "python"])
+def backend(request, monkeypatch):
+    if request.param == "python":
+        monkeypatch.setattr(tick_path, "np", None)
+    elif tick_path.np is None:
+        pytest.skip("numpy not installed")
+
+
+def _path(*ticks):
+    return TickPath([{"price": p, "time": f"2026.02.14 12:{m:02d}:00"} for p, m in ticks])
+
+
+def test_first_crossing_wins_not_the_last_price(backend):
+    path = _path((100, 5), (131, 6), (85, 7))  # TP first, then through SL
+    assert path.first_hit("BUY", tp=130, sl=90) == ("TP_HIT", 1)
+    assert path.first_hit("SELL", tp=90, sl=130) == ("SL_HIT", 1)
+    assert (path.low, path.high) == (85, 131)
+
+
+def test_sl_wins_when_one_tick_reaches_both(backend):
+    assert _path((100, 5)).first_hit("BUY", tp=100, sl=100) == ("SL_HIT", 0)
+    assert _path((100, 5)).first_hit("SELL", tp=100, sl=100) == ("SL_HIT", 0)
+
+
+def test_ticks_before_not_before_are_ignored(backend):
+    path = _path((131, 4), (120, 9), (85, 10))
+    since = tick_epoch("2026.02.14 12:05:00")
+    assert path.first_hit("BUY", tp=130, sl=90, since=since) == ("SL_HIT", 2)
+    assert path.first_hit("BUY", tp=130, sl=None) is None
+    assert path.first_hit("FLAT", tp=130, sl=90) is None
+
+
+def test_not_before_is_the_signal_bar_close():
+    sig = SignalRecord.from_dict({"tf": "PERIOD_M5", "signal_time": "2026.02.14 12:00"})
+    assert not_before(sig) == tick_epoch("2026.02.14 12:05:00")
+    assert not_before(SignalRecord.from_dict({"tf": "PERIOD_M5"})) == -tick_path.INF
@@ -0,0 +1,36 @@
+from trigger_index import TriggerIndex
+
+SIGNALS = {
+    "buy": {"pair": "EURUSD", "side": "BUY", "sl": 1.09, "tp": 1.12},
+    "sell": {"pair": "EURUSD", "side": "SELL", "sl": 1.12, "tp": 1.08},
+    "gold": {"pair": "XAUUSD", "side": "BUY", "sl": 1990, "tp": 2030},
+}
+
+
+def test_crossed_range_returns_only_reached_levels():
+    index = TriggerIndex.build(SIGNALS)
+    assert len(index) == 3
+    assert index.crossed_range("EURUSD", 1.095, 1.115) == set()
+    assert index.crossed_range("EURUSD", 1.09, 1.10) == {"buy"}  # BUY SL touched
+    assert index.crossed_range("EURUSD", 1.10, 1.12) == {"buy", "sell"}  # BUY TP and SELL SL
+    assert index.crossed_range("EURUSD", 1.07, 1.10) == {"buy", "sell"}  # BUY SL and SELL TP
+    assert index.crossed_range("GBPUSD", 0, 10) == set()
+
+
+def test_remove_and_readd_update_the_books():
+    index = TriggerIndex.build(SIGNALS)
+    index.remove("buy")
+    assert "buy" not in index
+    assert index.crossed_range("EURUSD", 1.09, 1.10) == set()
+
+    index.add("sell", {"pair": "EURUSD", "side": "SELL", "sl": 1.15, "tp": 1.05})
+    assert index.crossed_range("EURUSD", 1.10, 1.12) == set()
+    index.remove("sell")
+    assert list(index.pairs()) == ["XAUUSD"]
+
+
+def test_add_rejects_incomplete_signals():
+    index = TriggerIndex()
+    assert not index.add("x", {"pair": "EURUSD", "side": "BUY", "sl": 1.09})
+    assert not index.add("y", {"pair": "EURUSD", "side": "FLAT", "sl": 1.09, "tp": 1.12})
+    assert len(index) == 0
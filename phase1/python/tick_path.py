@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+from signal_record import SignalRecord, parse_time, tf_minutes
+
+try:  # optional: vectorized scan over the ticks
+    import numpy as np
+except ImportError:
+    np = None
+
+_EPOCH = datetime(1970, 1, 1)
+INF = float("inf")
+
+
+def _epoch(dt: datetime | None, default: float) -> float:
+    # Broker times are naive; compare everything as naive seconds.
+    if dt is None:
+        return default
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return (dt - _EPOCH).total_seconds()
+
+
+def tick_epoch(stamp: str) -> float | None:
+    """Tick/price time string -> naive seconds (None when unparseable)."""
+    dt = parse_time(stamp)
+    return None if dt is None else _epoch(dt, 0.0)
+
+
+def not_before(signal: SignalRecord) -> float:
+    """Earliest tick time that can close ``signal``: close of its signal bar.
+
+    signal_time is the open of the signal candle; the EA emits at the next
+    bar open, so older ticks belong to the past. Unknown times -> no limit.
+    """
+    if signal.signal_dt is None:
+        return -INF
+    return _epoch(signal.signal_dt + timedelta(minutes=tf_minutes(signal.tf) or 0), -INF)
+
+
+class TickPath:
+    """Prices and times of one pair's ticks since the last lifecycle check, oldest first.
+
+    With NumPy the first TP/SL crossing of a signal is one vectorized pass
+    over the arrays; without it, a plain loop with the same rules.
+    """
+
+    __slots__ = ("prices", "times", "stamps", "low", "high")
+
+    def __init__(self, ticks: List[Dict[str, Any]]):
+        self.stamps = [str(t.get("time") or "") for t in ticks]
+        prices = [float(t["price"]) for t in ticks]
+        # unparseable tick time -> +inf (never filtered out)
+        times = [_epoch(parse_time(s), INF) for s in self.stamps]
+        self.low = min(prices)
+        self.high = max(prices)
+        if np is not None:
+            self.prices = np.asarray(prices, dtype=np.float64)
+            self.times = np.asarray(times, dtype=np.float64)
+        else:
+            self.prices = prices
+            self.times = times
+
+    def __len__(self) -> int:
+        return len(self.stamps)
+
+    def price_at(self, i: int) -> float:
+        return float(self.prices[i])
+
+    def first_hit(self, side: str, tp: float | None, sl: float | None, since: float = -INF) -> tuple[str, int] | None:
+        """("TP_HIT" | "SL_HIT", tick index) of the first crossing at or after ``since``.
+
+        Same conservative rule as a single price check: if one tick reaches
+        both levels, SL wins.
+        """
+        if tp is None or sl is None or side not in ("BUY", "SELL"):
+            return None
+        if np is None:
+            return self._first_hit_py(side, tp, sl, since)
+        p = self.prices
+        valid = self.times >= since
+        if side == "BUY":
+            sl_mask = (p <= sl) & valid
+            tp_mask = (p >= tp) & valid
+        else:
+            sl_mask = (p >= sl) & valid
+            tp_mask = (p <= tp) & valid
+        i_sl = int(sl_mask.argmax()) if sl_mask.any() else -1
+        i_tp = int(tp_mask.argmax()) if tp_mask.any() else -1
+        if i_sl >= 0 and (i_tp < 0 or i_sl <= i_tp):
+            return "SL_HIT", i_sl
+        if i_tp >= 0:
+            return "TP_HIT", i_tp
+        return None
+
+    def _first_hit_py(self, side: str, tp: float, sl: float, since: float) -> tuple[str, int] | None:
+        buy = side == "BUY"
+        for i, (px, t) in enumerate(zip(self.prices, self.times)):
+            if t < since:
+                continue
+            if (px <= sl) if buy else (px >= sl):
+                return "SL_HIT", i
+            if (px >= tp) if buy else (px <= tp):
+                return "TP_HIT", i
+        return None
@@ -0,0 +1,120 @@
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable
+
+
+def _to_float(v: Any) -> float | None:
+    try:
+        if v is None or v == "":
+            return None
+        return float(v)
+    except Exception:
+        return None
+
+
+class _Levels:
+    """Sorted price levels with the signal id stored alongside each level."""
+
+    __slots__ = ("levels", "sids")
+
+    def __init__(self):
+        self.levels: list[float] = []
+        self.sids: list[str] = []
+
+    def add(self, level: float, sid: str) -> None:
+        i = bisect_right(self.levels, level)
+        self.levels.insert(i, level)
+        self.sids.insert(i, sid)
+
+    def remove(self, level: float, sid: str) -> None:
+        i = bisect_left(self.levels, level)
+        while i < len(self.levels) and self.levels[i] == level:
+            if self.sids[i] == sid:
+                del self.levels[i]
+                del self.sids[i]
+                return
+            i += 1
+
+    def at_or_above(self, price: float) -> list[str]:
+        return self.sids[bisect_left(self.levels, price):]
+
+    def at_or_below(self, price: float) -> list[str]:
+        return self.sids[: bisect_right(self.levels, price)]
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+
+class TriggerIndex:
+    """Per-pair TP/SL thresholds of open signals, kept sorted by side.
+
+    ``crossed_range(pair, low, high)`` returns only the signals whose TP or
+    SL lies inside a price path's range (binary search per threshold list),
+    instead of checking every open signal:
+
+    - BUY:  SL hit when price <= sl, TP hit when price >= tp
+    - SELL: SL hit when price >= sl, TP hit when price <= tp
+    """
+
+    def __init__(self):
+        self._pairs: Dict[str, Dict[str, _Levels]] = {}
+        self._entries: Dict[str, tuple[str, list[tuple[str, float]]]] = {}
+
+    @classmethod
+    def build(cls, active_signals: Dict[str, Dict[str, Any]]) -> "TriggerIndex":
+        idx = cls()
+        for sid, sig in active_signals.items():
+            idx.add(sid, sig)
+        return idx
+
+    def add(self, sid: str, signal: Dict[str, Any]) -> bool:
+        side = str(signal.get("side", "")).upper()
+        tp = _to_float(signal.get("tp"))
+        sl = _to_float(signal.get("sl"))
+        pair = str(signal.get("pair") or "")
+        if side not in {"BUY", "SELL"} or tp is None or sl is None or not pair:
+            return False
+        self.remove(sid)
+
+        books = self._pairs.setdefault(pair, {k: _Levels() for k in ("buy_sl", "buy_tp", "sell_sl", "sell_tp")})
+        prefix = side.lower()
+        keys = [(f"{prefix}_sl", sl), (f"{prefix}_tp", tp)]
+        for key, level in keys:
+            books[key].add(level, sid)
+        self._entries[sid] = (pair, keys)
+        return True
+
+    def remove(self, sid: str) -> None:
+        entry = self._entries.pop(sid, None)
+        if not entry:
+            return
+        pair, keys = entry
+        books = self._pairs.get(pair)
+        if not books:
+            return
+        for key, level in keys:
+            books[key].remove(level, sid)
+        if not any(len(b) for b in books.values()):
+            self._pairs.pop(pair, None)
+
+    def pairs(self) -> Iterable[str]:
+        return list(self._pairs.keys())
+
+    def crossed_range(self, pair: str, low: float, high: float) -> set[str]:
+        """Signals whose TP or SL lies inside a price path with this min/max.
+
+        Only candidates: which level went first is decided on the ticks.
+        """
+        books = self._pairs.get(pair)
+        if not books:
+            return set()
+        out = set(books["buy_sl"].at_or_above(low))
+        out.update(books["buy_tp"].at_or_below(high))
+        out.update(books["sell_sl"].at_or_below(high))
+        out.update(books["sell_tp"].at_or_above(low))
+        return out
+
+    def __contains__(self, sid: object) -> bool:
+        return sid in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
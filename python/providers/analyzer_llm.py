@@ -3,7 +3,7 @@ import os
 import re
 import time
 from pathlib import Path
-import requests
+from providers.shared import http_client
 
 _OLLAMA_OK_CACHE = {"ts": 0, "ok": None}
 
@@ -144,7 +144,7 @@ def _ollama_available(ttl_sec: int = 20) -> bool:
     if _OLLAMA_OK_CACHE["ok"] is not None and (now - _OLLAMA_OK_CACHE["ts"]) < ttl_sec:
         return bool(_OLLAMA_OK_CACHE["ok"])
     try:
-        r = requests.get("http://127.0.0.1:11434/api/tags", timeout=2)
+        r = http_client.get("http://127.0.0.1:11434/api/tags", timeout=2)
         ok = r.ok
     except Exception:
         ok = False
@@ -154,7 +154,7 @@ def _ollama_available(ttl_sec: int = 20) -> bool:
 
 
 def _call_ollama(payload: dict, timeout: int = 25) -> dict:
-    r = requests.post("http://127.0.0.1:11434/api/generate", json=payload, timeout=timeout)
+    r = http_client.post("http://127.0.0.1:11434/api/generate", json=payload, timeout=timeout)
     r.raise_for_status()
     return _extract_json((r.json() or {}).get("response", "{}"))
 
@@ -219,7 +219,7 @@ def _refresh_from_refresh_token(refresh_token: str, oauth_cfg: dict) -> dict:
     if scope:
         data["scope"] = scope
 
-    r = requests.post(token_url, data=data, timeout=20)
+    r = http_client.post(token_url, data=data, timeout=20)
     r.raise_for_status()
     return r.json() or {}
 
@@ -292,7 +292,7 @@ def _call_gpt_oauth(prompt: str, cfg: dict) -> dict:
     headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
 
     # Use responses API first
-    r = requests.post(
+    r = http_client.post(
         f"{base_url}/responses",
         headers=headers,
         json={
@@ -314,7 +314,7 @@ def _call_gpt_oauth(prompt: str, cfg: dict) -> dict:
             return data
 
     # Fallback chat.completions
-    r2 = requests.post(
+    r2 = http_client.post(
         f"{base_url}/chat/completions",
         headers=headers,
         json={
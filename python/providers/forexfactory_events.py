@@ -1,5 +1,6 @@
 import datetime as dt
-import requests
+
+from providers.shared import http_client
 
 FF_URL = "https://nfs.faireconomy.media/ff_calendar_thisweek.json"
 
@@ -27,7 +28,7 @@ def get_upcoming_events(look_ahead_hours: int = 3, currencies=None, impact_level
     end = now + dt.timedelta(hours=max(1, int(look_ahead_hours)))
 
     try:
-        r = requests.get(FF_URL, timeout=12)
+        r = http_client.get(FF_URL, timeout=12)
         r.raise_for_status()
         data = r.json() or []
     except Exception:
@@ -1,8 +1,25 @@
 import json
 from pathlib import Path
 
+from providers.shared import TailIndex
+
 PHASE1_CONFIG = Path("D:/alphalyceum/phase1/config/config.json")
 
+# One reverse-scan index per signal file, shared by every symbol in this process.
+_INDEXES: dict[str, TailIndex] = {}
+
+
+def _is_live_signal(obj: dict) -> bool:
+    return not str(obj.get("id", "")).startswith(("TEST-", "HC-", "E2E-"))
+
+
+def _signal_index(signal_file: str) -> TailIndex:
+    idx = _INDEXES.get(signal_file)
+    if idx is None:
+        idx = TailIndex(signal_file, key=lambda r: str(r.get("pair")), match=_is_live_signal)
+        _INDEXES[signal_file] = idx
+    return idx
+
 
 def get_latest_market_context(symbol: str) -> dict:
     out = {
@@ -19,25 +36,7 @@ def get_latest_market_context(symbol: str) -> dict:
         if not signal_file.exists():
             return out
 
-        lines = signal_file.read_text(encoding="utf-8", errors="ignore").splitlines()
-        hit = []
-        for ln in reversed(lines):
-            ln = ln.strip()
-            if not ln:
-                continue
-            try:
-                obj = json.loads(ln)
-            except Exception:
-                continue
-            if str(obj.get("pair")) != symbol:
-                continue
-            sid = str(obj.get("id", ""))
-            if sid.startswith(("TEST-", "HC-", "E2E-")):
-                continue
-            hit.append(obj)
-            if len(hit) >= 15:
-                break
-
+        hit = _signal_index(str(signal_file)).recent(symbol, 15)
         if not hit:
             return out
 
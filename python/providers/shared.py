@@ -0,0 +1,26 @@
+import sys
+from pathlib import Path
+
+# Helpers shared with the V1 watcher live in phase1/python; make them importable from V2.
+# Repo checkout: <root>/phase1/python; deployed side by side: D:/alphalyceum/{phase1,v2}.
+_ROOT = Path(__file__).resolve().parents[2]
+PHASE1_PY = next(
+    (p for p in (_ROOT / "phase1" / "python", _ROOT.parent / "phase1" / "python") if p.is_dir()),
+    _ROOT / "phase1" / "python",
+)
+if str(PHASE1_PY) not in sys.path:
+    sys.path.append(str(PHASE1_PY))
+
+import http_client  # noqa: E402
+from tail_reader import TailIndex, tail_records  # noqa: E402
+from telegram_dispatch import default_dispatcher, default_limiter, retry_after_seconds  # noqa: E402
+
+__all__ = [
+    "PHASE1_PY",
+    "http_client",
+    "TailIndex",
+    "tail_records",
+    "default_dispatcher",
+    "default_limiter",
+    "retry_after_seconds",
+]
@@ -1,11 +1,25 @@
-import requests
+from providers.shared import default_limiter, http_client, retry_after_seconds
+
+
+def _post(bot_token: str, chat_id: str, method: str, data: dict, files: dict | None = None, timeout: int = 20, max_retries: int = 3) -> dict:
+    # Paced by the shared per-bot/per-chat token buckets; a 429 blocks the chat for retry_after.
+    url = f"https://api.telegram.org/bot{bot_token}/{method}"
+    for attempt in range(max_retries + 1):
+        default_limiter.acquire(bot_token, str(chat_id))
+        if files:
+            for f in files.values():
+                f.seek(0)
+        r = http_client.post(url, data=data, files=files, timeout=timeout)
+        if r.status_code == 429 and attempt < max_retries:
+            default_limiter.on_retry_after(bot_token, str(chat_id), max(1.0, retry_after_seconds(r)))
+            continue
+        r.raise_for_status()
+        return r.json()
+    return {}
 
 
 def _post_text(bot_token: str, chat_id: str, text: str) -> dict:
-    url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
-    r = requests.post(url, data={"chat_id": chat_id, "text": text}, timeout=20)
-    r.raise_for_status()
-    return r.json()
+    return _post(bot_token, chat_id, "sendMessage", {"chat_id": chat_id, "text": text}, timeout=20)
 
 
 def _build_compact_caption(text: str, max_len: int = 950, include_detail_hint: bool = False) -> str:
@@ -31,25 +45,16 @@ def send_telegram(bot_token: str, chat_id: str, text: str, image_url: str | None
     caption = text if not need_truncate else _build_compact_caption(text, max_len=930, include_detail_hint=send_detail_followup)
 
     if image_path:
-        url = f"https://api.telegram.org/bot{bot_token}/sendPhoto"
         with open(image_path, "rb") as f:
-            r = requests.post(
-                url,
-                data={"chat_id": chat_id, "caption": caption},
-                files={"photo": f},
-                timeout=40,
-            )
-        r.raise_for_status()
+            res = _post(bot_token, chat_id, "sendPhoto", {"chat_id": chat_id, "caption": caption}, files={"photo": f}, timeout=40)
         if send_detail_followup:
             _post_text(bot_token, chat_id, f"🧾 Detail Lengkap Analisa\n\n{text}")
-        return r.json()
+        return res
 
     if image_url:
-        url = f"https://api.telegram.org/bot{bot_token}/sendPhoto"
-        r = requests.post(url, data={"chat_id": chat_id, "photo": image_url, "caption": caption}, timeout=25)
-        r.raise_for_status()
+        res = _post(bot_token, chat_id, "sendPhoto", {"chat_id": chat_id, "photo": image_url, "caption": caption}, timeout=25)
         if send_detail_followup:
             _post_text(bot_token, chat_id, f"🧾 Detail Lengkap Analisa\n\n{text}")
-        return r.json()
+        return res
 
     return _post_text(bot_token, chat_id, text)
@@ -13,6 +13,7 @@ from providers.market_context import get_latest_market_context
 from providers.forexfactory_events import get_upcoming_events
 from providers.technical_overlay import draw_overlay_on_image
 from providers.ohlc_renderer import render_ohlc_with_zones
+from providers.shared import default_dispatcher, http_client
 
 CONFIG_PATH = Path(__file__).resolve().parents[1] / "config" / "v2_config.json"
 CHART_DIR = Path(__file__).resolve().parents[1] / "data" / "charts"
@@ -509,48 +510,54 @@ def main():
         if token and chat_id:
             pair_state = state.setdefault("pair_last_sent_at", {})
             sent_any = False
+            # One priority scheduler for all outbound traffic: channel posts go
+            # before [OPS]/[HEALTH] notes; different chats are sent in parallel.
+            dispatcher = default_dispatcher()
+            dispatcher.configure(cfg.get("telegram", {}).get("priority_classes"))
+            queued = []  # (future, diagnostics row on failure, main channel post)
             for m, payload, image_path, allow_publish in out_msgs:
                 status = str(payload.get("status", "NO-TRADE")).upper()
 
                 if allow_publish:
                     image_url = (payload.get("tradingview", {}) or {}).get("chart_image_url")
-                    try:
-                        send_telegram(token, chat_id, m, image_url=image_url, image_path=image_path, send_detail_followup=send_detail)
-                        pair_state[payload.get("symbol")] = now_utc.isoformat()
-                        sent_any = True
-                    except Exception as e:
-                        diagnostics.append({
-                            "symbol": payload.get("symbol"),
-                            "status": status,
-                            "publish": False,
-                            "publish_reason": f"telegram_main_send_fail: {e}",
-                        })
+                    fut = dispatcher.schedule(
+                        "signal", chat_id, send_telegram, token, chat_id, m,
+                        image_url=image_url, image_path=image_path, send_detail_followup=send_detail,
+                    )
+                    queued.append((fut, {"symbol": payload.get("symbol"), "status": status, "reason": "telegram_main_send_fail"}, True))
                     continue
 
                 if send_non_ok_ops and ops_chat_id and status in {"HOLD_NEWS", "NO-TRADE"}:
                     ops_msg = f"[OPS] {payload.get('symbol')} | {status} | {payload.get('reason')} | score={payload.get('quality_score')}"
-                    try:
-                        send_telegram(token, ops_chat_id, ops_msg, image_url=None, image_path=None, send_detail_followup=False)
-                    except Exception as e:
-                        diagnostics.append({
-                            "symbol": payload.get("symbol"),
-                            "status": status,
-                            "publish": False,
-                            "publish_reason": f"telegram_ops_send_fail: {e}",
-                        })
+                    fut = dispatcher.schedule(
+                        "ops", ops_chat_id, send_telegram, token, ops_chat_id, ops_msg,
+                        image_url=None, image_path=None, send_detail_followup=False,
+                    )
+                    queued.append((fut, {"symbol": payload.get("symbol"), "status": status, "reason": "telegram_ops_send_fail"}, False))
 
             if ops_chat_id:
                 for a in health_alerts:
                     hmsg = f"[HEALTH] {a['symbol']} no OK >= {a['since_ok_hours']}h | last={a['status']} | {a['reason']}"
-                    try:
-                        send_telegram(token, ops_chat_id, hmsg, image_url=None, image_path=None, send_detail_followup=False)
-                    except Exception as e:
-                        diagnostics.append({
-                            "symbol": a.get("symbol"),
-                            "status": "HEALTH",
-                            "publish": False,
-                            "publish_reason": f"telegram_health_send_fail: {e}",
-                        })
+                    fut = dispatcher.schedule(
+                        "ops", ops_chat_id, send_telegram, token, ops_chat_id, hmsg,
+                        image_url=None, image_path=None, send_detail_followup=False,
+                    )
+                    queued.append((fut, {"symbol": a.get("symbol"), "status": "HEALTH", "reason": "telegram_health_send_fail"}, False))
+
+            for fut, fail, main_post in queued:
+                try:
+                    fut.result()
+                except Exception as e:
+                    diagnostics.append({
+                        "symbol": fail["symbol"],
+                        "status": fail["status"],
+                        "publish": False,
+                        "publish_reason": f"{fail['reason']}: {e}",
+                    })
+                    continue
+                if main_post:
+                    pair_state[fail["symbol"]] = now_utc.isoformat()
+                    sent_any = True
 
             if sent_any:
                 state["last_sent_at"] = now_utc.isoformat()
@@ -560,6 +567,8 @@ def main():
     _append_decision_log(decision_rows)
 
     print("V2_POLICY", json.dumps(diagnostics, ensure_ascii=False))
+    print("V2_HTTP", json.dumps(http_client.host_stats(reset=True), ensure_ascii=False))
+    print("V2_QUEUE", json.dumps(default_dispatcher().stats(reset=True), ensure_ascii=False))
     print("\n\n".join([m for m, _, _, _ in out_msgs]))
 
 